@@ -1,6 +1,6 @@
 import asyncio
 import io
-from datetime import timedelta, datetime
+from datetime import datetime
 
 # Load environment variables from .env file
 from dotenv import load_dotenv
@@ -24,10 +24,11 @@ from .prolific_auth import extract_prolific_params, validate_prolific_user, auth
 from utils.calculate_metrics import process_log_file, write_to_csv
 from utils.logfiles_analysis import order_book_contruction, calculate_trader_specific_metrics
 from firebase_admin import auth
-from utils.websocket_utils import sanitize_websocket_message
+from utils.websocket_utils import prepare_message
 from utils.api_responses import success, error, not_found, waiting, not_in_session
 from .random_picker import pick_random_element_new
 from core.treatment_manager import treatment_manager
+from core.transaction_manager import HISTORY_PAGE_SIZE, MAX_HISTORY_PAGE_SIZE
 
 # python stuff we need
 import json
@@ -212,6 +213,52 @@ async def download_parameter_history(current_user: dict = Depends(get_current_ad
     )
 
 
+@app.get("/admin/fanout_metrics")
+async def get_fanout_metrics(current_user: dict = Depends(get_current_admin_user)):
+    """WebSocket queue depth and dropped-frame counters per running market."""
+    return success(data={
+        market_id: manager.trading_market.get_fanout_metrics()
+        for market_id, manager in list(market_handler.trader_managers.items())
+        if manager.trading_market
+    })
+
+
+@app.get("/admin/latency_metrics")
+async def get_latency_metrics(current_user: dict = Depends(get_current_admin_user)):
+    """Latency histograms per event type and pipeline stage, per running market."""
+    return success(data={
+        market_id: manager.trading_market.get_latency_metrics()
+        for market_id, manager in list(market_handler.trader_managers.items())
+        if manager.trading_market
+    })
+
+
+class InstrumentationToggle(BaseModel):
+    enabled: bool
+
+
+@app.post("/admin/latency_metrics")
+async def set_latency_instrumentation(toggle: InstrumentationToggle,
+                                      current_user: dict = Depends(get_current_admin_user)):
+    """Turn latency recording on or off for every running market."""
+    market_ids = []
+    for market_id, manager in list(market_handler.trader_managers.items()):
+        if manager.trading_market:
+            manager.trading_market.set_instrumentation(toggle.enabled)
+            market_ids.append(market_id)
+    return success(data={"enabled": toggle.enabled, "markets": market_ids})
+
+
+@app.get("/admin/rate_limit_metrics")
+async def get_rate_limit_metrics(current_user: dict = Depends(get_current_admin_user)):
+    """Router rate-limit counters per running market."""
+    return success(data={
+        market_id: manager.trading_market.get_rate_limit_metrics()
+        for market_id, manager in list(market_handler.trader_managers.items())
+        if manager.trading_market
+    })
+
+
 class TreatmentYAML(BaseModel):
     yaml_content: str
 
@@ -787,50 +834,60 @@ async def get_trader_market(trader_id: str, request: Request, current_user: dict
         "game_params": params_dict, "isWaitingForOthers": False
     })
 
+@app.get("/trader/{trader_id}/history")
+async def get_trader_market_history(
+    trader_id: str,
+    cursor: Optional[int] = Query(None, ge=0),
+    limit: int = Query(HISTORY_PAGE_SIZE, ge=1, le=MAX_HISTORY_PAGE_SIZE),
+    current_user: dict = Depends(get_current_user),
+):
+    """Page through the trade tape of the trader's market; the latest trades if no cursor is given."""
+    if current_user.get('is_prolific', False) and f"HUMAN_{current_user.get('gmail_username', '')}" != trader_id:
+        raise HTTPException(status_code=403, detail="You can only access your own trader data")
+
+    trader_manager = market_handler.get_trader_manager_by_trader_id(trader_id)
+    if not trader_manager or not trader_manager.trading_market:
+        raise HTTPException(status_code=404, detail="No market found for this trader")
+
+    return success(data=trader_manager.trading_market.get_history_page(cursor, limit))
 
 
-async def send_to_frontend(websocket: WebSocket, trader_manager):
-    while True:
-        trading_market = trader_manager.trading_market
-        time_update = {
-            "type": "time_update",
-            "data": {
-                "current_time": trading_market.current_time.isoformat(),
-                "is_trading_started": trading_market.trading_started,
-                "remaining_time": max(0, (
-                    trading_market.start_time
-                    + timedelta(minutes=trading_market.duration)
-                    - trading_market.current_time
-                ).total_seconds())
-                if trading_market.trading_started
-                else None,
-                "current_human_traders": len(trader_manager.human_traders),
-                "expected_human_traders": len(trader_manager.params.predefined_goals),
-            },
-        }
-        try:
-            sanitized_update = sanitize_websocket_message(time_update)
-            await websocket.send_json(sanitized_update)
-        except Exception as e:
-            print(f"Error sending time update: {e}")
-        await asyncio.sleep(1)
 
 async def receive_from_frontend(websocket: WebSocket, trader):
+    # Blocks on the socket; WebSocketDisconnect propagates to the endpoint
     while True:
-        try:
-            message = await asyncio.wait_for(websocket.receive_text(), timeout=0.1)
-            parsed_message = json.loads(message)
-            
-            if parsed_message.get('type') == 'order':
-                async with trader_locks[trader.id]:
-                    await trader.on_message_from_client(message)
-            else:
-                await trader.on_message_from_client(message)
-                
-        except (asyncio.TimeoutError, WebSocketDisconnect, json.JSONDecodeError):
-            continue
-        except Exception:
-            return
+        message = await websocket.receive_text()
+        await trader.on_message_from_client(message)
+
+
+async def wait_in_session(websocket: WebSocket, trader_id: str, session_status: Dict) -> Dict:
+    """
+    Hold a waiting room socket until the trader's session stops waiting.
+
+    Wakes on session changes rather than polling, and watches the socket at
+    the same time so a disconnect ends the wait.
+    """
+    receive = asyncio.ensure_future(websocket.receive())
+    change = None
+    try:
+        while session_status.get("status") == "waiting":
+            change = asyncio.ensure_future(market_handler.wait_for_session_change_by_trader_id(trader_id))
+            done, _ = await asyncio.wait({change, receive}, return_when=asyncio.FIRST_COMPLETED)
+            if receive in done:
+                change.cancel()
+                message = receive.result()
+                if message["type"] == "websocket.disconnect":
+                    raise WebSocketDisconnect(message.get("code", 1000))
+                receive = asyncio.ensure_future(websocket.receive())
+                continue
+            session_status = change.result()
+        return session_status
+    finally:
+        # Neither wait may outlive this one, however it ends
+        pending = [task for task in (receive, change) if task is not None and not task.done()]
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
 
 @app.get("/market_metrics")
 async def get_market_metrics(trader_id: str, market_id: str, current_user: dict = Depends(get_current_user)):
@@ -923,32 +980,26 @@ async def websocket_trader_endpoint(websocket: WebSocket, trader_id: str):
                     "isWaitingForOthers": True
                 }
             }
-            sanitized_waiting = sanitize_websocket_message(waiting_message)
+            sanitized_waiting = prepare_message(waiting_message)
             await websocket.send_json(sanitized_waiting)
             
-            # Keep connection open and wait for market to start
+            # Keep connection open until the session starts (or the trader leaves it)
             try:
-                while True:
-                    # Check if session has been converted to active market
-                    new_status = market_handler.get_session_status_by_trader_id(trader_id)
-                    
-                    if new_status.get("status") == "active":
-                        # Market started! Notify trader
-                        market_started_message = {
-                            "type": "market_started",
-                            "data": {
-                                "status": "active",
-                                "message": "Market is now active!",
-                                "trading_started": True
-                            }
+                new_status = await wait_in_session(websocket, trader_id, session_status)
+                if new_status.get("status") == "active":
+                    # Market started! Notify trader
+                    market_started_message = {
+                        "type": "market_started",
+                        "data": {
+                            "status": "active",
+                            "message": "Market is now active!",
+                            "trading_started": True
                         }
-                        sanitized_started = sanitize_websocket_message(market_started_message)
-                        await websocket.send_json(sanitized_started)
-                        await websocket.close(code=1000, reason="Market started")
-                        return
-                    
-                    # Wait a bit before checking again
-                    await asyncio.sleep(1)
+                    }
+                    sanitized_started = prepare_message(market_started_message)
+                    await websocket.send_json(sanitized_started)
+                    await websocket.close(code=1000, reason="Market started")
+                return
                     
             except WebSocketDisconnect:
                 print(f"Trader {trader_id} disconnected from waiting room")
@@ -982,21 +1033,12 @@ async def websocket_trader_endpoint(websocket: WebSocket, trader_id: str):
                 "market_id": internal_session_id
             }
         }
-        sanitized_count = sanitize_websocket_message(initial_count)
+        sanitized_count = prepare_message(initial_count)
         await websocket.send_json(sanitized_count)
         
+        # Time updates come from the market clock once this socket is registered
         await trader.connect_to_socket(websocket)
-        
-        send_task = asyncio.create_task(send_to_frontend(websocket, trader_manager))
-        receive_task = asyncio.create_task(receive_from_frontend(websocket, trader))
-        
-        done, pending = await asyncio.wait(
-            [send_task, receive_task],
-            return_when=asyncio.FIRST_COMPLETED
-        )
-        
-        for task in pending:
-            task.cancel()
+        await receive_from_frontend(websocket, trader)
             
     except WebSocketDisconnect:
         # Record market if it was active when disconnected
@@ -1648,7 +1690,7 @@ async def broadcast_trader_count(market_id: str):
     for trader in trader_manager.human_traders:
         if hasattr(trader, 'websocket') and trader.websocket:
             try:
-                sanitized_count_message = sanitize_websocket_message(count_message)
+                sanitized_count_message = prepare_message(count_message)
                 await trader.websocket.send_json(sanitized_count_message)
             except Exception:
                 pass
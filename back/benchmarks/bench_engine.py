@@ -0,0 +1,325 @@
+"""
+Matching engine benchmarks.
+
+Replays seeded synthetic order flow through the bare `OrderBook` engines and
+through `MarketOrchestrator.handle_trader_message`, covering place, cancel,
+match, snapshot and broadcast-message build, plus bursts of concurrent
+submissions through the market sequencer.
+
+Usage (from back/):
+    python -m benchmarks.bench_engine                      # quick profile, compare to baseline
+    python -m benchmarks.bench_engine --profile full       # 1k-1M orders, 10-10k levels
+    python -m benchmarks.bench_engine --update-baseline    # record new numbers
+
+Baselines are machine-specific: regenerate them on the machine that gates
+changes before relying on the regression check.
+"""
+import asyncio
+import logging
+import os
+import random
+import sys
+from typing import Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.harness import CaseRun, Timer, main
+from core.data_models import OrderType
+from core.orderbook_manager import create_order_book
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+
+SEED = 1234
+DEFAULT_PRICE = 100
+TIMESTAMP = "2026-01-01 00:00:00.000000"
+
+# Snapshot and broadcast builds are O(depth); cap their op count so large books stay quick
+MAX_SNAPSHOT_OPS = 2_000
+MAX_BROADCAST_OPS = 500
+# Orders submitted concurrently per burst; a burst counts as one op
+BURST_SIZE = 32
+
+ENGINES = ("sorted", "tick_ladder")
+
+
+def make_book(engine: str, levels: int):
+    return create_order_book({
+        "order_book_engine": engine,
+        "default_price": DEFAULT_PRICE,
+        "order_book_levels": levels,
+        "step": 1,
+    })
+
+
+def resting_flow(num_orders: int, levels: int, rng: random.Random) -> List[Dict]:
+    """Non-crossing orders spread over `levels` prices on each side."""
+    orders = []
+    for i in range(num_orders):
+        is_bid = rng.random() < 0.5
+        offset = rng.randint(1, levels)
+        orders.append({
+            "id": f"o{i}",
+            "trader_id": f"T{i % 50}",
+            "order_type": OrderType.BID.value if is_bid else OrderType.ASK.value,
+            "price": DEFAULT_PRICE - offset if is_bid else DEFAULT_PRICE + offset,
+            "amount": 1,
+            "timestamp": TIMESTAMP,
+        })
+    return orders
+
+
+def ask_ladder_flow(num_orders: int, levels: int, rng: random.Random) -> List[Dict]:
+    """Resting asks only, for crossing bids to consume."""
+    return [
+        {
+            "id": f"a{i}",
+            "trader_id": f"T{i % 50}",
+            "order_type": OrderType.ASK.value,
+            "price": DEFAULT_PRICE + rng.randint(1, levels),
+            "amount": 1,
+            "timestamp": TIMESTAMP,
+        }
+        for i in range(num_orders)
+    ]
+
+
+# Engine cases
+
+def engine_place(engine: str, num_orders: int, levels: int) -> CaseRun:
+    book = make_book(engine, levels)
+    orders = resting_flow(num_orders, levels, random.Random(SEED))
+    timer = Timer()
+    for order in orders:
+        with timer:
+            book.place_order(order)
+    return timer.run()
+
+
+def engine_cancel(engine: str, num_orders: int, levels: int) -> CaseRun:
+    rng = random.Random(SEED)
+    book = make_book(engine, levels)
+    orders = resting_flow(num_orders, levels, rng)
+    for order in orders:
+        book.place_order(order)
+    order_ids = [order["id"] for order in orders]
+    rng.shuffle(order_ids)
+    timer = Timer()
+    for order_id in order_ids:
+        with timer:
+            book.cancel_order(order_id)
+    return timer.run()
+
+
+def engine_match(engine: str, num_orders: int, levels: int) -> CaseRun:
+    rng = random.Random(SEED)
+    book = make_book(engine, levels)
+    for order in ask_ladder_flow(num_orders, levels, rng):
+        book.place_order(order)
+    takers = [
+        {
+            "id": f"b{i}",
+            "trader_id": "TAKER",
+            "order_type": OrderType.BID.value,
+            "price": DEFAULT_PRICE + levels,
+            "amount": 1,
+            "timestamp": TIMESTAMP,
+        }
+        for i in range(num_orders)
+    ]
+    timer = Timer()
+    for order in takers:
+        with timer:
+            _, can_be_matched = book.place_order(order)
+            if can_be_matched:
+                book.clear_orders()
+    return timer.run()
+
+
+def engine_snapshot(engine: str, num_orders: int, levels: int) -> CaseRun:
+    rng = random.Random(SEED)
+    book = make_book(engine, levels)
+    orders = resting_flow(num_orders, levels, rng)
+    for order in orders:
+        book.place_order(order)
+    timer = Timer()
+    for i in range(min(num_orders, MAX_SNAPSHOT_OPS)):
+        # Touch the book first so the snapshot cache cannot serve the call
+        order = orders[rng.randrange(num_orders)]
+        book.cancel_order(order["id"])
+        book.place_order(order)
+        with timer:
+            book.get_order_book_snapshot()
+    return timer.run()
+
+
+# Orchestrator cases
+
+def make_orchestrator(levels: int, market_id: str):
+    from core.handlers import MarketOrchestrator
+
+    orchestrator = MarketOrchestrator(
+        market_id, 1, DEFAULT_PRICE, 10, 10,
+        {"default_price": DEFAULT_PRICE, "order_book_levels": levels, "step": 1},
+    )
+    orchestrator.active = True
+    return orchestrator
+
+
+def drop_orchestrator(orchestrator) -> None:
+    """Detach and delete the trading log the orchestrator wrote."""
+    for handler in list(orchestrator.trading_logger.handlers):
+        handler.close()
+        orchestrator.trading_logger.removeHandler(handler)
+        if isinstance(handler, logging.FileHandler) and os.path.exists(handler.baseFilename):
+            os.remove(handler.baseFilename)
+
+
+def add_message(order: Dict) -> Dict:
+    return {
+        "type": "add_order",
+        "order_id": order["id"],
+        "trader_id": order["trader_id"],
+        "order_type": order["order_type"],
+        "price": order["price"],
+        "amount": order["amount"],
+    }
+
+
+def orchestrator_case(body: Callable) -> Callable[[int, int], CaseRun]:
+    """Run an async case body against a fresh orchestrator on its own loop."""
+    def run(num_orders: int, levels: int) -> CaseRun:
+        orchestrator = make_orchestrator(levels, f"bench_{body.__name__}_{num_orders}_{levels}")
+        try:
+            return asyncio.run(body(orchestrator, num_orders, levels))
+        finally:
+            drop_orchestrator(orchestrator)
+    return run
+
+
+@orchestrator_case
+async def orchestrator_add(orchestrator, num_orders: int, levels: int) -> CaseRun:
+    messages = [add_message(o) for o in resting_flow(num_orders, levels, random.Random(SEED))]
+    timer = Timer()
+    for message in messages:
+        with timer:
+            await orchestrator.handle_trader_message(message)
+    return timer.run()
+
+
+@orchestrator_case
+async def orchestrator_cancel(orchestrator, num_orders: int, levels: int) -> CaseRun:
+    rng = random.Random(SEED)
+    orders = resting_flow(num_orders, levels, rng)
+    for order in orders:
+        await orchestrator.handle_trader_message(add_message(order))
+    rng.shuffle(orders)
+    messages = [
+        {"type": "cancel_order", "order_id": order["id"], "trader_id": order["trader_id"]}
+        for order in orders
+    ]
+    timer = Timer()
+    for message in messages:
+        with timer:
+            await orchestrator.handle_trader_message(message)
+    return timer.run()
+
+
+@orchestrator_case
+async def orchestrator_match(orchestrator, num_orders: int, levels: int) -> CaseRun:
+    rng = random.Random(SEED)
+    for order in ask_ladder_flow(num_orders, levels, rng):
+        await orchestrator.handle_trader_message(add_message(order))
+    messages = [
+        {
+            "type": "add_order", "order_id": f"b{i}", "trader_id": "TAKER",
+            "order_type": OrderType.BID.value, "price": DEFAULT_PRICE + levels, "amount": 1,
+        }
+        for i in range(num_orders)
+    ]
+    timer = Timer()
+    for message in messages:
+        with timer:
+            await orchestrator.handle_trader_message(message)
+    return timer.run()
+
+
+@orchestrator_case
+async def orchestrator_add_burst(orchestrator, num_orders: int, levels: int) -> CaseRun:
+    messages = [add_message(o) for o in resting_flow(num_orders, levels, random.Random(SEED))]
+    timer = Timer()
+    for start in range(0, num_orders, BURST_SIZE):
+        burst = messages[start:start + BURST_SIZE]
+        with timer:
+            await asyncio.gather(*(orchestrator.handle_trader_message(m) for m in burst))
+    return timer.run()
+
+
+@orchestrator_case
+async def orchestrator_broadcast_build(orchestrator, num_orders: int, levels: int) -> CaseRun:
+    rng = random.Random(SEED)
+    orders = resting_flow(num_orders, levels, rng)
+    for order in orders:
+        await orchestrator.handle_trader_message(add_message(order))
+    book = orchestrator.order_book_manager.order_book
+    broadcast_service = orchestrator.broadcast_service
+    timer = Timer()
+    for _ in range(min(num_orders, MAX_BROADCAST_OPS)):
+        order = orders[rng.randrange(num_orders)]
+        book.cancel_order(order["id"])
+        book.place_order(dict(order))
+        with timer:
+            await broadcast_service.create_broadcast_message(
+                "BOOK_UPDATED", {"order_added": True}, None, 0
+            )
+    return timer.run()
+
+
+ENGINE_CASES = {
+    "place": engine_place,
+    "cancel": engine_cancel,
+    "match": engine_match,
+    "snapshot": engine_snapshot,
+}
+
+ORCHESTRATOR_CASES = {
+    "add_order": orchestrator_add,
+    "cancel_order": orchestrator_cancel,
+    "match": orchestrator_match,
+    "add_burst": orchestrator_add_burst,
+    "broadcast_build": orchestrator_broadcast_build,
+}
+
+# (orders, levels) per profile
+PROFILES: Dict[str, Tuple[List[Tuple[int, int]], List[Tuple[int, int]]]] = {
+    # Orchestrator cases also pay for trade logging and broadcast builds,
+    # so quick keeps them small
+    "quick": (
+        [(1_000, 10), (10_000, 100)],
+        [(1_000, 10), (2_000, 100)],
+    ),
+    "full": (
+        [(1_000, 10), (10_000, 100), (100_000, 1_000), (1_000_000, 10_000)],
+        [(1_000, 10), (10_000, 100), (100_000, 1_000)],
+    ),
+}
+
+
+def build_cases() -> Dict[str, Dict[str, Callable[[], CaseRun]]]:
+    cases = {}
+    for profile, (engine_sizes, orchestrator_sizes) in PROFILES.items():
+        selected = {}
+        for op, case in ENGINE_CASES.items():
+            for engine in ENGINES:
+                for num_orders, levels in engine_sizes:
+                    name = f"engine.{op}[{engine},orders={num_orders},levels={levels}]"
+                    selected[name] = (lambda c=case, e=engine, n=num_orders, l=levels: c(e, n, l))
+        for op, case in ORCHESTRATOR_CASES.items():
+            for num_orders, levels in orchestrator_sizes:
+                name = f"orchestrator.{op}[orders={num_orders},levels={levels}]"
+                selected[name] = (lambda c=case, n=num_orders, l=levels: c(n, l))
+        cases[profile] = selected
+    return cases
+
+
+if __name__ == "__main__":
+    sys.exit(main(build_cases(), BASELINE_PATH, "Matching engine benchmarks"))
@@ -0,0 +1,105 @@
+"""
+Event routing benchmarks.
+
+Routes add and cancel messages through `MessageRouter` and `MessageBus` into
+handlers that do no work, with the orchestrator's middleware installed, so
+the numbers isolate event construction, middleware and dispatch from the
+book and the sequencer (`bench_engine` covers those end to end). The
+`rate_limited` cases route the same adds through a rate limiter whose bucket
+is empty, to time a rejection.
+
+Usage (from back/):
+    python -m benchmarks.bench_events                      # quick profile, compare to baseline
+    python -m benchmarks.bench_events --profile full
+    python -m benchmarks.bench_events --update-baseline
+"""
+import asyncio
+import os
+import sys
+from typing import Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_engine import BASELINE_PATH, DEFAULT_PRICE
+from benchmarks.harness import CaseRun, Timer, main
+from core.data_models import OrderType
+from core.events import EventHandler, MessageBus, MessageRouter, OrderCancelledEvent, OrderPlacedEvent
+
+
+class NullHandler(EventHandler):
+    """Answers like the real handlers without touching a book."""
+
+    async def handle(self, event):
+        return {"type": "ACK", "respond": True}
+
+
+def make_router(rate_limiter=None) -> MessageRouter:
+    from core.handlers import LoggingMiddleware
+
+    bus = MessageBus()
+    bus.subscribe(OrderPlacedEvent, NullHandler())
+    bus.subscribe(OrderCancelledEvent, NullHandler())
+    bus.add_middleware(LoggingMiddleware(None))
+    return MessageRouter(bus, rate_limiter=rate_limiter)
+
+
+def exhausted_limiter():
+    from core.rate_limit import MarketRateLimiter
+
+    limiter = MarketRateLimiter({"HUMAN": {"messages_per_second": 0.001, "burst": 1}})
+    limiter.allow("T1")
+    return limiter
+
+
+def add_messages(num_ops: int) -> List[Dict]:
+    return [
+        {
+            "type": "add_order", "order_id": f"o{i}", "trader_id": "T1",
+            "order_type": OrderType.BID.value, "price": DEFAULT_PRICE, "amount": 1,
+        }
+        for i in range(num_ops)
+    ]
+
+
+def cancel_messages(num_ops: int) -> List[Dict]:
+    return [{"type": "cancel_order", "order_id": f"o{i}", "trader_id": "T1"} for i in range(num_ops)]
+
+
+async def route_case(messages: List[Dict], rate_limited: bool = False) -> CaseRun:
+    router = make_router(exhausted_limiter() if rate_limited else None)
+    timer = Timer()
+    for message in messages:
+        with timer:
+            await router.route_message(message)
+    return timer.run()
+
+
+MESSAGES: Dict[str, Callable[[int], List[Dict]]] = {
+    "add_order": add_messages,
+    "cancel_order": cancel_messages,
+}
+
+# Ops routed into an empty bucket
+RATE_LIMITED = {"add_order_rate_limited": add_messages}
+
+PROFILES: Dict[str, List[int]] = {
+    "quick": [20_000],
+    "full": [20_000, 200_000],
+}
+
+
+def build_cases() -> Dict[str, Dict[str, Callable[[], CaseRun]]]:
+    cases = {}
+    for profile, sizes in PROFILES.items():
+        selected = {}
+        for rate_limited, messages in ((False, MESSAGES), (True, RATE_LIMITED)):
+            for op, build in messages.items():
+                for num_ops in sizes:
+                    name = f"routing.{op}[ops={num_ops}]"
+                    selected[name] = lambda b=build, n=num_ops, r=rate_limited: asyncio.run(route_case(b(n), r))
+        cases[profile] = selected
+    return cases
+
+
+if __name__ == "__main__":
+    sys.exit(main(build_cases(), BASELINE_PATH, "Event routing benchmarks"))
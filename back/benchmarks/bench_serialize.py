@@ -0,0 +1,167 @@
+"""
+Outbound message serialization benchmarks.
+
+Encodes realistic book broadcasts, trade updates, time updates and human
+trader state both through the generic `sanitize_websocket_message` walk and
+through the typed encoders, so the two rows of each payload compare
+directly.
+
+Usage (from back/):
+    python -m benchmarks.bench_serialize                   # quick profile, compare to baseline
+    python -m benchmarks.bench_serialize --profile full    # larger books and histories
+    python -m benchmarks.bench_serialize --update-baseline
+"""
+import os
+import random
+import sys
+from typing import Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_engine import BASELINE_PATH, DEFAULT_PRICE, SEED, make_book, resting_flow
+from benchmarks.harness import CaseRun, Timer, main
+from core.data_models import ExecutionType, OrderType, TransactionModel
+from utils.websocket_utils import (
+    MESSAGE_ENCODERS, TRADER_STATE_ENCODER, MessageEncoder, dumps, sanitize_websocket_message,
+)
+
+# Encodes per case; the payload is built once, outside the timer
+ENCODE_OPS = 200
+
+
+def tape(num_trades: int, rng: random.Random) -> List[Dict]:
+    return [
+        TransactionModel(
+            trading_market_id="bench",
+            bid_order_id=f"b{i}",
+            ask_order_id=f"a{i}",
+            price=DEFAULT_PRICE + rng.randint(-5, 5),
+        ).to_dict()
+        for i in range(num_trades)
+    ]
+
+
+def book_message(num_orders: int, num_trades: int) -> Dict:
+    rng = random.Random(SEED)
+    book = make_book("sorted", 100)
+    for order in resting_flow(num_orders, 100, rng):
+        book.place_order(order)
+    spread, midpoint = book.get_spread()
+    return {
+        "type": "BOOK_UPDATED",
+        "current_time": "2026-01-01T00:00:00.000000+00:00",
+        "start_time": "2026-01-01T00:00:00.000000+00:00",
+        "duration": 5,
+        "order_book": book.get_order_book_snapshot(),
+        "active_orders": book.get_active_orders_to_broadcast(),
+        "spread": spread,
+        "midpoint": midpoint,
+        "transaction_price": float(DEFAULT_PRICE),
+        "incoming_message": {"informed_trader_progress": None},
+        "informed_trader_progress": None,
+        "order_added": True,
+        "history": tape(num_trades, rng),
+        "history_offset": 0,
+    }
+
+
+def trades_message(num_orders: int, num_trades: int) -> Dict:
+    return {
+        "type": "transaction_update",
+        "transactions": [
+            {"id": f"o{i}", "price": 101.0, "type": side, "amount": 1.0, "trader_id": f"T{i}"}
+            for i, side in enumerate(("ask", "bid"))
+        ],
+        "matched_orders": {
+            "bid_order_id": "o1", "ask_order_id": "o0", "transaction_price": 101.0,
+            "transaction_amount": 1.0, "bid_trader_id": "T1", "ask_trader_id": "T0",
+            "bid_price": 101.0, "ask_price": 101.0, "timestamp": "2026-01-01T00:00:00.000000",
+        },
+    }
+
+
+def time_update_message(num_orders: int, num_trades: int) -> Dict:
+    return {
+        "type": "time_update",
+        "data": {
+            "current_time": "2026-01-01T00:00:00.000000+00:00",
+            "is_trading_started": True,
+            "remaining_time": 123.4,
+            "current_human_traders": 4,
+            "expected_human_traders": 4,
+        },
+    }
+
+
+def trader_state_message(num_orders: int, num_trades: int) -> Dict:
+    book = book_message(num_orders, 0)
+    rows = book["active_orders"]
+    return {
+        "shares": 10, "cash": 1000.0, "pnl": 12.5, "type": "BOOK_UPDATED",
+        "inventory": {"shares": 10, "cash": 1000.0},
+        "goal": 20, "goal_progress": 5,
+        "trader_orders": rows[: len(rows) // 10],
+        "initial_cash": 1000.0, "initial_shares": 5, "sum_dinv": 5, "vwap": 100.5,
+        "filled_orders": [
+            {"id": f"o{i}", "price": 100.0 + i % 3, "amount": 1.0, "type": "bid", "timestamp": None}
+            for i in range(num_trades)
+        ],
+        "placed_orders": [
+            {"order_ids": [f"H_{i}"], "amount": 1, "price": 100, "order_type": OrderType.BID,
+             "execution_type": ExecutionType.LIMIT, "timestamp": 1234.5}
+            for i in range(num_trades)
+        ],
+        "order_book": book["order_book"],
+    }
+
+
+PAYLOADS: Dict[str, Tuple[Callable[[int, int], Dict], MessageEncoder]] = {
+    "book": (book_message, MESSAGE_ENCODERS["BOOK_UPDATED"]),
+    "trades": (trades_message, MESSAGE_ENCODERS["transaction_update"]),
+    "time_update": (time_update_message, MESSAGE_ENCODERS["time_update"]),
+    "trader_state": (trader_state_message, TRADER_STATE_ENCODER),
+}
+
+
+def serialize_case(payload: str, typed: bool, num_orders: int, num_trades: int) -> CaseRun:
+    build, encoder = PAYLOADS[payload]
+    message = build(num_orders, num_trades)
+    timer = Timer()
+    for _ in range(ENCODE_OPS):
+        if typed:
+            with timer:
+                encoder.encode(message)
+        else:
+            with timer:
+                dumps(sanitize_websocket_message(message))
+    return timer.run()
+
+
+# (orders, trades) per profile; fixed-size payloads only run at the first size
+PROFILES: Dict[str, List[Tuple[int, int]]] = {
+    "quick": [(100, 100), (1_000, 500)],
+    "full": [(100, 100), (1_000, 500), (10_000, 2_000)],
+}
+
+FIXED_SIZE_PAYLOADS = ("trades", "time_update")
+
+
+def build_cases() -> Dict[str, Dict[str, Callable[[], CaseRun]]]:
+    cases = {}
+    for profile, sizes in PROFILES.items():
+        selected = {}
+        for payload in PAYLOADS:
+            for num_orders, num_trades in sizes[:1] if payload in FIXED_SIZE_PAYLOADS else sizes:
+                for typed in (False, True):
+                    encoder = "typed" if typed else "sanitize"
+                    size = "" if payload in FIXED_SIZE_PAYLOADS else f",orders={num_orders},trades={num_trades}"
+                    name = f"serialize.{payload}[{encoder}{size}]"
+                    selected[name] = (
+                        lambda p=payload, t=typed, n=num_orders, h=num_trades: serialize_case(p, t, n, h)
+                    )
+        cases[profile] = selected
+    return cases
+
+
+if __name__ == "__main__":
+    sys.exit(main(build_cases(), BASELINE_PATH, "Outbound message serialization benchmarks"))
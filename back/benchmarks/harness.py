@@ -0,0 +1,177 @@
+"""
+Small benchmark harness: timing, percentiles, baselines and regression checks.
+
+A benchmark case is a callable returning a `CaseRun`: the per-op latencies in
+nanoseconds it measured. Cases time only the operation under test; any setup
+(populating a book, mutating it before a snapshot) stays outside the timer.
+"""
+import argparse
+import json
+import os
+import platform
+import time
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+
+@dataclass
+class CaseRun:
+    """Raw measurements of one benchmark case."""
+    latencies_ns: List[int]
+    total_ns: int
+
+
+@dataclass
+class BenchResult:
+    """Summary of one benchmark case."""
+    name: str
+    ops: int
+    ops_per_sec: float
+    p50_us: float
+    p99_us: float
+
+
+class Timer:
+    """Collects per-op latencies; use `with timer:` around the measured op."""
+    __slots__ = ("latencies_ns", "_start")
+
+    def __init__(self):
+        self.latencies_ns: List[int] = []
+        self._start = 0
+
+    def __enter__(self):
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.latencies_ns.append(time.perf_counter_ns() - self._start)
+        return False
+
+    def run(self) -> CaseRun:
+        return CaseRun(self.latencies_ns, sum(self.latencies_ns))
+
+
+def percentile(sorted_values: List[int], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return float(sorted_values[index])
+
+
+def summarize(name: str, run: CaseRun) -> BenchResult:
+    latencies = sorted(run.latencies_ns)
+    ops = len(latencies)
+    ops_per_sec = ops / (run.total_ns / 1e9) if run.total_ns else 0.0
+    return BenchResult(
+        name=name,
+        ops=ops,
+        ops_per_sec=round(ops_per_sec, 1),
+        p50_us=round(percentile(latencies, 50) / 1000, 3),
+        p99_us=round(percentile(latencies, 99) / 1000, 3),
+    )
+
+
+def load_baseline(path: str) -> Dict[str, Dict]:
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f).get("results", {})
+
+
+def save_baseline(path: str, results: Iterable[BenchResult], existing: Dict[str, Dict]) -> None:
+    merged = dict(existing)
+    merged.update({result.name: asdict(result) for result in results})
+    with open(path, "w") as f:
+        json.dump(
+            {
+                "machine": platform.platform(),
+                "python": platform.python_version(),
+                "results": dict(sorted(merged.items())),
+            },
+            f,
+            indent=2,
+        )
+        f.write("\n")
+
+
+def find_regressions(results: Iterable[BenchResult], baseline: Dict[str, Dict],
+                     threshold: float) -> List[Tuple[str, str]]:
+    """Cases whose throughput dropped, or p99 rose, by more than `threshold`."""
+    regressions = []
+    for result in results:
+        base = baseline.get(result.name)
+        if not base:
+            continue
+        if result.ops_per_sec < base["ops_per_sec"] * (1 - threshold):
+            regressions.append((
+                result.name,
+                f"ops/sec {result.ops_per_sec:,.0f} < baseline {base['ops_per_sec']:,.0f}",
+            ))
+        elif base["p99_us"] and result.p99_us > base["p99_us"] * (1 + threshold) * 2:
+            # p99 is noisy, so it only fails at twice the threshold
+            regressions.append((
+                result.name,
+                f"p99 {result.p99_us:.1f}us > baseline {base['p99_us']:.1f}us",
+            ))
+    return regressions
+
+
+def format_row(result: BenchResult, base: Optional[Dict]) -> str:
+    delta = ""
+    if base and base.get("ops_per_sec"):
+        change = (result.ops_per_sec / base["ops_per_sec"] - 1) * 100
+        delta = f"{change:+7.1f}%"
+    return (
+        f"{result.name:<60} {result.ops:>9,} {result.ops_per_sec:>14,.0f} "
+        f"{result.p50_us:>10.2f} {result.p99_us:>10.2f} {delta:>8}"
+    )
+
+
+def main(cases: Dict[str, Dict[str, Callable[[], CaseRun]]], baseline_path: str,
+         description: str, argv: Optional[List[str]] = None) -> int:
+    """Run `cases[profile]` and compare against the baseline file.
+
+    Exits non-zero when any case regresses beyond the threshold, so the
+    runner can gate engine changes.
+    """
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--profile", choices=sorted(cases), default="quick",
+                        help="which set of sizes to run (default: quick)")
+    parser.add_argument("--only", default="",
+                        help="run only cases whose name contains this substring")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed fractional slowdown before failing (default: 0.25)")
+    parser.add_argument("--baseline", default=baseline_path,
+                        help="baseline JSON file to compare against")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="write this run's results into the baseline file")
+    parser.add_argument("--json", dest="json_out", default=None,
+                        help="also write this run's results to a JSON file")
+    args = parser.parse_args(argv)
+
+    baseline = load_baseline(args.baseline)
+    selected = {name: case for name, case in cases[args.profile].items() if args.only in name}
+
+    print(f"{'case':<60} {'ops':>9} {'ops/sec':>14} {'p50 us':>10} {'p99 us':>10} {'vs base':>8}")
+    results = []
+    for name, case in selected.items():
+        result = summarize(name, case())
+        results.append(result)
+        print(format_row(result, baseline.get(name)), flush=True)
+
+    if args.json_out:
+        with open(args.json_out, "w") as f:
+            json.dump([asdict(result) for result in results], f, indent=2)
+
+    if args.update_baseline:
+        save_baseline(args.baseline, results, baseline)
+        print(f"\nBaseline updated: {args.baseline}")
+        return 0
+
+    regressions = find_regressions(results, baseline, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+        for name, reason in regressions:
+            print(f"  {name}: {reason}")
+        return 1
+    return 0
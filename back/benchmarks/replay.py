@@ -0,0 +1,160 @@
+"""
+Replay a market journal through a fresh `MarketOrchestrator`.
+
+Journals are written by markets created with `journal_enabled` (see
+core/journal.py). Every entry is scheduled in journal order, so each routed
+message reaches the sequencer in the order it did live; controls flip the
+market open and closed, close the book, run auctions and take checkpoints
+the same way. Each checkpoint digest is compared with the recorded one and
+the replay reports throughput. The trading log is not written during a
+replay, so throughput excludes it.
+
+Usage (from back/):
+    python -m benchmarks.replay logs/journal/MARKET_1.jsonl               # as fast as possible
+    python -m benchmarks.replay logs/journal/MARKET_1.jsonl --speed 10    # 10x recorded speed
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.journal import market_digest, read_journal
+
+
+@dataclass
+class CheckpointResult:
+    seq: int
+    recorded: Dict[str, Any]
+    replayed: Optional[Dict[str, Any]]
+
+    @property
+    def identical(self) -> bool:
+        return self.recorded == self.replayed
+
+
+@dataclass
+class ReplayReport:
+    market_id: str
+    messages: int
+    elapsed_s: float
+    checkpoints: List[CheckpointResult] = field(default_factory=list)
+
+    @property
+    def messages_per_s(self) -> float:
+        return self.messages / self.elapsed_s if self.elapsed_s else 0.0
+
+    @property
+    def identical(self) -> bool:
+        return all(checkpoint.identical for checkpoint in self.checkpoints)
+
+
+def make_orchestrator(header: Dict[str, Any]):
+    from core.handlers import MarketOrchestrator
+
+    # Only accepted messages were journaled, and replay timing differs, so no rate limits
+    params = {
+        **header["params"], "journal_enabled": False, "instrumentation_enabled": False,
+        "rate_limits": None, "market_rate_limit": None,
+    }
+    orchestrator = MarketOrchestrator(
+        header["market_id"], header["duration"], header["default_price"],
+        header["default_spread"], header["punishing_constant"], params,
+    )
+    # The replay keeps the market id (closure orders carry it) but not the market's log
+    trading_logger = logging.getLogger(f"trading_market_{header['market_id']}")
+    for handler in list(trading_logger.handlers):
+        trading_logger.removeHandler(handler)
+        handler.close()
+    trading_logger.addHandler(logging.NullHandler())
+    trading_logger.propagate = False
+    return orchestrator
+
+
+async def replay(path: str, speed: Optional[float] = None) -> ReplayReport:
+    """Feed a journal back through a new orchestrator; `speed` scales recorded time."""
+    header, entries = read_journal(path)
+    orchestrator = make_orchestrator(header)
+    # Live markets are open from initialization, before trading starts
+    orchestrator.active = True
+    replayed: Dict[int, Dict[str, Any]] = {}
+    checkpoints: List[CheckpointResult] = []
+
+    async def take_digest(seq: int):
+        replayed[seq] = market_digest(orchestrator)
+        return None, None
+
+    async def apply(entry: Dict[str, Any]):
+        if "msg" in entry:
+            await orchestrator.handle_trader_message(entry["msg"])
+            return
+        kind = entry["ctl"]
+        if kind == "start":
+            orchestrator.trading_started = True
+        elif kind == "stop":
+            orchestrator.active = False
+        elif kind == "close_book":
+            await orchestrator.sequencer.submit("close_book", orchestrator._close_book_command)
+        elif kind == "auction":
+            await orchestrator.sequencer.submit("auction", orchestrator._uncross)
+        elif kind == "checkpoint":
+            seq = entry["seq"]
+            await orchestrator.sequencer.submit("checkpoint", lambda: take_digest(seq))
+        elif kind == "digest":
+            checkpoints.append(CheckpointResult(entry["checkpoint"], entry["digest"], None))
+
+    started = time.perf_counter()
+    tasks = []
+    for entry in entries:
+        if speed:
+            delay = entry["t"] / 1e9 / speed - (time.perf_counter() - started)
+            if delay > 0:
+                await asyncio.sleep(delay)
+        # A task's first step runs up to its sequencer submit, in creation order
+        tasks.append(asyncio.create_task(apply(entry)))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+
+    await orchestrator.sequencer.close()
+    await orchestrator.broadcast_service.stop_flushing()
+    for checkpoint in checkpoints:
+        checkpoint.replayed = replayed.get(checkpoint.seq)
+    messages = sum(1 for entry in entries if "msg" in entry)
+    return ReplayReport(header["market_id"], messages, elapsed, checkpoints)
+
+
+def format_report(report: ReplayReport) -> str:
+    lines = [
+        f"{report.market_id}: {report.messages} messages in {report.elapsed_s:.3f}s "
+        f"({report.messages_per_s:,.0f} msg/s)"
+    ]
+    for checkpoint in report.checkpoints:
+        status = "identical" if checkpoint.identical else "MISMATCH"
+        lines.append(f"  checkpoint {checkpoint.seq}: {status}")
+        if not checkpoint.identical:
+            lines.append(f"    recorded: {checkpoint.recorded}")
+            lines.append(f"    replayed: {checkpoint.replayed}")
+    if not report.checkpoints:
+        lines.append("  no checkpoints recorded; nothing to verify")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Replay a market journal and verify it")
+    parser.add_argument("journal", help="path to a logs/journal/*.jsonl file")
+    parser.add_argument("--speed", type=float, default=None,
+                        help="multiple of recorded speed (default: as fast as possible)")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(replay(args.journal, args.speed))
+    print(format_report(report))
+    return 0 if report.identical else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
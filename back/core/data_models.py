@@ -55,6 +55,11 @@ class ThrottleConfig(BaseModel):
     max_orders_per_window: int = 1  # Only used if throttle_ms > 0
 
 
+class RateLimitConfig(BaseModel):
+    messages_per_second: float = 0  # 0 means no limit
+    burst: int = 1  # Messages accepted back to back from a full bucket
+
+
 # all the trading params - lots of them!
 class TradingParameters(BaseModel):
     # basic setup
@@ -241,6 +246,59 @@ class TradingParameters(BaseModel):
         title="Default Price",
         description="model_parameter",
     )
+    order_book_engine: str = Field(
+        default="sorted",
+        title="Order Book Engine (sorted or tick_ladder)",
+        description="model_parameter",
+    )
+    algo_aggressive_ioc: bool = Field(
+        default=True,
+        title="Algo Aggressive Orders Are Immediate-or-Cancel",
+        description="model_parameter",
+    )
+    matching_mode: str = Field(
+        default="continuous",
+        title="Matching Mode (continuous or batch_auction)",
+        description="model_parameter",
+    )
+    batch_auction_interval_ms: int = Field(
+        default=500,
+        title="Batch Auction Interval (ms)",
+        description="model_parameter",
+        gt=0,
+    )
+    # Book updates to browsers are coalesced to at most one per interval; 0 sends every one
+    broadcast_flush_interval_ms: int = Field(
+        default=50,
+        title="Broadcast Flush Interval (ms)",
+        description="model_parameter",
+        ge=0,
+    )
+    # Latency histograms per event type and stage, served at /admin/latency_metrics
+    instrumentation_enabled: bool = Field(
+        default=False,
+        title="Record Latency Histograms",
+        description="model_parameter",
+    )
+    instrumentation_summary_interval_s: int = Field(
+        default=60,
+        title="Latency Summary Interval in Market Log (s, 0 = off)",
+        description="model_parameter",
+        ge=0,
+    )
+    # Every routed message journaled to logs/journal/ for benchmarks/replay.py
+    journal_enabled: bool = Field(
+        default=False,
+        title="Journal Market Events for Replay",
+        description="model_parameter",
+    )
+    # Seeds the algorithmic traders' random generators and is journaled with the market
+    random_seed: int = Field(
+        default=0,
+        title="Random Seed for Algorithmic Traders (0 = draw one per market)",
+        description="model_parameter",
+        ge=0,
+    )
 
     conversion_rate: float = Field(
         default=1,
@@ -369,6 +427,27 @@ class TradingParameters(BaseModel):
         title="Throttle Settings Per Trader Type",
         description="model_parameter"
     )
+    # Enforced by the market's message router whatever the client does (core/rate_limit.py)
+    rate_limits: Dict[TraderType, RateLimitConfig] = Field(
+        default_factory=lambda: {
+            TraderType.HUMAN: RateLimitConfig(messages_per_second=20, burst=40),
+            TraderType.NOISE: RateLimitConfig(messages_per_second=200, burst=400),
+            TraderType.INFORMED: RateLimitConfig(messages_per_second=200, burst=400),
+            TraderType.MARKET_MAKER: RateLimitConfig(messages_per_second=200, burst=400),
+            TraderType.INITIAL_ORDER_BOOK: RateLimitConfig(),
+            TraderType.SIMPLE_ORDER: RateLimitConfig(),
+            TraderType.SPOOFING: RateLimitConfig(messages_per_second=200, burst=400),
+            TraderType.MANIPULATOR: RateLimitConfig(messages_per_second=200, burst=400),
+            TraderType.AGENTIC: RateLimitConfig(messages_per_second=20, burst=40),
+        },
+        title="Router Rate Limits Per Trader Type",
+        description="model_parameter"
+    )
+    market_rate_limit: RateLimitConfig = Field(
+        default_factory=lambda: RateLimitConfig(messages_per_second=5000, burst=10000),
+        title="Router Rate Limit for the Whole Market",
+        description="model_parameter"
+    )
 
     @field_validator('predefined_goals', mode='before')
     def validate_predefined_goals(cls, v):
@@ -405,6 +484,18 @@ class TradingParameters(BaseModel):
         else:
             return []
 
+    @field_validator('order_book_engine')
+    def validate_order_book_engine(cls, v):
+        if v not in ("sorted", "tick_ladder"):
+            raise ValueError("Order book engine must be 'sorted' or 'tick_ladder'!")
+        return v
+
+    @field_validator('matching_mode')
+    def validate_matching_mode(cls, v):
+        if v not in ("continuous", "batch_auction"):
+            raise ValueError("Matching mode must be 'continuous' or 'batch_auction'!")
+        return v
+
     def dump_params_by_description(self) -> dict:
         """organize params by their type"""
         result = {}
@@ -468,7 +559,10 @@ class LobsterEventType(IntEnum):
 # action types
 class ActionType(str, Enum):
     POST_NEW_ORDER = "add_order"
+    POST_NEW_ORDERS = "add_orders"
     CANCEL_ORDER = "cancel_order"
+    CANCEL_ALL = "cancel_all"
+    MODIFY_ORDER = "modify_order"
     UPDATE_BOOK_STATUS = "update_book_status"
     REGISTER = "register_me"
 
@@ -480,6 +574,12 @@ class OrderType(IntEnum):
 
 str_to_order_type = {"ask": OrderType.ASK, "bid": OrderType.BID}
 
+class ExecutionType(str, Enum):
+    LIMIT = "limit"    # rests until filled or cancelled
+    MARKET = "market"  # takes liquidity at any price, never rests
+    IOC = "ioc"        # immediate-or-cancel: fill what crosses, drop the rest
+    FOK = "fok"        # fill-or-kill: fill the whole amount at once or nothing
+
 class OrderStatus(str, Enum):
     BUFFERED = "buffered"
     ACTIVE = "active"
@@ -494,6 +594,7 @@ class Order(BaseModel):
     amount: float = 1
     price: float
     order_type: OrderType
+    execution_type: ExecutionType = ExecutionType.LIMIT
     timestamp: datetime = Field(default_factory=datetime.now)
     market_id: str
     trader_id: str  # gmail username
@@ -506,13 +607,14 @@ executor = ThreadPoolExecutor()
 
 # transaction stuff
 class TransactionModel:
-    def __init__(self, trading_market_id, bid_order_id, ask_order_id, price, informed_trader_progress=None):
+    def __init__(self, trading_market_id, bid_order_id, ask_order_id, price, informed_trader_progress=None, amount=1):
         self.id = uuid.uuid4()
         self.trading_market_id = trading_market_id
         self.bid_order_id = bid_order_id
         self.ask_order_id = ask_order_id
         self.timestamp = datetime.now(timezone.utc)
         self.price = price
+        self.amount = amount
         self.informed_trader_progress = informed_trader_progress
 
     def to_dict(self):
@@ -523,6 +625,7 @@ class TransactionModel:
             "ask_order_id": self.ask_order_id,
             "timestamp": self.timestamp.isoformat(),
             "price": self.price,
+            "amount": self.amount,
             "informed_trader_progress": self.informed_trader_progress
         }
 
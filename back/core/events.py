@@ -3,111 +3,134 @@ Event system for trading platform - replaces handle_X pattern with event-driven
 """
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import Dict, Any, Optional, List, Callable
-from datetime import datetime
+from typing import Dict, Any, Optional, List, Callable, Tuple
+from datetime import datetime, timedelta
 import asyncio
+import time
 import uuid
 
+from .rate_limit import LIMITED_MESSAGES
+
 
 # Base event classes
 class TradingEvent(ABC):
-    """Base class for all trading events."""
+    """
+    Base class for all trading events.
+    
+    Events are slotted and stamped lazily: creation records only a monotonic
+    nanosecond count, and the uuid and wall-clock timestamp are built the
+    first time something asks for them.
+    """
+    __slots__ = ("created_ns", "_id")
+    
     def __init__(self):
-        self.id = str(uuid.uuid4())
-        self.timestamp = datetime.now()
+        self.__post_init__()
+    
+    def __post_init__(self):
+        self.created_ns = time.monotonic_ns()
+        self._id = None
+    
+    @property
+    def id(self) -> str:
+        if self._id is None:
+            self._id = str(uuid.uuid4())
+        return self._id
+    
+    @property
+    def timestamp(self) -> datetime:
+        """Wall-clock creation time, derived from the monotonic stamp."""
+        return datetime.now() - timedelta(microseconds=(time.monotonic_ns() - self.created_ns) // 1000)
 
 
-@dataclass
+@dataclass(slots=True)
 class OrderPlacedEvent(TradingEvent):
     """Event emitted when an order is placed."""
     order_data: Dict[str, Any]
     trader_id: str
     informed_progress: Optional[str] = None
-    
-    def __post_init__(self):
-        super().__init__()
 
 
-@dataclass
+@dataclass(slots=True)
+class OrdersPlacedEvent(TradingEvent):
+    """Event emitted when a trader submits a batch of orders."""
+    orders: List[Dict[str, Any]]
+    trader_id: str
+
+
+@dataclass(slots=True)
 class OrderCancelledEvent(TradingEvent):
     """Event emitted when an order is cancelled."""
     order_id: str
     trader_id: str
-    
-    def __post_init__(self):
-        super().__init__()
 
 
-@dataclass
+@dataclass(slots=True)
+class AllOrdersCancelledEvent(TradingEvent):
+    """Event emitted when a trader cancels all its orders, optionally filtered."""
+    trader_id: str
+    order_type: Optional[int] = None
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
+
+
+@dataclass(slots=True)
+class OrderModifiedEvent(TradingEvent):
+    """Event emitted when a resting order is repriced or resized."""
+    order_id: str
+    trader_id: str
+    price: Optional[float] = None
+    amount: Optional[float] = None
+
+
+@dataclass(slots=True)
 class TraderRegisteredEvent(TradingEvent):
     """Event emitted when a trader registers."""
     trader_id: str
     trader_type: str
     gmail_username: Optional[str]
     trader_instance: Any
-    
-    def __post_init__(self):
-        super().__init__()
 
 
-@dataclass
+@dataclass(slots=True)
 class InventoryReportEvent(TradingEvent):
     """Event emitted when a trader reports inventory."""
     trader_id: str
     shares: int
     cash: float
-    
-    def __post_init__(self):
-        super().__init__()
 
 
-@dataclass
+@dataclass(slots=True)
 class TransactionCreatedEvent(TradingEvent):
     """Event emitted when a transaction is created."""
     transaction: Any
     transaction_details: Dict[str, Any]
-    
-    def __post_init__(self):
-        super().__init__()
 
 
-@dataclass
+@dataclass(slots=True)
 class OrderBookUpdatedEvent(TradingEvent):
     """Event emitted when the order book is updated."""
     update_type: str
     details: Dict[str, Any]
-    
-    def __post_init__(self):
-        super().__init__()
 
 
-@dataclass
+@dataclass(slots=True)
 class TradingStartedEvent(TradingEvent):
     """Event emitted when trading starts."""
     market_id: str
-    
-    def __post_init__(self):
-        super().__init__()
 
 
-@dataclass
+@dataclass(slots=True)
 class TradingStoppedEvent(TradingEvent):
     """Event emitted when trading stops."""
     market_id: str
-    
-    def __post_init__(self):
-        super().__init__()
 
 
-@dataclass
+@dataclass(slots=True)
 class StatusUpdateEvent(TradingEvent):
     """Event emitted when trader status changes."""
     trader_id: str
     trader_status: str
     trader_type: str = "noise"
-    
-    def __post_init__(self):
-        super().__init__()
 
 
 # Event handler interface
@@ -127,30 +150,43 @@ class MessageBus:
     def __init__(self):
         self.handlers: Dict[type, List[EventHandler]] = {}
         self.middleware: List[Callable] = []
+        # Precompiled by compile(): event type -> handlers, and the middleware chain
+        self._dispatch: Dict[type, Tuple[EventHandler, ...]] = {}
+        self._middleware: Tuple[Callable, ...] = ()
     
     def subscribe(self, event_type: type, handler: EventHandler):
         """Subscribe a handler to an event type."""
         if event_type not in self.handlers:
             self.handlers[event_type] = []
         self.handlers[event_type].append(handler)
+        self.compile()
     
     def add_middleware(self, middleware: Callable):
-        """Add middleware for cross-cutting concerns."""
+        """
+        Add middleware for cross-cutting concerns.
+        
+        Middleware with an `enabled` attribute is skipped while it is false;
+        it is read on every publish, so it can be toggled at runtime.
+        """
         self.middleware.append(middleware)
+        self.compile()
+    
+    def compile(self):
+        """Rebuild the dispatch table and the middleware chain."""
+        self._dispatch = {event_type: tuple(handlers) for event_type, handlers in self.handlers.items()}
+        self._middleware = tuple(self.middleware)
     
     async def publish(self, event: TradingEvent) -> List[Dict[str, Any]]:
         """Publish an event to all subscribers."""
         responses = []
         
         # Apply middleware
-        for middleware in self.middleware:
-            event = await middleware(event)
-        
-        # Get handlers for this event type
-        handlers = self.handlers.get(type(event), [])
+        for middleware in self._middleware:
+            if getattr(middleware, "enabled", True):
+                event = await middleware(event)
         
-        # Execute all handlers
-        for handler in handlers:
+        # Execute all handlers for this event type
+        for handler in self._dispatch.get(type(event), ()):
             try:
                 response = await handler.handle(event)
                 if response:
@@ -166,65 +202,109 @@ class MessageBus:
 class MessageRouter:
     """Routes external messages to events."""
     
-    def __init__(self, message_bus: MessageBus):
+    def __init__(self, message_bus: MessageBus, journal=None, rate_limiter=None):
         self.bus = message_bus
+        # Optional EventJournal recording every routed message, in routing order
+        self.journal = journal
+        # Optional MarketRateLimiter metering order traffic before it reaches the bus
+        self.rate_limiter = rate_limiter
+        # action type -> (event builder, status reported when no handler answers)
+        self.routes: Dict[str, Tuple[Callable[[Dict[str, Any]], TradingEvent], str]] = {
+            "add_order": (self._order_placed, "processing"),
+            "add_orders": (self._orders_placed, "processing"),
+            "cancel_order": (self._order_cancelled, "processing"),
+            "cancel_all": (self._all_orders_cancelled, "processing"),
+            "modify_order": (self._order_modified, "processing"),
+            "register_me": (self._trader_registered, "registered"),
+            "inventory_report": (self._inventory_report, "processed"),
+            "status_update": (self._status_update, "processed"),
+        }
     
     async def route_message(self, message: Dict[str, Any]) -> Dict[str, Any]:
         """Route an external message to appropriate event."""
         action_type = message.get("type", message.get("action"))
+        route = self.routes.get(action_type)
+        if route is None:
+            return {"status": "error", "message": f"Unknown message type: {action_type}"}
         
+        build_event, default_status = route
+        if (self.rate_limiter is not None and action_type in LIMITED_MESSAGES
+                and not self.rate_limiter.allow(message.get("trader_id"), len(message.get("orders") or ()) or 1)):
+            return {"status": "rate_limited", "message": "Rate limit exceeded"}
+        if self.journal is not None:
+            self.journal.record(message)
         try:
-            if action_type == "add_order":
-                event = OrderPlacedEvent(
-                    order_data=message,
-                    trader_id=message.get("trader_id"),
-                    informed_progress=message.get("informed_trader_progress")
-                )
-                responses = await self.bus.publish(event)
-                return self._merge_responses(responses, {"status": "processing"})
-            
-            elif action_type == "cancel_order":
-                event = OrderCancelledEvent(
-                    order_id=message.get("order_id"),
-                    trader_id=message.get("trader_id")
-                )
-                responses = await self.bus.publish(event)
-                return self._merge_responses(responses, {"status": "processing"})
-            
-            elif action_type == "register_me":
-                event = TraderRegisteredEvent(
-                    trader_id=message.get("trader_id"),
-                    trader_type=message.get("trader_type"),
-                    gmail_username=message.get("gmail_username"),
-                    trader_instance=message.get("trader_instance")
-                )
-                responses = await self.bus.publish(event)
-                return self._merge_responses(responses, {"status": "registered"})
-            
-            elif action_type == "inventory_report":
-                event = InventoryReportEvent(
-                    trader_id=message.get("trader_id"),
-                    shares=message.get("shares", 0),
-                    cash=message.get("cash", 0)
-                )
-                responses = await self.bus.publish(event)
-                return self._merge_responses(responses, {"status": "processed"})
-            
-            elif action_type == "status_update":
-                event = StatusUpdateEvent(
-                    trader_id=message.get("trader_id"),
-                    trader_status=message.get("trader_status", "active"),
-                    trader_type=message.get("trader_type", "noise")
-                )
-                responses = await self.bus.publish(event)
-                return self._merge_responses(responses, {"status": "processed"})
-            
-            else:
-                return {"status": "error", "message": f"Unknown message type: {action_type}"}
-        
+            responses = await self.bus.publish(build_event(message))
+            return self._merge_responses(responses, {"status": default_status})
         except Exception as e:
             return {"status": "error", "message": f"Error processing message: {str(e)}"}
     
+    @staticmethod
+    def _order_placed(message: Dict[str, Any]) -> OrderPlacedEvent:
+        return OrderPlacedEvent(
+            order_data=message,
+            trader_id=message.get("trader_id"),
+            informed_progress=message.get("informed_trader_progress")
+        )
+    
+    @staticmethod
+    def _orders_placed(message: Dict[str, Any]) -> OrdersPlacedEvent:
+        trader_id = message.get("trader_id")
+        return OrdersPlacedEvent(
+            orders=[{**order, "trader_id": trader_id} for order in message.get("orders", [])],
+            trader_id=trader_id
+        )
+    
+    @staticmethod
+    def _order_cancelled(message: Dict[str, Any]) -> OrderCancelledEvent:
+        return OrderCancelledEvent(
+            order_id=message.get("order_id"),
+            trader_id=message.get("trader_id")
+        )
+    
+    @staticmethod
+    def _all_orders_cancelled(message: Dict[str, Any]) -> AllOrdersCancelledEvent:
+        return AllOrdersCancelledEvent(
+            trader_id=message.get("trader_id"),
+            order_type=message.get("order_type"),
+            min_price=message.get("min_price"),
+            max_price=message.get("max_price")
+        )
+    
+    @staticmethod
+    def _order_modified(message: Dict[str, Any]) -> OrderModifiedEvent:
+        return OrderModifiedEvent(
+            order_id=message.get("order_id"),
+            trader_id=message.get("trader_id"),
+            price=message.get("price"),
+            amount=message.get("amount")
+        )
+    
+    @staticmethod
+    def _trader_registered(message: Dict[str, Any]) -> TraderRegisteredEvent:
+        return TraderRegisteredEvent(
+            trader_id=message.get("trader_id"),
+            trader_type=message.get("trader_type"),
+            gmail_username=message.get("gmail_username"),
+            trader_instance=message.get("trader_instance")
+        )
+    
+    @staticmethod
+    def _inventory_report(message: Dict[str, Any]) -> InventoryReportEvent:
+        return InventoryReportEvent(
+            trader_id=message.get("trader_id"),
+            shares=message.get("shares", 0),
+            cash=message.get("cash", 0)
+        )
+    
+    @staticmethod
+    def _status_update(message: Dict[str, Any]) -> StatusUpdateEvent:
+        return StatusUpdateEvent(
+            trader_id=message.get("trader_id"),
+            trader_status=message.get("trader_status", "active"),
+            trader_type=message.get("trader_type", "noise")
+        )
+    
     def _merge_responses(self, responses: List[Dict], default: Dict) -> Dict:
         """Merge multiple responses into one."""
         if not responses:
@@ -235,4 +315,4 @@ class MessageRouter:
             if response and response.get("status") != "processing":
                 return response
         
-        return default 
\ No newline at end of file
+        return default 
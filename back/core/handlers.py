@@ -1,50 +1,78 @@
 """
 Event handlers for trading platform - orchestrate services and manage side effects.
 """
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 import asyncio
+import logging
 from utils.utils import setup_custom_logger
 
 from .events import (
-    EventHandler, TradingEvent, OrderPlacedEvent, OrderCancelledEvent,
-    TraderRegisteredEvent, InventoryReportEvent,
+    EventHandler, TradingEvent, OrderPlacedEvent, OrdersPlacedEvent, OrderCancelledEvent,
+    AllOrdersCancelledEvent, OrderModifiedEvent, TraderRegisteredEvent, InventoryReportEvent,
 )
 from .services import (
     OrderService, TransactionService, PricingService, TraderService, BroadcastService,
-    OrderResult, CancelResult,
+    OrderResult, CancelResult, ModifyResult,
 )
+from .sequencer import BookUpdate, MarketSequencer
+from .instrumentation import InstrumentationMiddleware, InstrumentedLogger, MarketInstrumentation
+from .journal import EventJournal, market_digest
+from .rate_limit import MarketRateLimiter
 from .data_models import OrderType
 
 logger = setup_custom_logger(__name__)
 
 
+async def publish_matches(matches: List[Tuple[Dict, Dict, float]],
+                          transaction_service: TransactionService,
+                          broadcast_service: BroadcastService, trading_logger) -> None:
+    """Record matched orders as transactions, log them and notify everyone."""
+    transaction_results = await transaction_service.process_matches(matches)
+    
+    # Log matched orders
+    for ask, bid, transaction_price in matches:
+        match_data = {
+            "bid_order_id": str(bid["id"]),
+            "ask_order_id": str(ask["id"]),
+            "transaction_price": transaction_price,
+            "amount": min(bid["amount"], ask["amount"])
+        }
+        trading_logger.info(f"MATCHED_ORDER: {match_data}")
+    
+    # Broadcast transactions
+    for tx_result in transaction_results:
+        await broadcast_service.broadcast_to_websockets(tx_result.transaction_details)
+        await broadcast_service.send_to_traders(tx_result.transaction_details)
+
+
 class OrderHandler(EventHandler):
     """Handles order placement events."""
     
     def __init__(self, order_service: OrderService, transaction_service: TransactionService,
-                 broadcast_service: BroadcastService, trading_logger, order_lock: asyncio.Lock,
-                 market_id: str, is_active_func):
+                 broadcast_service: BroadcastService, trading_logger, sequencer: MarketSequencer,
+                 market_id: str, is_active_func, batch_auction: bool = False):
         self.order_service = order_service
         self.transaction_service = transaction_service
         self.broadcast_service = broadcast_service
         self.trading_logger = trading_logger
-        self.order_lock = order_lock
+        self.sequencer = sequencer
         self.market_id = market_id
         self.is_active_func = is_active_func
+        # Batch auctions broadcast the book once per batch instead of per order
+        self.batch_auction = batch_auction
     
     async def handle(self, event: OrderPlacedEvent) -> Optional[Dict[str, Any]]:
-        """Handle order placement with concurrency control."""
+        """Handle order placement through the market's sequencer."""
         # Check if market is active
         if not self.is_active_func():
             logger.critical("Order placement skipped because the trading market is not active.")
             return {"status": "error", "message": "Market not active"}
         
-        async with self.order_lock:
-            return await self._process_order(event)
+        return await self.sequencer.submit("add", lambda: self._process_order(event))
     
-    async def _process_order(self, event: OrderPlacedEvent) -> Dict[str, Any]:
-        """Process order placement."""
+    async def _process_order(self, event: OrderPlacedEvent) -> Tuple[Dict[str, Any], Optional[BookUpdate]]:
+        """Process order placement; the book update goes out with the sequencer batch."""
         # Set market ID
         event.order_data["market_id"] = self.market_id
         
@@ -59,59 +87,89 @@ class OrderHandler(EventHandler):
                 "content": "Record keeping order processed",
                 "respond": True,
                 "informed_trader_progress": event.informed_progress,
-            }
+            }, None
         
+        book_changed = await self._record_result(result)
+        
+        # Broadcast order book update, unless a non-resting order left it untouched
+        update = None
+        if book_changed and not self.batch_auction:
+            update = ({"order_added": True}, {"informed_trader_progress": event.informed_progress})
+        
+        response = {
+            "type": "ADDED_ORDER",
+            "content": "A",
+            "respond": True,
+            "informed_trader_progress": event.informed_progress,
+        }
+        if result.expired_order:
+            response["expired_amount"] = result.expired_order["amount"]
+        return response, update
+    
+    async def _record_result(self, result: OrderResult) -> bool:
+        """Log a placed order and publish its fills; returns whether the book changed."""
         # Log the order
         self.trading_logger.info(f"ADD_ORDER: {result.order}")
         
         # Process immediate matches
         if result.immediately_matched and result.matches:
-            transaction_results = await self.transaction_service.process_matches(result.matches)
-            
-            # Log matched orders
-            for ask, bid, transaction_price in result.matches:
-                match_data = {
-                    "bid_order_id": str(bid["id"]),
-                    "ask_order_id": str(ask["id"]),
-                    "transaction_price": transaction_price,
-                    "amount": min(bid["amount"], ask["amount"])
-                }
-                self.trading_logger.info(f"MATCHED_ORDER: {match_data}")
-            
-            # Broadcast transactions
-            for tx_result in transaction_results:
-                await self.broadcast_service.broadcast_to_websockets(tx_result.transaction_details)
-                await self.broadcast_service.send_to_traders(tx_result.transaction_details)
+            await publish_matches(
+                result.matches, self.transaction_service,
+                self.broadcast_service, self.trading_logger
+            )
         
-        # Broadcast order book update
-        message = await self.broadcast_service.create_broadcast_message(
-            "BOOK_UPDATED",
-            {"order_added": True},
-            None,  # start_time will be set elsewhere
-            0,     # duration will be set elsewhere
-            {"informed_trader_progress": event.informed_progress}
-        )
+        # The unfilled part of a non-resting order never reached the book
+        if result.expired_order:
+            self.trading_logger.info(f"CANCEL_ORDER: {result.expired_order}")
         
-        await self.broadcast_service.broadcast_to_websockets(message)
-        await self.broadcast_service.send_to_traders(message)
+        return bool(result.matches) or result.expired_order is None
+
+
+class BulkOrderHandler(OrderHandler):
+    """Handles a batch of orders as one sequenced command with one broadcast."""
+    
+    async def handle(self, event: OrdersPlacedEvent) -> Optional[Dict[str, Any]]:
+        """Handle batch order placement."""
+        if not self.is_active_func():
+            logger.critical("Bulk order placement skipped because the trading market is not active.")
+            return {"status": "error", "message": "Market not active"}
+        
+        return await self.sequencer.submit("add", lambda: self._process_orders(event))
+    
+    async def _process_orders(self, event: OrdersPlacedEvent) -> Tuple[Dict[str, Any], Optional[BookUpdate]]:
+        for order_data in event.orders:
+            order_data["market_id"] = self.market_id
+        results = await self.order_service.process_orders(event.orders)
+        
+        book_changed = False
+        for result in results:
+            if result.order.get("is_record_keeping"):
+                self.trading_logger.info(f"RECORD_KEEPING_ORDER: {result.order}")
+                continue
+            book_changed = await self._record_result(result) or book_changed
+        
+        update = None
+        if book_changed and not self.batch_auction:
+            update = ({"order_added": True, "orders_added": len(results)}, None)
         
         return {
-            "type": "ADDED_ORDER",
-            "content": "A",
+            "type": "ADDED_ORDERS",
+            "order_ids": [result.order["id"] for result in results],
             "respond": True,
-            "informed_trader_progress": event.informed_progress,
-        }
+        }, update
 
 
 class CancelHandler(EventHandler):
     """Handles order cancellation events."""
     
     def __init__(self, order_service: OrderService, broadcast_service: BroadcastService,
-                 trading_logger, is_active_func):
+                 trading_logger, sequencer: MarketSequencer, is_active_func, batch_auction: bool = False):
         self.order_service = order_service
         self.broadcast_service = broadcast_service
         self.trading_logger = trading_logger
+        self.sequencer = sequencer
         self.is_active_func = is_active_func
+        self.batch_auction = batch_auction
     
     async def handle(self, event: OrderCancelledEvent) -> Optional[Dict[str, Any]]:
         """Handle order cancellation."""
@@ -120,6 +178,9 @@ class CancelHandler(EventHandler):
             logger.critical("Order cancellation skipped because the trading market is not active.")
             return {"status": "error", "message": "Market not active"}
         
+        return await self.sequencer.submit("cancel", lambda: self._cancel_order(event))
+    
+    async def _cancel_order(self, event: OrderCancelledEvent) -> Tuple[Dict[str, Any], Optional[BookUpdate]]:
         try:
             # Cancel order through service
             result: CancelResult = await self.order_service.cancel_order(event.order_id)
@@ -128,30 +189,115 @@ class CancelHandler(EventHandler):
                 # Log cancellation with complete order details
                 self.trading_logger.info(f"CANCEL_ORDER: {result.order}")
                 
-                # Broadcast update
-                message = await self.broadcast_service.create_broadcast_message(
-                    "BOOK_UPDATED",
-                    {"order_cancelled": True, "order_id": event.order_id},
-                    None, 0  # timing info will be set elsewhere
-                )
-                
-                await self.broadcast_service.broadcast_to_websockets(message)
-                await self.broadcast_service.send_to_traders(message)
+                # Broadcast update with the rest of the batch
+                update = None
+                if not self.batch_auction:
+                    update = ({"order_cancelled": True, "order_id": event.order_id}, None)
                 
                 return {
                     "status": "cancel success",
                     "order_id": event.order_id,
                     "type": "ORDER_CANCELLED",
                     "respond": True,
-                }
+                }, update
             else:
                 return {
                     "status": "failed",
                     "reason": result.reason,
-                }
+                }, None
         
         except Exception as e:
-            return {"status": "failed", "reason": str(e)}
+            return {"status": "failed", "reason": str(e)}, None
+
+
+class CancelAllHandler(EventHandler):
+    """Handles mass cancellation of one trader's orders."""
+    
+    def __init__(self, order_service: OrderService, broadcast_service: BroadcastService,
+                 trading_logger, sequencer: MarketSequencer, is_active_func, batch_auction: bool = False):
+        self.order_service = order_service
+        self.broadcast_service = broadcast_service
+        self.trading_logger = trading_logger
+        self.sequencer = sequencer
+        self.is_active_func = is_active_func
+        self.batch_auction = batch_auction
+    
+    async def handle(self, event: AllOrdersCancelledEvent) -> Optional[Dict[str, Any]]:
+        """Cancel every matching order in one pass and broadcast once."""
+        if not self.is_active_func():
+            logger.critical("Mass cancellation skipped because the trading market is not active.")
+            return {"status": "error", "message": "Market not active"}
+        
+        return await self.sequencer.submit("cancel", lambda: self._cancel_all(event))
+    
+    async def _cancel_all(self, event: AllOrdersCancelledEvent) -> Tuple[Dict[str, Any], Optional[BookUpdate]]:
+        cancelled = await self.order_service.cancel_all(
+            event.trader_id, event.order_type, event.min_price, event.max_price
+        )
+        for order in cancelled:
+            self.trading_logger.info(f"CANCEL_ORDER: {order}")
+        
+        update = None
+        if cancelled and not self.batch_auction:
+            update = ({"order_cancelled": True, "orders_cancelled": len(cancelled)}, None)
+        
+        return {
+            "status": "cancel success",
+            "order_ids": [order["id"] for order in cancelled],
+            "type": "ORDERS_CANCELLED",
+            "respond": True,
+        }, update
+
+
+class ModifyHandler(EventHandler):
+    """Handles cancel-replace of resting orders."""
+    
+    def __init__(self, order_service: OrderService, transaction_service: TransactionService,
+                 broadcast_service: BroadcastService, trading_logger, sequencer: MarketSequencer,
+                 is_active_func, batch_auction: bool = False):
+        self.order_service = order_service
+        self.transaction_service = transaction_service
+        self.broadcast_service = broadcast_service
+        self.trading_logger = trading_logger
+        self.sequencer = sequencer
+        self.is_active_func = is_active_func
+        self.batch_auction = batch_auction
+    
+    async def handle(self, event: OrderModifiedEvent) -> Optional[Dict[str, Any]]:
+        """Handle order modification as one book operation with one broadcast."""
+        if not self.is_active_func():
+            logger.critical("Order modification skipped because the trading market is not active.")
+            return {"status": "error", "message": "Market not active"}
+        
+        return await self.sequencer.submit("modify", lambda: self._modify_order(event))
+    
+    async def _modify_order(self, event: OrderModifiedEvent) -> Tuple[Dict[str, Any], Optional[BookUpdate]]:
+        result: ModifyResult = await self.order_service.modify_order(
+            event.order_id, event.price, event.amount
+        )
+        if not result.success:
+            return {"status": "failed", "reason": result.reason}, None
+        
+        # Logged as cancel + add so the log analysis sees the usual lifecycle
+        self.trading_logger.info(f"CANCEL_ORDER: {result.old_order}")
+        self.trading_logger.info(f"ADD_ORDER: {result.order}")
+        
+        if result.matches:
+            await publish_matches(
+                result.matches, self.transaction_service,
+                self.broadcast_service, self.trading_logger
+            )
+        
+        update = None
+        if not self.batch_auction:
+            update = ({"order_modified": True, "order_id": event.order_id}, None)
+        
+        return {
+            "status": "modify success",
+            "order_id": event.order_id,
+            "type": "ORDER_MODIFIED",
+            "respond": True,
+        }, update
 
 
 class RegistrationHandler(EventHandler):
@@ -175,15 +321,19 @@ class InventoryHandler(EventHandler):
     
     def __init__(self, trader_service: TraderService, pricing_service: PricingService,
                  order_service: OrderService, transaction_service: TransactionService,
-                 market_id: str):
+                 market_id: str, sequencer: MarketSequencer):
         self.trader_service = trader_service
         self.pricing_service = pricing_service
         self.order_service = order_service
         self.transaction_service = transaction_service
         self.market_id = market_id
+        self.sequencer = sequencer
     
     async def handle(self, event: InventoryReportEvent) -> Optional[Dict[str, Any]]:
-        """Handle inventory report."""
+        """Handle inventory report; closure orders are sequenced with the rest of the book."""
+        return await self.sequencer.submit("inventory", lambda: self._close_inventory(event))
+    
+    async def _close_inventory(self, event: InventoryReportEvent) -> Tuple[Dict[str, Any], Optional[BookUpdate]]:
         # Process inventory through trader service
         closure_orders = await self.trader_service.process_inventory_report(
             event.trader_id, event.shares, self.pricing_service
@@ -214,7 +364,7 @@ class InventoryHandler(EventHandler):
                     closure_price,
                 )
         
-        return {}
+        return {}, None
 
 
 class StatusHandler(EventHandler):
@@ -248,6 +398,11 @@ class LoggingMiddleware:
     def __init__(self, trading_logger):
         self.trading_logger = trading_logger
     
+    @property
+    def enabled(self) -> bool:
+        # Only debug output, so the bus leaves it out unless debug logging is on
+        return logger.isEnabledFor(logging.DEBUG)
+    
     async def __call__(self, event: TradingEvent) -> TradingEvent:
         """Log event details."""
         # Log basic event info (can be extended)
@@ -269,27 +424,58 @@ class MarketOrchestrator:
         from .transaction_manager import TransactionManager
         from utils.utils import setup_trading_logger
         
-        self.order_book_manager = OrderBookManager()
+        # Opt-in latency histograms; the trading logger is wrapped so its writes are timed
+        self.instrumentation = MarketInstrumentation(params.get("instrumentation_enabled", False))
+        self.latency_summary_interval = params.get("instrumentation_summary_interval_s", 60)
+        self.latency_summary_task = None
+        
+        self.order_book_manager = OrderBookManager(params)
         self.transaction_manager = TransactionManager(market_id)
-        self.trading_logger = setup_trading_logger(market_id)
-        self.order_lock = asyncio.Lock()
+        self.trading_logger = InstrumentedLogger(setup_trading_logger(market_id), self.instrumentation)
+        
+        # Matching mode
+        self.batch_auction = params.get("matching_mode", "continuous") == "batch_auction"
+        self.batch_auction_interval = params.get("batch_auction_interval_ms", 500) / 1000
+        self.batch_auction_task = None
+        self._auction_book_version = -1
         
         # Services
         self.pricing_service = PricingService(default_price, default_spread, punishing_constant)
-        self.order_service = OrderService(self.order_book_manager, self.pricing_service)
+        self.order_service = OrderService(
+            self.order_book_manager, self.pricing_service, self.batch_auction
+        )
         self.transaction_service = TransactionService(self.transaction_manager)
         self.trader_service = TraderService()
         self.broadcast_service = BroadcastService(
-            self.order_book_manager, self.transaction_manager, self.pricing_service
+            self.order_book_manager, self.transaction_manager, self.pricing_service,
+            params.get("broadcast_flush_interval_ms", 50) / 1000,
+            params.get("step") or 1,
+            self.instrumentation,
         )
         
         # Connect services
         self.broadcast_service.set_trader_registry(self.trader_service.connected_traders)
         
+        # Single writer for the book: every book command is queued and applied in order
+        self.sequencer = MarketSequencer(self._publish_batch, instrumentation=self.instrumentation)
+        
+        # Opt-in journal of every routed message, for replaying the session
+        self.journal: Optional[EventJournal] = None
+        if params.get("journal_enabled", False):
+            self.journal = EventJournal.open(market_id, {
+                "duration": duration,
+                "default_price": default_price,
+                "default_spread": default_spread,
+                "punishing_constant": punishing_constant,
+                "params": params,
+                "rng_seeds": {"market": params.get("random_seed")},
+            })
+        
         # Event system
         from .events import MessageBus, MessageRouter
         self.message_bus = MessageBus()
-        self.message_router = MessageRouter(self.message_bus)
+        self.rate_limiter = MarketRateLimiter.from_params(params, self._trader_type)
+        self.message_router = MessageRouter(self.message_bus, self.journal, self.rate_limiter)
         
         # State
         self.active = False
@@ -308,19 +494,36 @@ class MarketOrchestrator:
         # Create handlers
         order_handler = OrderHandler(
             self.order_service, self.transaction_service, self.broadcast_service,
-            self.trading_logger, self.order_lock, self.market_id, lambda: self.active
+            self.trading_logger, self.sequencer, self.market_id, lambda: self.active,
+            self.batch_auction
         )
         
         cancel_handler = CancelHandler(
             self.order_service, self.broadcast_service, self.trading_logger,
-            lambda: self.active
+            self.sequencer, lambda: self.active, self.batch_auction
+        )
+        
+        bulk_order_handler = BulkOrderHandler(
+            self.order_service, self.transaction_service, self.broadcast_service,
+            self.trading_logger, self.sequencer, self.market_id, lambda: self.active,
+            self.batch_auction
+        )
+        
+        cancel_all_handler = CancelAllHandler(
+            self.order_service, self.broadcast_service, self.trading_logger,
+            self.sequencer, lambda: self.active, self.batch_auction
+        )
+        
+        modify_handler = ModifyHandler(
+            self.order_service, self.transaction_service, self.broadcast_service,
+            self.trading_logger, self.sequencer, lambda: self.active, self.batch_auction
         )
         
         registration_handler = RegistrationHandler(self.trader_service)
         
         inventory_handler = InventoryHandler(
             self.trader_service, self.pricing_service, self.order_service,
-            self.transaction_service, self.market_id
+            self.transaction_service, self.market_id, self.sequencer
         )
         
         status_handler = StatusHandler(self.broadcast_service)
@@ -329,18 +532,32 @@ class MarketOrchestrator:
         from .events import OrderPlacedEvent, OrderCancelledEvent, TraderRegisteredEvent, InventoryReportEvent, StatusUpdateEvent
         self.message_bus.subscribe(OrderPlacedEvent, order_handler)
         self.message_bus.subscribe(OrderCancelledEvent, cancel_handler)
+        self.message_bus.subscribe(OrdersPlacedEvent, bulk_order_handler)
+        self.message_bus.subscribe(AllOrdersCancelledEvent, cancel_all_handler)
+        self.message_bus.subscribe(OrderModifiedEvent, modify_handler)
         self.message_bus.subscribe(TraderRegisteredEvent, registration_handler)
         self.message_bus.subscribe(InventoryReportEvent, inventory_handler)
         self.message_bus.subscribe(StatusUpdateEvent, status_handler)
         
-        # Add logging middleware
+        # Add logging and (opt-in) instrumentation middleware
         self.message_bus.add_middleware(LoggingMiddleware(self.trading_logger))
+        self.message_bus.add_middleware(InstrumentationMiddleware(self.instrumentation))
     
     # Public interface (same as original TradingPlatform)
     async def handle_trader_message(self, message: Dict[str, Any]) -> Dict[str, Any]:
         """Main entry point - route messages to event system."""
         return await self.message_router.route_message(message)
     
+    async def _publish_batch(self, updates: List[BookUpdate]):
+        """Send one book update for everything a sequencer batch changed."""
+        base_message, incoming_message = {}, None
+        for update, incoming in updates:
+            base_message.update(update)
+            incoming_message = incoming or incoming_message
+        if len(updates) > 1:
+            base_message["batched_updates"] = len(updates)
+        await self.broadcast_service.publish_book_update(base_message, incoming_message)
+    
     def register_websocket(self, websocket):
         """Register WebSocket connection."""
         self.broadcast_service.register_websocket(websocket)
@@ -348,4 +565,192 @@ class MarketOrchestrator:
     def unregister_websocket(self, websocket):
         """Unregister WebSocket connection."""
         self.broadcast_service.unregister_websocket(websocket)
-    
\ No newline at end of file
+
+    async def subscribe_book_deltas(self, websocket):
+        """Switch a WebSocket to sequenced book deltas."""
+        await self.broadcast_service.subscribe_deltas(websocket)
+
+    async def resync_book(self, websocket):
+        """Resend the full book to a delta subscriber."""
+        await self.broadcast_service.send_snapshot(websocket)
+    
+    # Router rate limits
+    def _trader_type(self, trader_id: str) -> Optional[str]:
+        return self.trader_service.connected_traders.get(trader_id, {}).get("trader_type")
+    
+    def get_rate_limit_metrics(self) -> Dict[str, Any]:
+        """Messages accepted and rejected by the router's rate limits."""
+        if self.rate_limiter is None:
+            return {"enabled": False}
+        return {"enabled": True, **self.rate_limiter.metrics()}
+    
+    # Event journal
+    def journal_control(self, kind: str, **fields):
+        """Journal a lifecycle step the replay has to repeat (or, like rng_seeds, a record of one)."""
+        if self.journal is not None:
+            self.journal.control(kind, **fields)
+    
+    async def journal_checkpoint(self):
+        """Journal a digest of the book and trades, taken in sequencer order."""
+        if self.journal is None or self.journal.closed:
+            return
+        checkpoint = self.journal.control("checkpoint")
+        await self.sequencer.submit("checkpoint", lambda: self._digest_command(checkpoint))
+    
+    async def _digest_command(self, checkpoint: int):
+        self.journal.control("digest", checkpoint=checkpoint, digest=market_digest(self))
+        return None, None
+    
+    async def close_journal(self):
+        """Write a final checkpoint and close the journal."""
+        if self.journal is None or self.journal.closed:
+            return
+        await self.journal_checkpoint()
+        self.journal.close()
+    
+    async def close_book(self) -> None:
+        """Close out the book, after every command queued before it."""
+        self.journal_control("close_book")
+        await self.sequencer.submit("close_book", self._close_book_command)
+    
+    async def _close_book_command(self):
+        await self.close_existing_book()
+        return None, None
+    
+    async def close_existing_book(self) -> None:
+        """Cross every resting order with a platform order at its closure price."""
+        active_orders = self.order_book_manager.order_book.active_orders
+        
+        # Placing closure orders mutates the book, so walk a copy
+        for order_id, order in list(active_orders.items()):
+            platform_order_type = (
+                OrderType.ASK.value
+                if order["order_type"] == OrderType.BID
+                else OrderType.BID
+            )
+            closure_price = self.pricing_service.calculate_closure_price(
+                order["amount"], order["order_type"]
+            )
+            
+            from .data_models import Order, OrderStatus
+            platform_order = Order(
+                trader_id=self.market_id,
+                order_type=platform_order_type,
+                amount=order["amount"],
+                price=closure_price,
+                status=OrderStatus.BUFFERED.value,
+                market_id=self.market_id,
+            )
+            
+            # Place platform order
+            await self.order_service.process_order(platform_order.model_dump())
+            
+            # Create transaction
+            if order["order_type"] == OrderType.BID:
+                await self.transaction_service.create_transaction(
+                    order, platform_order.model_dump(), closure_price
+                )
+            else:
+                await self.transaction_service.create_transaction(
+                    platform_order.model_dump(), order, closure_price
+                )
+        
+        # Broadcast book updated
+        message = await self.broadcast_service.create_broadcast_message(
+            "BOOK_UPDATED", {"text": "book is updated"}, self.start_time, self.duration
+        )
+        await self.broadcast_service.broadcast_to_websockets(message)
+        await self.broadcast_service.send_to_traders(message)
+    
+    # Latency instrumentation
+    def set_instrumentation(self, enabled: bool):
+        """Turn latency recording on or off for this market."""
+        self.instrumentation.enabled = enabled
+    
+    def get_latency_metrics(self) -> Dict[str, Any]:
+        """Per event type and stage latency summaries, plus sequencer counters."""
+        return {**self.instrumentation.snapshot(), "sequencer": self.sequencer.metrics()}
+    
+    def start_latency_summaries(self):
+        """Periodically write a latency summary to the market log while instrumented."""
+        if self.latency_summary_interval > 0 and self.latency_summary_task is None:
+            self.latency_summary_task = asyncio.create_task(self._run_latency_summaries())
+    
+    async def stop_latency_summaries(self):
+        """Stop the periodic summaries and log a final one."""
+        if self.latency_summary_task is None:
+            return
+        self.latency_summary_task.cancel()
+        try:
+            await self.latency_summary_task
+        except asyncio.CancelledError:
+            pass
+        self.latency_summary_task = None
+        self.log_latency_summary()
+    
+    async def _run_latency_summaries(self):
+        while True:
+            await asyncio.sleep(self.latency_summary_interval)
+            self.log_latency_summary()
+    
+    def log_latency_summary(self):
+        if self.instrumentation.enabled and self.instrumentation.histograms:
+            self.trading_logger.info(f"LATENCY_SUMMARY: {self.instrumentation.summary_line()}")
+    
+    # Batch auction mode
+    def start_batch_auctions(self):
+        """Start the periodic call auction if this market runs in batch mode."""
+        if self.batch_auction and self.batch_auction_task is None:
+            self.batch_auction_task = asyncio.create_task(self._run_batch_auctions())
+    
+    async def stop_batch_auctions(self):
+        """Stop the periodic call auction and uncross whatever is left."""
+        if self.batch_auction_task is None:
+            return
+        self.batch_auction_task.cancel()
+        try:
+            await self.batch_auction_task
+        except asyncio.CancelledError:
+            pass
+        self.batch_auction_task = None
+        await self.run_batch_auction()
+    
+    async def _run_batch_auctions(self):
+        while True:
+            await asyncio.sleep(self.batch_auction_interval)
+            try:
+                await self.run_batch_auction()
+            except Exception as e:
+                logger.error(f"Batch auction failed in market {self.market_id}: {e}")
+    
+    async def run_batch_auction(self) -> List[Tuple[Dict, Dict, float]]:
+        """Uncross the book once and broadcast the result as a single book update."""
+        self.journal_control("auction")
+        return await self.sequencer.submit("auction", self._uncross)
+    
+    async def _uncross(self) -> Tuple[List[Tuple[Dict, Dict, float]], None]:
+        order_book = self.order_book_manager.order_book
+        matches = await self.order_service.run_auction()
+        if not matches and order_book.version == self._auction_book_version:
+            return matches, None
+        
+        if matches:
+            await publish_matches(
+                matches, self.transaction_service,
+                self.broadcast_service, self.trading_logger
+            )
+        self._auction_book_version = order_book.version
+        
+        # The auction result carries its own clearing details, so it is sent here
+        message = await self.broadcast_service.create_broadcast_message(
+            "BOOK_UPDATED",
+            {
+                "batch_auction": True,
+                "clearing_price": matches[0][2] if matches else None,
+                "matched_volume": sum(ask["amount"] for ask, _, _ in matches),
+            },
+            self.start_time, self.duration
+        )
+        await self.broadcast_service.broadcast_to_websockets(message)
+        await self.broadcast_service.send_to_traders(message)
+        return matches, None
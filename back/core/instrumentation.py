@@ -0,0 +1,233 @@
+"""
+Opt-in latency instrumentation for one market.
+
+Each market keeps HDR-style histograms keyed by (event type, stage), where
+the stages follow an order from the sequencer queue to the clients:
+
+    queue_wait       submitted to the sequencer -> its command starts
+    engine           the command itself, minus the stages below it spent inside
+    logging          trading log writes
+    broadcast_build  assembling a BOOK_UPDATED-style message from the book
+    encode           encoding a message into a wire frame
+    fanout           queueing frames to every websocket writer
+    trader_notify    posting a message to every trader mailbox
+
+Command stages are keyed by the sequencer command kind, broadcast stages by
+the message type. Everything is off until the market is created with
+`instrumentation_enabled` (or an admin turns it on); disabled, each probe is
+one attribute check.
+"""
+import math
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+STAGES = ("queue_wait", "engine", "logging", "broadcast_build", "encode", "fanout", "trader_notify")
+
+# Stages measured inside a sequencer command; engine time excludes them
+NESTED_STAGES = frozenset(("logging", "broadcast_build", "encode", "fanout", "trader_notify"))
+
+
+class LatencyHistogram:
+    """
+    Log-linear nanosecond histogram in the style of HdrHistogram.
+
+    Values below 2 * SUB_BUCKETS are exact; above that every power of two is
+    split into SUB_BUCKETS buckets, so a reported percentile is within
+    1 / SUB_BUCKETS of the true value. Recording is O(1) and memory grows
+    with the range of values seen, not with their number.
+    """
+    __slots__ = ("counts", "count", "total_ns", "min_ns", "max_ns")
+
+    SUB_BUCKET_BITS = 4
+    SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+
+    def __init__(self):
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.total_ns = 0
+        self.min_ns = 0
+        self.max_ns = 0
+
+    @classmethod
+    def bucket_index(cls, value: int) -> int:
+        if value < 2 * cls.SUB_BUCKETS:
+            return value
+        shift = value.bit_length() - cls.SUB_BUCKET_BITS - 1
+        return (shift + 1) * cls.SUB_BUCKETS + (value >> shift) - cls.SUB_BUCKETS
+
+    @classmethod
+    def bucket_upper(cls, index: int) -> int:
+        """Highest value that falls in bucket `index`."""
+        if index < 2 * cls.SUB_BUCKETS:
+            return index
+        shift = index // cls.SUB_BUCKETS - 1
+        mantissa = index % cls.SUB_BUCKETS + cls.SUB_BUCKETS
+        return ((mantissa + 1) << shift) - 1
+
+    def record(self, value_ns: int):
+        value_ns = max(0, int(value_ns))
+        index = self.bucket_index(value_ns)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        if not self.count or value_ns < self.min_ns:
+            self.min_ns = value_ns
+        if value_ns > self.max_ns:
+            self.max_ns = value_ns
+        self.count += 1
+        self.total_ns += value_ns
+
+    def percentile(self, pct: float) -> int:
+        """Value at or below which `pct` percent of the recorded values fall."""
+        if not self.count:
+            return 0
+        rank = max(1, math.ceil(self.count * pct / 100))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(self.bucket_upper(index), self.max_ns)
+        return self.max_ns
+
+    def summary(self) -> Dict[str, float]:
+        """Count and microsecond percentiles, as served to admins and logged."""
+        if not self.count:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "min_us": round(self.min_ns / 1000, 3),
+            "mean_us": round(self.total_ns / self.count / 1000, 3),
+            "p50_us": round(self.percentile(50) / 1000, 3),
+            "p90_us": round(self.percentile(90) / 1000, 3),
+            "p99_us": round(self.percentile(99) / 1000, 3),
+            "p999_us": round(self.percentile(99.9) / 1000, 3),
+            "max_us": round(self.max_ns / 1000, 3),
+        }
+
+
+class _Span:
+    """Times one stage with `with`; see MarketInstrumentation.span."""
+    __slots__ = ("instrumentation", "event_type", "stage", "start_ns")
+
+    def __init__(self, instrumentation: "MarketInstrumentation", event_type: Optional[str], stage: str):
+        self.instrumentation = instrumentation
+        self.event_type = event_type
+        self.stage = stage
+        self.start_ns = 0
+
+    def __enter__(self):
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.instrumentation.record(self.event_type, self.stage, time.perf_counter_ns() - self.start_ns)
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+class MarketInstrumentation:
+    """Latency histograms and event counters for one market."""
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.histograms: Dict[Tuple[str, str], LatencyHistogram] = {}
+        self.event_counts: Dict[str, int] = {}
+        # Kind of the sequencer command being applied; stages inside it are keyed by it
+        self.current: str = "other"
+        self._nested_ns = 0
+
+    def span(self, event_type: Optional[str], stage: str):
+        """Context manager timing `stage`; free when instrumentation is off."""
+        if not self.enabled:
+            return NULL_SPAN
+        return _Span(self, event_type, stage)
+
+    def record(self, event_type: Optional[str], stage: str, elapsed_ns: int):
+        key = (event_type or self.current, stage)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = LatencyHistogram()
+        histogram.record(elapsed_ns)
+        if stage in NESTED_STAGES:
+            self._nested_ns += elapsed_ns
+
+    def count_event(self, event_type: str):
+        self.event_counts[event_type] = self.event_counts.get(event_type, 0) + 1
+
+    def begin_command(self, kind: str, queued_ns: int) -> int:
+        """Record a sequencer command's queue wait; returns its start time."""
+        started_ns = time.perf_counter_ns()
+        self.current = kind
+        self._nested_ns = 0
+        self.record(kind, "queue_wait", started_ns - queued_ns)
+        return started_ns
+
+    def end_command(self, kind: str, started_ns: int):
+        """Record a command's engine time, net of the stages measured inside it."""
+        self.record(kind, "engine", time.perf_counter_ns() - started_ns - self._nested_ns)
+        self.current = "other"
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Full summaries: {"events": counts, "latency": {event_type: {stage: summary}}}."""
+        latency: Dict[str, Dict[str, Dict]] = {}
+        for (event_type, stage), histogram in sorted(self.histograms.items()):
+            latency.setdefault(event_type, {})[stage] = histogram.summary()
+        return {"enabled": self.enabled, "events": dict(self.event_counts), "latency": latency}
+
+    def summary_line(self) -> Dict[str, Any]:
+        """Compact summary for the market log: count, p50, p99 and max per stage."""
+        latency: Dict[str, Dict[str, List]] = {}
+        for (event_type, stage), histogram in sorted(self.histograms.items()):
+            latency.setdefault(event_type, {})[stage] = [
+                histogram.count,
+                round(histogram.percentile(50) / 1000, 1),
+                round(histogram.percentile(99) / 1000, 1),
+                round(histogram.max_ns / 1000, 1),
+            ]
+        return {"events": dict(self.event_counts), "latency_us": latency}
+
+    def reset(self):
+        self.histograms.clear()
+        self.event_counts.clear()
+
+
+class InstrumentedLogger:
+    """Trading logger proxy that times `info` calls as the logging stage."""
+
+    def __init__(self, logger, instrumentation: MarketInstrumentation):
+        self._logger = logger
+        self._instrumentation = instrumentation
+
+    def info(self, msg, *args, **kwargs):
+        if not self._instrumentation.enabled:
+            return self._logger.info(msg, *args, **kwargs)
+        with _Span(self._instrumentation, None, "logging"):
+            self._logger.info(msg, *args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._logger, name)
+
+
+class InstrumentationMiddleware:
+    """MessageBus middleware counting routed events per type while enabled."""
+
+    def __init__(self, instrumentation: MarketInstrumentation):
+        self.instrumentation = instrumentation
+
+    @property
+    def enabled(self) -> bool:
+        return self.instrumentation.enabled
+
+    async def __call__(self, event):
+        self.instrumentation.count_event(type(event).__name__)
+        return event
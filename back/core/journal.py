@@ -0,0 +1,143 @@
+"""
+Append-only event journal for one market, for replaying a session exactly.
+
+Every message the market's router accepts is written, in routing order, as
+one JSON line to logs/journal/{market_id}.jsonl:
+
+    {"journal": 1, "market_id": ..., "params": {...}, "rng_seeds": {...}, ...}   header
+    {"seq": 1, "t": 1834211, "msg": {...}}                                    routed message
+    {"seq": 1, "t": 20544, "ctl": "rng_seeds", "traders": {"NOISE_1": ...}}   per-trader seeds
+    {"seq": 2, "t": 9120044, "ctl": "start"}                                  market lifecycle
+    {"seq": 9, "t": 9520311, "ctl": "checkpoint"}                             digest requested
+    {"seq": 12, "t": 9520930, "ctl": "digest", "checkpoint": 9, "digest": {...}}
+
+`t` is monotonic nanoseconds since the journal was opened. Nothing awaits
+between routing a message and queueing its sequencer command, so journal
+order is the order the book applies commands in; controls that touch the
+book (close_book, auction, checkpoint) are journaled when they are queued
+for the same reason, and a checkpoint's digest line follows once the
+sequencer reaches it. Feeding the lines back through a fresh
+`MarketOrchestrator` therefore rebuilds the same book and trades;
+`benchmarks/replay.py` does that and compares the digests.
+
+Each algorithmic trader draws from its own generators, seeded from the
+market seed and its id (`BaseTrader.seed_rng`); the header carries the
+market seed and an `rng_seeds` line the per-trader seeds. Replay feeds the
+journaled messages rather than re-running the traders, whose decisions also
+depend on message timing.
+"""
+import hashlib
+import json
+import os
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from utils.utils import setup_custom_logger
+
+logger = setup_custom_logger(__name__)
+
+JOURNAL_VERSION = 1
+JOURNAL_DIR = os.path.join("logs", "journal")
+
+# Message keys holding live objects rather than data
+UNRECORDED_KEYS = frozenset(("trader_instance",))
+
+
+def _encode(entry: Dict[str, Any]) -> str:
+    return json.dumps(entry, separators=(",", ":"), default=str)
+
+
+def journal_path(market_id: str, directory: str = JOURNAL_DIR) -> str:
+    return os.path.join(directory, f"{market_id}.jsonl")
+
+
+class EventJournal:
+    """Writes one market's routed messages and lifecycle controls as JSON lines."""
+
+    def __init__(self, path: str, header: Dict[str, Any]):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.seq = 0
+        self.opened_ns = time.monotonic_ns()
+        self._file = open(path, "w", encoding="utf-8")
+        self._file.write(_encode({"journal": JOURNAL_VERSION, **header}) + "\n")
+
+    @classmethod
+    def open(cls, market_id: str, header: Dict[str, Any], directory: str = JOURNAL_DIR) -> "EventJournal":
+        path = journal_path(market_id, directory)
+        logger.info(f"Journaling market {market_id} to {path}")
+        return cls(path, {"market_id": market_id, **header})
+
+    @property
+    def closed(self) -> bool:
+        return self._file.closed
+
+    def _append(self, entry: Dict[str, Any]):
+        if self._file.closed:
+            return
+        self.seq += 1
+        self._file.write(_encode({"seq": self.seq, "t": time.monotonic_ns() - self.opened_ns, **entry}) + "\n")
+
+    def record(self, message: Dict[str, Any]):
+        """Journal a routed message; serialized now, since handlers mutate it."""
+        if UNRECORDED_KEYS.intersection(message):
+            message = {k: v for k, v in message.items() if k not in UNRECORDED_KEYS}
+        self._append({"msg": message})
+
+    def control(self, kind: str, **fields) -> int:
+        """Journal a control line (rng_seeds, start, stop, close_book, auction, checkpoint, digest)."""
+        self._append({"ctl": kind, **fields})
+        self._file.flush()
+        return self.seq
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+
+def _sha256(value: Any) -> str:
+    return hashlib.sha256(_encode(value).encode()).hexdigest()
+
+
+def market_digest(orchestrator) -> Dict[str, Any]:
+    """
+    Hashes of a market's resting orders and trades.
+
+    Only fields a replay reproduces go in: order ids, traders, sides, prices
+    and amounts in book order, the depth checksum, and trades without their
+    uuid and wall-clock timestamp.
+    """
+    from .orderbook_manager import book_checksum
+
+    order_book = orchestrator.order_book_manager.order_book
+    orders = [
+        [str(order["id"]), order["trader_id"], int(order["order_type"]), order["price"], order["amount"]]
+        for order in order_book.active_orders.values()
+    ]
+    trades = [
+        {key: value for key, value in trade.items() if key not in ("id", "timestamp")}
+        for trade in orchestrator.transaction_manager.transactions
+    ]
+    return {
+        "orders": len(orders),
+        "trades": len(trades),
+        "depth_checksum": book_checksum(order_book.get_order_book_snapshot()),
+        "book": _sha256(orders),
+        "transactions": _sha256(trades),
+    }
+
+
+def iter_journal(path: str) -> Iterator[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as journal_file:
+        for line in journal_file:
+            if line.strip():
+                yield json.loads(line)
+
+
+def read_journal(path: str) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """Header and entries of a journal file."""
+    entries = iter_journal(path)
+    header: Optional[Dict[str, Any]] = next(entries, None)
+    if header is None or header.get("journal") != JOURNAL_VERSION:
+        raise ValueError(f"{path} is not a version {JOURNAL_VERSION} market journal")
+    return header, list(entries)
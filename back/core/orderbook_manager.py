@@ -1,10 +1,54 @@
-from typing import Dict, List, Tuple, Optional, Union
-from core.data_models import Order, OrderStatus, OrderType
+import zlib
+from datetime import datetime
+from typing import Dict, Iterator, List, Tuple, Optional, Union
+from core.data_models import ExecutionType, Order, OrderStatus, OrderType
 from sortedcontainers import SortedDict
 
+ORDER_BOOK_ENGINES = ("sorted", "tick_ladder")
+
+# The ladder is preallocated this many book depths either side of default_price
+LADDER_HEADROOM_DEPTHS = 4
+
+
+def create_order_book(params: Optional[Dict] = None) -> "OrderBook":
+    params = params or {}
+    engine = params.get("order_book_engine", "sorted")
+    if engine == "sorted":
+        return OrderBook()
+    if engine == "tick_ladder":
+        step = params.get("step", 1)
+        default_price = params.get("default_price", 100)
+        span = LADDER_HEADROOM_DEPTHS * params.get("order_book_levels", 30) * step
+        return TickLadderOrderBook(
+            tick_size=step,
+            min_price=default_price - span,
+            max_price=default_price + span,
+        )
+    raise ValueError(f"Unknown order book engine: {engine}")
+
+
+def _checksum_number(value: float) -> str:
+    text = f"{value:.6f}".rstrip("0")
+    return text[:-1] if text.endswith(".") else text
+
+
+def book_checksum(snapshot: Dict) -> int:
+    """CRC32 of a depth snapshot, for clients to verify a delta-built book.
+
+    The checksummed string is every level as "price:amount", bids best to
+    worst then asks best to worst, joined by "|"; numbers are printed with
+    at most six decimals and no trailing zeros (100.5 -> "100.5", 3 -> "3").
+    """
+    levels = snapshot["bids"] + snapshot["asks"]
+    text = "|".join(
+        f"{_checksum_number(level['x'])}:{_checksum_number(level['y'])}" for level in levels
+    )
+    return zlib.crc32(text.encode())
+
+
 class OrderBookManager:
-    def __init__(self):
-        self.order_book = OrderBook()
+    def __init__(self, params: Optional[Dict] = None):
+        self.order_book = create_order_book(params)
 
     def place_order(self, order_dict: Dict) -> Dict:
         return self.order_book.place_order(order_dict)
@@ -13,21 +57,10 @@ class OrderBookManager:
         return self.order_book.get_order_book_snapshot()
 
     def get_active_orders_to_broadcast(self) -> List[Dict]:
-        active_orders = list(self.order_book.active_orders.values())
-        processed_orders = []
-        
-        for order in active_orders:
-            processed_order = {
-                "id": str(order["id"]),
-                "trader_id": str(order["trader_id"]),
-                "order_type": int(order["order_type"]),
-                "amount": float(order["amount"]),
-                "price": float(order["price"]),
-                "timestamp": str(order["timestamp"])
-            }
-            processed_orders.append(processed_order)
-        
-        return processed_orders
+        return self.order_book.get_active_orders_to_broadcast()
+
+    def get_order(self, order_id: str) -> Optional[Dict]:
+        return self.order_book.get_order(order_id)
 
     def cancel_order(self, order_id: str) -> bool:
         return self.order_book.cancel_order(order_id)
@@ -35,28 +68,148 @@ class OrderBookManager:
     def cancel_order_with_details(self, order_id: str) -> Tuple[Optional[Dict], bool]:
         return self.order_book.cancel_order_with_details(order_id)
 
+    def cancel_all(self, trader_id: str, order_type: Optional[int] = None,
+                   min_price: Optional[float] = None,
+                   max_price: Optional[float] = None) -> List[Dict]:
+        return self.order_book.cancel_all(trader_id, order_type, min_price, max_price)
+
     def clear_orders(self) -> List[Tuple[Dict, Dict, float]]:
         return self.order_book.clear_orders()
 
+    def execute_order(self, order_dict: Dict) -> Tuple[List[Tuple[Dict, Dict, float]], float]:
+        return self.order_book.execute_order(order_dict)
+
+    def modify_order(self, order_id: str, price: Optional[float] = None,
+                     amount: Optional[float] = None) -> Tuple[Optional[Dict], Optional[Dict], bool]:
+        return self.order_book.modify_order(order_id, price, amount)
+
+    def uncross(self) -> List[Tuple[Dict, Dict, float]]:
+        return self.order_book.uncross()
+
     def get_spread(self) -> Tuple[float, float]:
         return self.order_book.get_spread()
 
+    @property
+    def version(self) -> int:
+        return self.order_book.version
+
+    def track_changes(self, enabled: bool) -> None:
+        self.order_book.set_change_tracking(enabled)
+
+    def drain_changes(self) -> Optional[Dict]:
+        return self.order_book.drain_changes()
+
+def make_broadcast_row(order: Dict) -> Dict:
+    return {
+        "id": str(order["id"]),
+        "trader_id": str(order["trader_id"]),
+        "order_type": int(order["order_type"]),
+        "amount": float(order["amount"]),
+        "price": float(order["price"]),
+        "timestamp": str(order["timestamp"])
+    }
+
+
+class OrderNode:
+    """Queue entry tying a resting order to its neighbours at the same price."""
+    __slots__ = ("order", "level", "prev", "next")
+
+    def __init__(self, order: Dict, level: "PriceLevel"):
+        self.order = order
+        self.level = level
+        self.prev: Optional["OrderNode"] = None
+        self.next: Optional["OrderNode"] = None
+
+
+class PriceLevel:
+    """FIFO queue of resting orders at one price, kept as an intrusive linked list."""
+    __slots__ = ("price", "head", "tail", "count", "total_amount")
+
+    def __init__(self, price: float):
+        self.price = price
+        self.head: Optional[OrderNode] = None
+        self.tail: Optional[OrderNode] = None
+        self.count = 0
+        # Aggregate resting size, kept in step with every append/remove
+        self.total_amount = 0
+
+    def append(self, order: Dict) -> OrderNode:
+        node = OrderNode(order, self)
+        if self.tail is None:
+            self.head = node
+        else:
+            node.prev = self.tail
+            self.tail.next = node
+        self.tail = node
+        self.count += 1
+        self.total_amount += order["amount"]
+        return node
+
+    def remove(self, node: OrderNode) -> None:
+        if node.prev is None:
+            self.head = node.next
+        else:
+            node.prev.next = node.next
+        if node.next is None:
+            self.tail = node.prev
+        else:
+            node.next.prev = node.prev
+        node.prev = node.next = None
+        self.count -= 1
+        self.total_amount -= node.order["amount"]
+
+    def peek(self) -> Dict:
+        return self.head.order
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __bool__(self) -> bool:
+        return self.head is not None
+
+    def __iter__(self):
+        node = self.head
+        while node is not None:
+            yield node.order
+            node = node.next
+
+
 class OrderBook:
     def __init__(self):
         self.bids = SortedDict()
         self.asks = SortedDict()
         self.all_orders = {}
+        # order id -> queue node, so cancels and lookups never scan a level
+        self.order_index: Dict[str, OrderNode] = {}
+        # Resting orders and their broadcast rows, serialized once at insert
+        self._active_orders: Dict[str, Dict] = {}
+        self._broadcast_rows: Dict[str, Dict] = {}
+        # Top of book, updated whenever a level is created or emptied
+        self.best_bid: Optional[float] = None
+        self.best_ask: Optional[float] = None
+        # Bumped on every book mutation; keys the cached snapshot
+        self.version = 0
+        self._snapshot_version = -1
+        self._snapshot: Dict = {}
+        self._rows_version = -1
+        self._rows: List[Dict] = []
+        # Levels and orders touched since the last drain_changes(); only
+        # collected while a delta subscriber is listening
+        self.track_changes = False
+        self._changed_levels = set()
+        self._changed_orders = set()
+        self._reset = False
 
     def __getitem__(self, key):
         if key == "bids":
             return [
-                {"x": k, "y": sum(order["amount"] for order in v)}
-                for k, v in reversed(self.bids.items())
+                {"x": level.price, "y": level.total_amount}
+                for level in self._iter_levels(True)
             ]
         elif key == "asks":
             return [
-                {"x": k, "y": sum(order["amount"] for order in v)}
-                for k, v in self.asks.items()
+                {"x": level.price, "y": level.total_amount}
+                for level in self._iter_levels(False)
             ]
         else:
             return self.all_orders[key]
@@ -70,14 +223,22 @@ class OrderBook:
         self.all_orders[order_id] = order_dict
 
         price = order_dict["price"]
-        if order_dict["order_type"] == OrderType.BID.value:
-            if price not in self.bids:
-                self.bids[price] = []
-            self.bids[price].append(order_dict)
-        else:
-            if price not in self.asks:
-                self.asks[price] = []
-            self.asks[price].append(order_dict)
+        is_bid = order_dict["order_type"] == OrderType.BID.value
+        level = self._level_at(is_bid, price)
+        if level is None:
+            level = self._add_level(is_bid, price)
+            if is_bid:
+                if self.best_bid is None or price > self.best_bid:
+                    self.best_bid = price
+            elif self.best_ask is None or price < self.best_ask:
+                self.best_ask = price
+        self.order_index[order_id] = level.append(order_dict)
+        self._active_orders[order_id] = order_dict
+        self._broadcast_rows[order_id] = make_broadcast_row(order_dict)
+        self.version += 1
+        if self.track_changes:
+            self._changed_levels.add((is_bid, price))
+            self._changed_orders.add(order_id)
 
         # Check if the order can be immediately matched
         immediately_matched = self.can_be_matched(order_dict)
@@ -85,47 +246,140 @@ class OrderBook:
 
     def can_be_matched(self, order: Dict) -> bool:
         if order["order_type"] == OrderType.BID.value:
-            return bool(self.asks and min(self.asks.keys()) <= order["price"])
+            return self.best_ask is not None and self.best_ask <= order["price"]
         else:
-            return bool(self.bids and max(self.bids.keys()) >= order["price"])
+            return self.best_bid is not None and self.best_bid >= order["price"]
 
     def get_order_book_snapshot(self) -> Dict:
-        return {
-            "bids": self["bids"],
-            "asks": self["asks"],
-        }
+        # Snapshots are rebuilt at most once per book version
+        if self._snapshot_version != self.version:
+            self._snapshot = {
+                "bids": self["bids"],
+                "asks": self["asks"],
+            }
+            self._snapshot_version = self.version
+        return self._snapshot
 
-    def clear(self):
+    def get_active_orders_to_broadcast(self) -> List[Dict]:
+        if self._rows_version != self.version:
+            self._rows = list(self._broadcast_rows.values())
+            self._rows_version = self.version
+        return self._rows
+
+    # Level storage hooks; TickLadderOrderBook swaps these for an array ladder
+    def _normalize_price(self, price: float) -> float:
+        """The price an order at `price` is stored at."""
+        return price
+
+    def _level_at(self, is_bid: bool, price: float) -> Optional[PriceLevel]:
+        return (self.bids if is_bid else self.asks).get(price)
+
+    def _add_level(self, is_bid: bool, price: float) -> PriceLevel:
+        level = PriceLevel(price)
+        (self.bids if is_bid else self.asks)[price] = level
+        return level
+
+    def _remove_level(self, is_bid: bool, level: PriceLevel) -> Optional[float]:
+        """Drop an empty level and return the side's best price afterwards."""
+        if is_bid:
+            del self.bids[level.price]
+            return self.bids.peekitem(-1)[0] if self.bids else None
+        del self.asks[level.price]
+        return self.asks.peekitem(0)[0] if self.asks else None
+
+    def _iter_levels(self, is_bid: bool) -> Iterator[PriceLevel]:
+        """Yield the levels of one side from best to worst price."""
+        return reversed(self.bids.values()) if is_bid else iter(self.asks.values())
+
+    def _clear_levels(self) -> None:
         self.bids.clear()
         self.asks.clear()
-        self.all_orders.clear()
 
-    def cancel_order(self, order_id: str) -> bool:
-        order = self.all_orders.get(order_id)
+    def clear(self):
+        self._clear_levels()
+        self.all_orders.clear()
+        self.order_index.clear()
+        self._active_orders.clear()
+        self._broadcast_rows.clear()
+        self.best_bid = None
+        self.best_ask = None
+        self.version += 1
+        if self.track_changes:
+            self._reset = True
+
+    def set_change_tracking(self, enabled: bool) -> None:
+        self.track_changes = enabled
+        self._changed_levels.clear()
+        self._changed_orders.clear()
+        self._reset = False
+
+    def drain_changes(self) -> Optional[Dict]:
+        """Return the levels and orders touched since the last drain.
+
+        Values are absolute rather than relative: each changed level carries
+        its current size (0 once removed) and each changed resting order its
+        current broadcast row, so applying the same delta twice is harmless.
+        Returns None if the book was cleared, when only a snapshot will do.
+        """
+        if self._reset:
+            self.set_change_tracking(self.track_changes)
+            return None
+        bids, asks = [], []
+        for is_bid, price in self._changed_levels:
+            level = self._level_at(is_bid, price)
+            (bids if is_bid else asks).append(
+                {"x": price, "y": level.total_amount if level is not None else 0}
+            )
+        bids.sort(key=lambda level: level["x"], reverse=True)
+        asks.sort(key=lambda level: level["x"])
+        orders, removed_orders = [], []
+        for order_id in self._changed_orders:
+            row = self._broadcast_rows.get(order_id)
+            if row is None:
+                removed_orders.append(order_id)
+            else:
+                orders.append(row)
+        self._changed_levels.clear()
+        self._changed_orders.clear()
+        return {
+            "bids": bids,
+            "asks": asks,
+            "orders": orders,
+            "removed_orders": removed_orders,
+        }
 
-        if not order:
-            return False
+    def get_order(self, order_id: str) -> Optional[Dict]:
+        return self.all_orders.get(order_id)
+
+    def _unlink(self, node: OrderNode) -> None:
+        level = node.level
+        level.remove(node)
+        if self.track_changes:
+            self._changed_levels.add((node.order["order_type"] == OrderType.BID.value, level.price))
+            self._changed_orders.add(node.order["id"])
+        if not level:
+            if node.order["order_type"] == OrderType.BID.value:
+                best = self._remove_level(True, level)
+                if level.price == self.best_bid:
+                    self.best_bid = best
+            else:
+                best = self._remove_level(False, level)
+                if level.price == self.best_ask:
+                    self.best_ask = best
+        order_id = node.order["id"]
+        if self.order_index.get(order_id) is node:
+            del self.order_index[order_id]
+            self._active_orders.pop(order_id, None)
+            self._broadcast_rows.pop(order_id, None)
+        self.version += 1
 
-        price = order["price"]
-        order_type = order["order_type"]
+    def cancel_order(self, order_id: str) -> bool:
+        node = self.order_index.get(order_id)
 
-        if order_type == OrderType.BID.value:
-            if price in self.bids and order in self.bids[price]:
-                self.bids[price].remove(order)
-                if not self.bids[price]:
-                    del self.bids[price]
-            else:
-                return False
-        elif order_type == OrderType.ASK.value:
-            if price in self.asks and order in self.asks[price]:
-                self.asks[price].remove(order)
-                if not self.asks[price]:
-                    del self.asks[price]
-            else:
-                return False
-        else:
+        if node is None:
             return False
 
+        self._unlink(node)
         del self.all_orders[order_id]
         return True
 
@@ -137,34 +391,38 @@ class OrderBook:
 
         # Make a copy of the order before removing it
         order_copy = order.copy()
-        
-        price = order["price"]
-        order_type = order["order_type"]
-
-        if order_type == OrderType.BID.value:
-            if price in self.bids and order in self.bids[price]:
-                self.bids[price].remove(order)
-                if not self.bids[price]:
-                    del self.bids[price]
-            else:
-                return order_copy, False
-        elif order_type == OrderType.ASK.value:
-            if price in self.asks and order in self.asks[price]:
-                self.asks[price].remove(order)
-                if not self.asks[price]:
-                    del self.asks[price]
-            else:
-                return order_copy, False
-        else:
+
+        node = self.order_index.get(order_id)
+        if node is None:
             return order_copy, False
 
+        self._unlink(node)
         del self.all_orders[order_id]
         return order_copy, True
 
+    def cancel_all(self, trader_id: str, order_type: Optional[int] = None,
+                   min_price: Optional[float] = None,
+                   max_price: Optional[float] = None) -> List[Dict]:
+        """Cancel a trader's resting orders, optionally one side and/or a price range.
+
+        Returns the cancelled orders in one pass over the active-order index.
+        """
+        cancelled = []
+        for order_id, order in list(self._active_orders.items()):
+            if (str(order["trader_id"]) != str(trader_id)
+                    or (order_type is not None and order["order_type"] != order_type)
+                    or (min_price is not None and order["price"] < min_price)
+                    or (max_price is not None and order["price"] > max_price)):
+                continue
+            self._unlink(self.order_index[order_id])
+            del self.all_orders[order_id]
+            cancelled.append(order)
+        return cancelled
+
     def get_spread(self) -> Tuple[Optional[float], Optional[float]]:
-        if self.asks and self.bids:
-            lowest_ask = self.asks.peekitem(0)[0]
-            highest_bid = self.bids.peekitem(-1)[0]
+        if self.best_ask is not None and self.best_bid is not None:
+            lowest_ask = self.best_ask
+            highest_bid = self.best_bid
             spread = lowest_ask - highest_bid
             mid_price = (lowest_ask + highest_bid) / 2
             return spread, mid_price
@@ -172,40 +430,341 @@ class OrderBook:
 
     @property
     def active_orders(self) -> Dict:
-        return {
-            k: v
-            for k, v in self.all_orders.items()
-            if v["status"] == OrderStatus.ACTIVE.value
-        }
+        return self._active_orders
+
+    def _fill(self, node: OrderNode, amount: float) -> Dict:
+        """Execute `amount` against a resting order and return the fill record."""
+        order = node.order
+        if amount >= order["amount"]:
+            self._unlink(node)
+            self.all_orders.pop(order["id"], None)
+            return order
+
+        # Partial fill: the residual keeps its place at the front of the queue
+        self._resize(node, order["amount"] - amount)
+        return {**order, "amount": amount}
+
+    def _resize(self, node: OrderNode, amount: float) -> Dict:
+        """Shrink a resting order in place without losing its queue position.
+
+        Swaps in a reduced copy so dicts already handed out keep their size.
+        """
+        order = node.order
+        resized = {**order, "amount": amount}
+        node.order = resized
+        node.level.total_amount -= order["amount"] - amount
+        order_id = order["id"]
+        self.all_orders[order_id] = resized
+        self._active_orders[order_id] = resized
+        self._broadcast_rows[order_id] = make_broadcast_row(resized)
+        self.version += 1
+        if self.track_changes:
+            self._changed_levels.add((order["order_type"] == OrderType.BID.value, node.level.price))
+            self._changed_orders.add(order_id)
+        return resized
+
+    def modify_order(self, order_id: str, price: Optional[float] = None,
+                     amount: Optional[float] = None) -> Tuple[Optional[Dict], Optional[Dict], bool]:
+        """Cancel-replace a resting order in one step.
+
+        Reducing the size at the same price keeps time priority; any other
+        change requeues the order at the back of its new level. Returns the
+        old order, the new one and whether the book can now be matched, or
+        (None, None, False) if the order is not resting.
+        """
+        node = self.order_index.get(order_id)
+        if node is None:
+            return None, None, False
+        old_order = node.order
+        new_price = old_order["price"] if price is None else self._normalize_price(price)
+        new_amount = old_order["amount"] if amount is None else amount
+        if new_amount <= 0:
+            raise ValueError("Modified amount must be positive")
+
+        if new_price == old_order["price"] and new_amount <= old_order["amount"]:
+            return old_order, self._resize(node, new_amount), False
+
+        self._unlink(node)
+        del self.all_orders[order_id]
+        new_order = {**old_order, "price": new_price, "amount": new_amount,
+                     "timestamp": datetime.now()}
+        new_order, can_be_matched = self.place_order(new_order)
+        return old_order, new_order, can_be_matched
 
     def clear_orders(self) -> List[Tuple[Dict, Dict, float]]:
+        """Match crossing orders; each fill yields (ask, bid, price) sized to the fill."""
         matched_orders = []
-        while self.bids and self.asks:
-            best_bid = max(self.bids.keys())
-            best_ask = min(self.asks.keys())
-            if best_bid >= best_ask:
-                bid = self.bids[best_bid][0]
-                ask = self.asks[best_ask][0]
-                transaction_price = (best_bid + best_ask) / 2
-                matched_orders.append((ask, bid, transaction_price))
-
-                # Remove the matched orders from the price levels
-                self.bids[best_bid].pop(0)
-                self.asks[best_ask].pop(0)
-
-                # Remove empty price levels
-                if not self.bids[best_bid]:
-                    del self.bids[best_bid]
-                if not self.asks[best_ask]:
-                    del self.asks[best_ask]
+        while self.best_bid is not None and self.best_ask is not None:
+            best_bid = self.best_bid
+            best_ask = self.best_ask
+            if best_bid < best_ask:
+                break
+            bid_node = self._level_at(True, best_bid).head
+            ask_node = self._level_at(False, best_ask).head
+            fill_amount = min(bid_node.order["amount"], ask_node.order["amount"])
+            transaction_price = (best_bid + best_ask) / 2
+
+            bid = self._fill(bid_node, fill_amount)
+            ask = self._fill(ask_node, fill_amount)
+            matched_orders.append((ask, bid, transaction_price))
+
+        return matched_orders
+
+    def available_to(self, is_bid: bool, limit: Optional[float]) -> float:
+        """Opposite-side volume an incoming order could take up to `limit`."""
+        total = 0
+        for level in self._iter_levels(not is_bid):
+            if limit is not None and (level.price > limit if is_bid else level.price < limit):
+                break
+            total += level.total_amount
+        return total
+
+    def execute_order(self, order_dict: Dict) -> Tuple[List[Tuple[Dict, Dict, float]], float]:
+        """Execute a market, IOC or FOK order against the book without resting it.
+
+        IOC and FOK orders keep their limit price and trade at the midpoint of
+        limit and resting price, like a crossing limit order would. Market
+        orders have no limit and trade at the resting price. Returns the fills
+        as (ask, bid, price) and the amount left unfilled, which the caller
+        treats as expired.
+        """
+        execution_type = order_dict.get("execution_type", ExecutionType.LIMIT.value)
+        is_bid = order_dict["order_type"] == OrderType.BID.value
+        limit = None if execution_type == ExecutionType.MARKET.value else order_dict["price"]
+        remaining = order_dict["amount"]
+        order_dict["status"] = OrderStatus.ACTIVE.value
+        matched_orders = []
+
+        if execution_type == ExecutionType.FOK.value and self.available_to(is_bid, limit) < remaining:
+            return matched_orders, remaining
+
+        while remaining > 0:
+            best = self.best_ask if is_bid else self.best_bid
+            if best is None or (limit is not None and (best > limit if is_bid else best < limit)):
+                break
+            node = self._level_at(not is_bid, best).head
+            fill_amount = min(remaining, node.order["amount"])
+            transaction_price = best if limit is None else (best + limit) / 2
+
+            resting = self._fill(node, fill_amount)
+            incoming = {**order_dict, "amount": fill_amount}
+            remaining -= fill_amount
+            if is_bid:
+                matched_orders.append((resting, incoming, transaction_price))
             else:
+                matched_orders.append((incoming, resting, transaction_price))
+
+        return matched_orders, remaining
+
+    def clearing_price(self) -> Optional[float]:
+        """Single price that maximises executable volume in a call auction.
+
+        Ties on volume go to the smallest order imbalance, and any remaining
+        tie is split at the midpoint of the tied prices. Returns None if the
+        book is not crossed.
+        """
+        if self.best_bid is None or self.best_ask is None or self.best_bid < self.best_ask:
+            return None
+        bids = []
+        for level in self._iter_levels(True):
+            if level.price < self.best_ask:
+                break
+            bids.append((level.price, level.total_amount))
+        asks = []
+        for level in self._iter_levels(False):
+            if level.price > self.best_bid:
                 break
+            asks.append((level.price, level.total_amount))
+
+        # Walk candidate prices upwards: supply accumulates, demand drains
+        bids.reverse()
+        demand = sum(amount for _, amount in bids)
+        supply = 0
+        bid_i = ask_i = 0
+        best_key = None
+        tied = []
+        for price in sorted({p for p, _ in bids} | {p for p, _ in asks}):
+            while bid_i < len(bids) and bids[bid_i][0] < price:
+                demand -= bids[bid_i][1]
+                bid_i += 1
+            while ask_i < len(asks) and asks[ask_i][0] <= price:
+                supply += asks[ask_i][1]
+                ask_i += 1
+            key = (min(demand, supply), -abs(demand - supply))
+            if best_key is None or key > best_key:
+                best_key, tied = key, [price]
+            elif key == best_key:
+                tied.append(price)
+        return (tied[0] + tied[-1]) / 2
+
+    def uncross(self) -> List[Tuple[Dict, Dict, float]]:
+        """Run a call auction: execute everything that crosses at one clearing price.
+
+        Orders fill in price-time priority, so the most aggressive orders trade
+        first and the marginal level is filled oldest-first.
+        """
+        price = self.clearing_price()
+        matched_orders = []
+        if price is None:
+            return matched_orders
+        while self.best_bid is not None and self.best_ask is not None:
+            if self.best_bid < price or self.best_ask > price:
+                break
+            bid_node = self._level_at(True, self.best_bid).head
+            ask_node = self._level_at(False, self.best_ask).head
+            fill_amount = min(bid_node.order["amount"], ask_node.order["amount"])
 
-        # Remove matched orders from self.all_orders after creating transactions
-        for ask, bid, _ in matched_orders:
-            if ask["id"] in self.all_orders:
-                del self.all_orders[ask["id"]]
-            if bid["id"] in self.all_orders:
-                del self.all_orders[bid["id"]]
+            bid = self._fill(bid_node, fill_amount)
+            ask = self._fill(ask_node, fill_amount)
+            matched_orders.append((ask, bid, price))
 
         return matched_orders
+
+
+class TickLadderOrderBook(OrderBook):
+    """Order book whose price levels live in preallocated integer-tick arrays.
+
+    Prices are snapped to the nearest multiple of `tick_size` on entry, so level
+    lookups are plain list indexing and the best bid/ask move by walking the
+    ladder. The ladder grows if an order lands outside the preallocated range,
+    up to `MAX_LADDER_TICKS`; levels beyond that are kept in a sparse map by
+    tick, so an absurd price costs one dict entry rather than a huge array.
+    """
+
+    MAX_LADDER_TICKS = 1 << 16
+
+    def __init__(self, tick_size: float, min_price: float, max_price: float):
+        if tick_size <= 0:
+            raise ValueError("tick_size must be positive")
+        self.tick_size = tick_size
+        self._base_tick = self.price_to_tick(min_price)
+        size = min(self.price_to_tick(max_price) - self._base_tick + 1, self.MAX_LADDER_TICKS)
+        self._bid_ladder: List[Optional[PriceLevel]] = [None] * size
+        self._ask_ladder: List[Optional[PriceLevel]] = [None] * size
+        self._bid_level_count = 0
+        self._ask_level_count = 0
+        # tick -> level for prices outside the ladder
+        self._far_bids: Dict[int, PriceLevel] = {}
+        self._far_asks: Dict[int, PriceLevel] = {}
+        super().__init__()
+
+    def price_to_tick(self, price: float) -> int:
+        return round(price / self.tick_size)
+
+    def tick_to_price(self, tick: int) -> float:
+        return round(tick * self.tick_size, 10)
+
+    def place_order(self, order_dict: Dict) -> Tuple[Dict, bool]:
+        order_dict["price"] = self._normalize_price(order_dict["price"])
+        return super().place_order(order_dict)
+
+    def _normalize_price(self, price: float) -> float:
+        return self.tick_to_price(self.price_to_tick(price))
+
+    def _index(self, price: float) -> int:
+        return self.price_to_tick(price) - self._base_tick
+
+    def _grow(self, index: int) -> Optional[int]:
+        """Extend both ladders to cover `index` and return its new position.
+
+        Returns None, leaving the ladders alone, if that would take them past
+        `MAX_LADDER_TICKS`. The ladder never shrinks back, so a tick refused
+        here stays outside it for the life of the book.
+        """
+        size = len(self._bid_ladder)
+        needed = -index if index < 0 else index - size + 1
+        if size + needed > self.MAX_LADDER_TICKS:
+            return None
+        extra = min(max(needed, size // 2), self.MAX_LADDER_TICKS - size)
+        if index < 0:
+            self._bid_ladder[:0] = [None] * extra
+            self._ask_ladder[:0] = [None] * extra
+            self._base_tick -= extra
+            index += extra
+        else:
+            self._bid_ladder.extend([None] * extra)
+            self._ask_ladder.extend([None] * extra)
+        return index
+
+    def _level_at(self, is_bid: bool, price: float) -> Optional[PriceLevel]:
+        index = self._index(price)
+        if 0 <= index < len(self._bid_ladder):
+            return (self._bid_ladder if is_bid else self._ask_ladder)[index]
+        return (self._far_bids if is_bid else self._far_asks).get(index + self._base_tick)
+
+    def _add_level(self, is_bid: bool, price: float) -> PriceLevel:
+        level = PriceLevel(price)
+        index = self._index(price)
+        if not 0 <= index < len(self._bid_ladder):
+            index = self._grow(index)
+            if index is None:
+                (self._far_bids if is_bid else self._far_asks)[self.price_to_tick(price)] = level
+                return level
+        if is_bid:
+            self._bid_ladder[index] = level
+            self._bid_level_count += 1
+        else:
+            self._ask_ladder[index] = level
+            self._ask_level_count += 1
+        return level
+
+    def _remove_level(self, is_bid: bool, level: PriceLevel) -> Optional[float]:
+        index = self._index(level.price)
+        if not 0 <= index < len(self._bid_ladder):
+            (self._far_bids if is_bid else self._far_asks).pop(index + self._base_tick, None)
+        elif is_bid:
+            self._bid_ladder[index] = None
+            self._bid_level_count -= 1
+        else:
+            self._ask_ladder[index] = None
+            self._ask_level_count -= 1
+        best = self.best_bid if is_bid else self.best_ask
+        if level.price != best:
+            return best
+        # The best level emptied: walk away from the touch to the next one
+        nxt = next(self._iter_levels(is_bid, index), None)
+        return nxt.price if nxt is not None else None
+
+    def _iter_levels(self, is_bid: bool, start: Optional[int] = None) -> Iterator[PriceLevel]:
+        if is_bid:
+            ladder, remaining, step, far = self._bid_ladder, self._bid_level_count, -1, self._far_bids
+            best = self.best_bid
+        else:
+            ladder, remaining, step, far = self._ask_ladder, self._ask_level_count, 1, self._far_asks
+            best = self.best_ask
+        if start is None:
+            if best is None:
+                return
+            start = self._index(best)
+        size = len(ladder)
+        # Sparse levels in priority order from `start`: those past the touch end
+        # of the ladder come before it, the rest after it
+        beyond: List[Tuple[int, PriceLevel]] = []
+        if far:
+            beyond = sorted(
+                ((tick - self._base_tick, level) for tick, level in far.items()
+                 if (tick - self._base_tick - start) * step >= 0),
+                key=lambda item: item[0] * step,
+            )
+        for index, level in beyond:
+            if index >= size if is_bid else index < 0:
+                yield level
+        index = min(start, size - 1) if is_bid else max(start, 0)
+        while remaining > 0 and 0 <= index < size:
+            level = ladder[index]
+            if level is not None:
+                remaining -= 1
+                yield level
+            index += step
+        for index, level in beyond:
+            if index < 0 if is_bid else index >= size:
+                yield level
+
+    def _clear_levels(self) -> None:
+        size = len(self._bid_ladder)
+        self._bid_ladder = [None] * size
+        self._ask_ladder = [None] * size
+        self._bid_level_count = 0
+        self._ask_level_count = 0
+        self._far_bids.clear()
+        self._far_asks.clear()
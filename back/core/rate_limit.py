@@ -0,0 +1,153 @@
+"""
+Token-bucket rate limits enforced where messages enter a market.
+
+Client-side throttles (`ThrottleConfig`, checked inside each trader) only
+bind well-behaved traders. `MarketRateLimiter` sits in `MessageRouter` in
+front of the bus, so order traffic from any source is metered before it
+can reach the sequencer or the broadcast pipeline:
+
+- one bucket per trader, sized by the trader type's `RateLimitConfig`
+  (`rate_limits` in TradingParameters); senders not yet registered get the
+  HUMAN limits
+- one optional bucket for the whole market (`market_rate_limit`)
+
+Only order-path messages spend tokens (a bulk submission spends one per
+order); registration, status and inventory messages are never limited.
+A rejection costs a dict lookup and a little arithmetic and is counted
+per trader and per trader type.
+"""
+import time
+from typing import Any, Callable, Dict, Optional
+
+from utils.utils import setup_custom_logger
+
+logger = setup_custom_logger(__name__)
+
+# Message types that reach the sequencer
+LIMITED_MESSAGES = frozenset(("add_order", "add_orders", "cancel_order", "cancel_all", "modify_order"))
+
+# Limits applied to senders whose trader type is unknown
+DEFAULT_TRADER_TYPE = "HUMAN"
+
+
+def _normalize_type(trader_type: Any) -> Optional[str]:
+    if trader_type is None:
+        return None
+    return str(getattr(trader_type, "value", trader_type)).upper()
+
+
+def _rate_and_burst(config: Any) -> Optional[tuple]:
+    """(rate, burst) from a RateLimitConfig or its dict, or None if unlimited."""
+    if config is None:
+        return None
+    if not isinstance(config, dict):
+        config = config.model_dump()
+    rate = config.get("messages_per_second", 0) or 0
+    if rate <= 0:
+        return None
+    return float(rate), float(max(1, config.get("burst", 1) or 1))
+
+
+class TokenBucket:
+    """`rate` tokens per second, holding at most `capacity`; starts full."""
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: float, now: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = now
+
+    def refill(self, now: float) -> float:
+        """Add the tokens earned since the last update; returns the balance."""
+        tokens = self.tokens + (now - self.updated) * self.rate
+        self.tokens = tokens if tokens < self.capacity else self.capacity
+        self.updated = now
+        return self.tokens
+
+
+class MarketRateLimiter:
+    """Per-trader and market-wide token buckets for one market."""
+
+    def __init__(self, trader_limits: Dict[Any, Any], market_limit: Any = None,
+                 trader_types: Callable[[str], Any] = lambda trader_id: None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.trader_limits: Dict[str, Optional[tuple]] = {
+            _normalize_type(trader_type): _rate_and_burst(config)
+            for trader_type, config in (trader_limits or {}).items()
+        }
+        limit = _rate_and_burst(market_limit)
+        self.clock = clock
+        self.market_bucket = TokenBucket(*limit, clock()) if limit else None
+        self.trader_types = trader_types
+        # trader_id -> (trader type the bucket was sized for, bucket or None if unlimited)
+        self.buckets: Dict[str, tuple] = {}
+        self.accepted = 0
+        self.rejected_by_trader: Dict[str, int] = {}
+        self.rejected_by_type: Dict[str, int] = {}
+        self.market_rejected = 0
+
+    @classmethod
+    def from_params(cls, params: Dict, trader_types: Callable[[str], Any]) -> Optional["MarketRateLimiter"]:
+        """A limiter for the market's params, or None when nothing is limited."""
+        trader_limits = params.get("rate_limits") or {}
+        market_limit = params.get("market_rate_limit")
+        if _rate_and_burst(market_limit) is None and not any(
+            _rate_and_burst(config) for config in trader_limits.values()
+        ):
+            return None
+        return cls(trader_limits, market_limit, trader_types)
+
+    def _bucket(self, trader_id: str, now: float) -> Optional[TokenBucket]:
+        entry = self.buckets.get(trader_id)
+        if entry is not None and entry[0] is not None:
+            return entry[1]
+        # Unregistered senders are re-resolved until they register
+        trader_type = _normalize_type(self.trader_types(trader_id))
+        if entry is not None and trader_type is None:
+            return entry[1]
+        limit = self.trader_limits.get(trader_type or DEFAULT_TRADER_TYPE)
+        bucket = TokenBucket(*limit, now) if limit else None
+        self.buckets[trader_id] = (trader_type, bucket)
+        return bucket
+
+    def allow(self, trader_id: str, cost: int = 1) -> bool:
+        """
+        Spend `cost` tokens for `trader_id`; False (and counted) if over a limit.
+
+        Both buckets are checked before either is charged, so a message the
+        market limit turns away costs the sender nothing.
+        """
+        now = self.clock()
+        bucket = self._bucket(trader_id, now)
+        if bucket is not None and bucket.refill(now) < cost:
+            self._reject(trader_id)
+            return False
+        market_bucket = self.market_bucket
+        if market_bucket is not None and market_bucket.refill(now) < cost:
+            self.market_rejected += 1
+            self._reject(trader_id)
+            return False
+        if bucket is not None:
+            bucket.tokens -= cost
+        if market_bucket is not None:
+            market_bucket.tokens -= cost
+        self.accepted += 1
+        return True
+
+    def _reject(self, trader_id: str):
+        count = self.rejected_by_trader.get(trader_id, 0) + 1
+        self.rejected_by_trader[trader_id] = count
+        trader_type = self.buckets[trader_id][0] or DEFAULT_TRADER_TYPE
+        self.rejected_by_type[trader_type] = self.rejected_by_type.get(trader_type, 0) + 1
+        if count == 1:
+            logger.warning(f"Rate limiting trader {trader_id} ({trader_type})")
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "accepted": self.accepted,
+            "rejected": sum(self.rejected_by_trader.values()),
+            "market_rejected": self.market_rejected,
+            "rejected_by_type": dict(self.rejected_by_type),
+            "rejected_by_trader": dict(self.rejected_by_trader),
+        }
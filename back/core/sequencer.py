@@ -0,0 +1,146 @@
+"""
+Single-writer command sequencer for one market.
+
+Every command that touches the order book (add, cancel, modify, inventory
+report, batch auction) is queued here instead of racing for a lock. One task
+drains whatever is pending into a batch, applies the commands in arrival
+order under monotonic sequence numbers, publishes one book update for the
+whole batch and then resolves each caller's future.
+"""
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from utils.utils import setup_custom_logger
+from .instrumentation import MarketInstrumentation
+
+logger = setup_custom_logger(__name__)
+
+# (base_message, incoming_message) for BroadcastService.publish_book_update
+BookUpdate = Tuple[Dict[str, Any], Optional[Dict[str, Any]]]
+
+# A command body applies itself to the book and returns (response, book update or None)
+CommandBody = Callable[[], Awaitable[Tuple[Any, Optional[BookUpdate]]]]
+
+
+class Command:
+    """A queued book command and the future its caller awaits."""
+    __slots__ = ("kind", "body", "future", "seq", "queued_ns")
+
+    def __init__(self, kind: str, body: CommandBody, future: asyncio.Future):
+        self.kind = kind
+        self.body = body
+        self.future = future
+        self.seq = 0
+        self.queued_ns = time.perf_counter_ns()
+
+
+class MarketSequencer:
+    """Applies a market's book commands one at a time, in batches."""
+
+    # Commands applied before the batch's book update goes out
+    MAX_BATCH = 256
+
+    def __init__(self, publish_batch: Callable[[List[BookUpdate]], Awaitable[None]],
+                 max_batch: int = MAX_BATCH, instrumentation: Optional[MarketInstrumentation] = None):
+        self.publish_batch = publish_batch
+        self.max_batch = max_batch
+        self.instrumentation = instrumentation or MarketInstrumentation()
+        # Sequence number of the last command applied (the current one, inside a body)
+        self.seq = 0
+        self.batches = 0
+        self.largest_batch = 0
+        self._queue: Deque[Command] = deque()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._closed = False
+
+    @property
+    def pending(self) -> int:
+        return len(self._queue)
+
+    async def submit(self, kind: str, body: CommandBody) -> Any:
+        """Queue a command and wait for its response."""
+        if self._closed:
+            raise RuntimeError("Market sequencer is closed")
+        future = asyncio.get_running_loop().create_future()
+        self._queue.append(Command(kind, body, future))
+        self._wakeup.set()
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        return await future
+
+    async def close(self):
+        """Stop the sequencer; commands still queued are cancelled."""
+        self._closed = True
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        while self._queue:
+            self._queue.popleft().future.cancel()
+
+    def metrics(self) -> Dict[str, int]:
+        return {
+            "seq": self.seq,
+            "batches": self.batches,
+            "largest_batch": self.largest_batch,
+            "pending": len(self._queue),
+        }
+
+    async def _run(self):
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            while self._queue:
+                batch = [self._queue.popleft() for _ in range(min(len(self._queue), self.max_batch))]
+                await self._apply(batch)
+
+    async def _apply(self, batch: List[Command]):
+        self.batches += 1
+        self.largest_batch = max(self.largest_batch, len(batch))
+        results: List[Tuple[Command, Any, Optional[BaseException]]] = []
+        updates: List[BookUpdate] = []
+        instrumentation = self.instrumentation
+        try:
+            for command in batch:
+                self.seq += 1
+                command.seq = self.seq
+                timed = instrumentation.enabled
+                if timed:
+                    started_ns = instrumentation.begin_command(command.kind, command.queued_ns)
+                try:
+                    response, update = await command.body()
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    results.append((command, None, e))
+                    continue
+                finally:
+                    if timed:
+                        instrumentation.end_command(command.kind, started_ns)
+                results.append((command, response, None))
+                if update is not None:
+                    updates.append(update)
+
+            if updates:
+                try:
+                    await self.publish_batch(updates)
+                except Exception as e:
+                    logger.error(f"Error publishing book update for batch of {len(batch)}: {e}")
+        finally:
+            # Callers hear back only once the batch's book update is out
+            for command, response, error in results:
+                if command.future.done():
+                    continue
+                if error is not None:
+                    command.future.set_exception(error)
+                else:
+                    command.future.set_result(response)
+            for command in batch:
+                if not command.future.done():
+                    command.future.cancel()
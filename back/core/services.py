@@ -6,10 +6,16 @@ from dataclasses import dataclass
 from datetime import datetime, timezone
 import uuid
 import asyncio
+import time
 
-from .data_models import Order, OrderStatus, OrderType, TransactionModel
-from .orderbook_manager import OrderBookManager
+from .data_models import ExecutionType, Order, OrderStatus, OrderType, TransactionModel
+from .orderbook_manager import OrderBookManager, book_checksum
 from .transaction_manager import TransactionManager
+from .instrumentation import MarketInstrumentation
+from .websocket_writer import WebSocketWriter
+from utils.websocket_utils import (
+    JSON_ENCODING, EncodedMessage, dumps, encode_message, supported_encodings,
+)
 
 
 @dataclass
@@ -18,6 +24,7 @@ class OrderResult:
     order: Dict[str, Any]
     immediately_matched: bool
     matches: List[Tuple[Dict, Dict, float]] = None
+    expired_order: Optional[Dict[str, Any]] = None  # unfilled part of a non-resting order
     
     def __post_init__(self):
         if self.matches is None:
@@ -33,6 +40,21 @@ class CancelResult:
     reason: Optional[str] = None
 
 
+@dataclass
+class ModifyResult:
+    """Result of an order modification (cancel-replace)."""
+    success: bool
+    order_id: str
+    old_order: Optional[Dict[str, Any]] = None
+    order: Optional[Dict[str, Any]] = None
+    matches: List[Tuple[Dict, Dict, float]] = None
+    reason: Optional[str] = None
+    
+    def __post_init__(self):
+        if self.matches is None:
+            self.matches = []
+
+
 @dataclass
 class TransactionResult:
     """Result of transaction creation."""
@@ -45,12 +67,28 @@ class TransactionResult:
 class OrderService:
     """Pure business logic for order processing."""
     
-    def __init__(self, order_book_manager: OrderBookManager, pricing_service: 'PricingService'):
+    def __init__(self, order_book_manager: OrderBookManager, pricing_service: 'PricingService',
+                 batch_auction: bool = False):
         self.order_book = order_book_manager
         self.pricing = pricing_service
+        # In batch auction mode orders only rest; run_auction does the matching
+        self.batch_auction = batch_auction
     
     async def process_order(self, order_data: Dict[str, Any]) -> OrderResult:
         """Process an order without side effects."""
+        return self._place_order(*self._prepare_order(order_data))
+    
+    def _far_touch(self, order_type: int) -> float:
+        best_bid, best_ask = self.order_book.order_book.best_bid, self.order_book.order_book.best_ask
+        far_touch = best_ask if order_type == OrderType.BID else best_bid
+        return far_touch if far_touch is not None else self.pricing.mid_price
+    
+    def _prepare_order(self, order_data: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+        """Validate an order into the dict the book takes, without touching the book.
+        
+        Returns the dict and whether its price stands in for the far touch,
+        which is read again when the order is placed.
+        """
         # Data transformation
         order_data["order_type"] = int(order_data["order_type"])
         order_id = order_data.get("order_id")
@@ -69,13 +107,21 @@ class OrderService:
                 "timestamp": datetime.now(timezone.utc).timestamp(),
                 "is_record_keeping": True
             }
-            return OrderResult(order=record_order, immediately_matched=False)
+            return record_order, False
+        
+        # Market orders may come without a price; log them at the far touch
+        at_far_touch = (order_data.get("execution_type") == ExecutionType.MARKET.value
+                        and order_data.get("price") is None)
+        if at_far_touch:
+            order_data["price"] = self._far_touch(order_data["order_type"])
         
         # Create order
         order_creation_data = {**order_data}
         order_creation_data["status"] = OrderStatus.BUFFERED.value
         order = Order(**order_creation_data)
         order_dict = order.model_dump()
+        # Plain string so the order logs stay literal-parseable
+        order_dict["execution_type"] = ExecutionType(order_dict["execution_type"]).value
         
         # Add informed trader progress if present
         informed_trader_progress = order_data.get("informed_trader_progress")
@@ -83,9 +129,22 @@ class OrderService:
             order_dict["informed_trader_progress"] = informed_trader_progress
         
         order_dict["id"] = str(order_dict["id"])
+        return order_dict, at_far_touch
+    
+    def _place_order(self, order_dict: Dict[str, Any], at_far_touch: bool = False) -> OrderResult:
+        """Apply a prepared order to the book."""
+        if order_dict.get("is_record_keeping"):
+            return OrderResult(order=order_dict, immediately_matched=False)
+        if at_far_touch:
+            order_dict["price"] = self._far_touch(order_dict["order_type"])
+        
+        if order_dict["execution_type"] != ExecutionType.LIMIT.value:
+            return self._execute_non_resting(order_dict)
         
         # Place order in order book
         placed_order, immediately_matched = self.order_book.place_order(order_dict)
+        if self.batch_auction:
+            immediately_matched = False
         
         # Get matches if immediately matched
         matches = []
@@ -98,6 +157,65 @@ class OrderService:
             matches=matches
         )
     
+    def _execute_non_resting(self, order_dict: Dict[str, Any]) -> OrderResult:
+        """Market, IOC and FOK orders trade against the book and never rest."""
+        if self.batch_auction:
+            # Nothing trades between auctions, so the whole order expires
+            matches, remaining = [], order_dict["amount"]
+        else:
+            matches, remaining = self.order_book.execute_order(order_dict)
+        
+        expired_order = None
+        if remaining > 0:
+            expired_order = {**order_dict, "amount": remaining,
+                             "status": OrderStatus.CANCELLED.value}
+        return OrderResult(
+            order=order_dict,
+            immediately_matched=bool(matches),
+            matches=matches,
+            expired_order=expired_order,
+        )
+    
+    async def modify_order(self, order_id: str, price: Optional[float] = None,
+                           amount: Optional[float] = None) -> ModifyResult:
+        """Reprice and/or resize a resting order, matching it if it now crosses."""
+        try:
+            old_order, order, can_be_matched = self.order_book.modify_order(order_id, price, amount)
+        except ValueError as e:
+            return ModifyResult(success=False, order_id=order_id, reason=str(e))
+        
+        if order is None:
+            return ModifyResult(
+                success=False,
+                order_id=order_id,
+                reason="Order not found or modification failed"
+            )
+        
+        matches = []
+        if can_be_matched and not self.batch_auction:
+            matches = self.order_book.clear_orders()
+        return ModifyResult(
+            success=True, order_id=order_id, old_order=old_order, order=order, matches=matches
+        )
+    
+    async def run_auction(self) -> List[Tuple[Dict, Dict, float]]:
+        """Uncross the book at a single clearing price."""
+        return self.order_book.uncross()
+    
+    async def process_orders(self, orders: List[Dict[str, Any]]) -> List[OrderResult]:
+        """Process a batch of orders back to back, in submission order."""
+        # Every order is validated first, so a bad one rejects the batch with the book untouched
+        prepared = [self._prepare_order(order_data) for order_data in orders]
+        return [self._place_order(*order) for order in prepared]
+    
+    async def cancel_all(self, trader_id: str, order_type: Optional[int] = None,
+                         min_price: Optional[float] = None,
+                         max_price: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Cancel a trader's resting orders matching the optional filters."""
+        if order_type is not None:
+            order_type = int(order_type)
+        return self.order_book.cancel_all(trader_id, order_type, min_price, max_price)
+    
     async def cancel_order(self, order_id: str) -> CancelResult:
         """Cancel an order."""
         order, success = self.order_book.cancel_order_with_details(order_id)
@@ -245,72 +363,406 @@ class TraderService:
 
 
 class BroadcastService:
-    """Service for managing broadcasts and notifications."""
-    
+    """Service for managing broadcasts and notifications.
+
+    WebSockets receive every book broadcast in full (depth, active orders and
+    the trades since the previous broadcast) unless they subscribe to deltas:
+    those get one `book_snapshot`, then a `book_delta` per book broadcast
+    with a sequence number, the changed levels and orders, the trades since
+    the previous delta and, every `checksum_interval` deltas, a
+    `book_checksum` of the depth. A client that sees a gap in `seq` or a
+    checksum mismatch asks for a fresh snapshot.
+
+    Sending never waits on a client: frames go to a bounded per-connection
+    queue drained by its own writer task (see `WebSocketWriter`). Each
+    connection is JSON unless it negotiated MessagePack (`set_encoding`);
+    a broadcast is encoded once per wire format in use.
+
+    Book updates go through `publish_book_update`. While the flusher runs,
+    websockets and traders that coalesce (humans, by default) get at most
+    one update per `flush_interval`, built from the book at flush time;
+    traders with `coalesce_book_updates = False` still get every update at
+    once. Transactions and fills are sent with `broadcast_to_websockets` and
+    `send_to_traders` directly, so they are never merged and keep their order.
+    Traders are notified through their mailboxes, so order handling does not
+    wait for their bookkeeping.
+    """
+
+    DELTA_CHECKSUM_INTERVAL = 20
+    # Frames a client may fall behind by, and for how long (s), before it is treated as a slow consumer
+    WEBSOCKET_QUEUE_SIZE = 256
+    WEBSOCKET_MAX_LAG = 1.0
+    # Broadcast types where only the latest queued frame matters
+    SUPERSEDED_MESSAGE_TYPES = ("BOOK_UPDATED", "time_update")
+    # Most recent trades included in a book snapshot; older ones are paged in on request
+    SNAPSHOT_HISTORY_WINDOW = 500
+
     def __init__(self, order_book_manager: OrderBookManager, 
-                 transaction_manager: TransactionManager, pricing_service: PricingService):
+                 transaction_manager: TransactionManager, pricing_service: PricingService,
+                 flush_interval: float = 0, tick_size: float = 1,
+                 instrumentation: Optional[MarketInstrumentation] = None):
         self.order_book = order_book_manager
         self.transaction_manager = transaction_manager
         self.pricing = pricing_service
         self.websockets = set()
+        self.writers: Dict[Any, WebSocketWriter] = {}
         self.connected_traders: Dict[str, Dict] = {}
+        self.delta_websockets = set()
+        self.book_seq = 0
+        self.checksum_interval = self.DELTA_CHECKSUM_INTERVAL
+        # Tape index of the first trade not yet included in a broadcast
+        self._history_cursor = 0
+        # Encoded depth and active orders, shared by every message at one book version
+        self._fragments_version = -1
+        self._fragments: Dict[str, str] = {}
+        # Coalescing of book updates; inactive until start_flushing()
+        self.flush_interval = flush_interval
+        self.coalesced_updates = 0
+        self._flush_task: Optional[asyncio.Task] = None
+        self._dirty = asyncio.Event()
+        self._pending_update: Dict[str, Any] = {}
+        self._pending_incoming: Optional[Dict] = None
+        # Totals carried over from writers that have closed
+        self.dropped_frames = 0
+        self.slow_consumer_disconnects = 0
+        # Price increment of the binary protocol's integer ticks
+        self.tick_size = tick_size
+        self.instrumentation = instrumentation or MarketInstrumentation()
     
     def register_websocket(self, websocket):
         """Register a WebSocket connection."""
         self.websockets.add(websocket)
+        if websocket not in self.writers:
+            self.writers[websocket] = WebSocketWriter(
+                websocket, self.WEBSOCKET_QUEUE_SIZE, self._writer_closed,
+                max_lag=self.WEBSOCKET_MAX_LAG,
+            )
     
     def unregister_websocket(self, websocket):
         """Unregister a WebSocket connection."""
         self.websockets.discard(websocket)
+        self.delta_websockets.discard(websocket)
+        writer = self.writers.pop(websocket, None)
+        if writer is not None:
+            writer.close()
+        if not self.delta_websockets:
+            self.order_book.track_changes(False)
+
+    def set_encoding(self, websocket, encoding: str) -> str:
+        """Switch a registered WebSocket's wire format; returns the one in effect.
+
+        The acknowledgement is queued as JSON ahead of any frame in the new
+        format, so the client can switch decoders on it.
+        """
+        writer = self.writers.get(websocket)
+        if writer is None:
+            return JSON_ENCODING
+        if encoding not in supported_encodings():
+            encoding = JSON_ENCODING
+        writer.send(dumps({"type": "protocol", "encoding": encoding, "tick_size": self.tick_size}))
+        writer.encoding = encoding
+        return encoding
+
+    def encoding_of(self, websocket) -> str:
+        writer = self.writers.get(websocket)
+        return writer.encoding if writer is not None else JSON_ENCODING
+
+    def _writer_closed(self, writer: WebSocketWriter):
+        self.dropped_frames += writer.dropped
+        if writer.slow_consumer:
+            self.slow_consumer_disconnects += 1
+        self.unregister_websocket(writer.websocket)
+
+    def send_frame(self, websocket, text, replace_key: Optional[str] = None,
+                   delta: bool = False) -> bool:
+        """Queue an encoded frame for one registered WebSocket; False if it is not registered."""
+        writer = self.writers.get(websocket)
+        if writer is None:
+            return False
+        return writer.send(text, replace_key, delta)
+
+    async def drain_websockets(self):
+        """Wait until every frame queued so far has been written out."""
+        await asyncio.gather(*(writer.wait_idle() for writer in list(self.writers.values())))
+
+    def fanout_metrics(self) -> Dict[str, Any]:
+        """Queue depth and drop counters across this market's connections."""
+        writers = list(self.writers.values())
+        depths = [len(writer.queue) for writer in writers]
+        return {
+            "connections": len(writers),
+            "queue_depth_total": sum(depths),
+            "queue_depth_max": max(depths, default=0),
+            "queue_high_water": max((writer.high_water for writer in writers), default=0),
+            "frames_sent": sum(writer.sent for writer in writers),
+            "frames_dropped": self.dropped_frames + sum(writer.dropped for writer in writers),
+            "slow_consumer_disconnects": self.slow_consumer_disconnects,
+            "coalesced_updates": self.coalesced_updates,
+        }
+
+    def _book_fragments(self, version: int) -> Optional[Dict[str, str]]:
+        """Encoded book fields for `version`, or None if the book has moved on."""
+        if version != self._fragments_version:
+            if version != self.order_book.version:
+                return None
+            # Levels and rows are plain floats/ints/strings by construction
+            self._fragments = {
+                "order_book": dumps(self.order_book.get_order_book_snapshot()),
+                "active_orders": dumps(self.order_book.get_active_orders_to_broadcast()),
+            }
+            self._fragments_version = version
+        return self._fragments
+
+    def _encoded(self, message: Dict[str, Any]) -> EncodedMessage:
+        return EncodedMessage(
+            message, fragments=self._book_fragments, fragments_key=self.order_book.version
+        )
+
+    def _book_state(self, message_type: str) -> EncodedMessage:
+        spread, midpoint = self.order_book.get_spread()
+        snapshot = self.order_book.get_order_book_snapshot()
+        history = self.transaction_manager.history_page(limit=self.SNAPSHOT_HISTORY_WINDOW)
+        return self._encoded({
+            "type": message_type,
+            "seq": self.book_seq,
+            "order_book": snapshot,
+            "active_orders": self.order_book.get_active_orders_to_broadcast(),
+            "history": history["history"],
+            "history_offset": history["history_offset"],
+            "spread": spread,
+            "midpoint": midpoint,
+            "transaction_price": self.transaction_manager.transaction_price,
+            "checksum": book_checksum(snapshot),
+        })
+
+    async def subscribe_deltas(self, websocket):
+        """Switch a registered WebSocket to the snapshot-then-delta protocol."""
+        if not self.delta_websockets:
+            # Start from a clean slate; the snapshot below covers earlier changes
+            self.order_book.track_changes(True)
+        self.register_websocket(websocket)
+        self.delta_websockets.add(websocket)
+        # A writer that had to shed deltas catches up from a fresh snapshot
+        writer = self.writers[websocket]
+        writer.resync = lambda: self._snapshot_frame(writer.encoding)
+        await self.send_snapshot(websocket)
+
+    def _snapshot_frame(self, encoding: str = JSON_ENCODING):
+        return encode_message(self._book_state("book_snapshot"), encoding, self.tick_size)
+
+    async def send_snapshot(self, websocket):
+        """Send the full book at the current sequence number (initial sync or resync)."""
+        self.send_frame(websocket, self._snapshot_frame(self.encoding_of(websocket)))
+
+    def build_book_delta(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """Turn a full book broadcast into the next sequenced delta (or snapshot after a reset)."""
+        self.book_seq += 1
+        changes = self.order_book.drain_changes()
+        if changes is None:
+            delta = self._book_state("book_snapshot")
+        else:
+            delta = {
+                "type": "book_delta",
+                "seq": self.book_seq,
+                **changes,
+                "history": message.get("history", []),
+                "history_offset": message.get("history_offset", self._history_cursor),
+                "spread": message.get("spread"),
+                "midpoint": message.get("midpoint"),
+                "transaction_price": message.get("transaction_price"),
+            }
+            if self.book_seq % self.checksum_interval == 0:
+                delta["checksum"] = book_checksum(self.order_book.get_order_book_snapshot())
+        delta["event"] = message.get("type")
+        return delta
     
     def set_trader_registry(self, connected_traders: Dict[str, Dict]):
         """Set reference to trader registry."""
         self.connected_traders = connected_traders
     
     async def broadcast_to_websockets(self, message: Dict[str, Any]):
-        """Broadcast message to all WebSocket connections."""
+        """Broadcast message to all WebSocket connections.
+
+        The message is sanitized and encoded once and the same text frame is
+        queued for every socket; nothing here waits on a client.
+        """
         if not self.websockets:
             return
-        
-        # Sanitize message to ensure JSON compatibility
-        from utils.websocket_utils import sanitize_websocket_message
-        sanitized_message = sanitize_websocket_message(message)
-        
-        # The sanitization function already ensures JSON compatibility
-        
-        disconnected = set()
-        for websocket in self.websockets.copy():
-            try:
-                await websocket.send_json(sanitized_message)
-            except Exception as e:
-                print(f"Error sending WebSocket message: {e}")
-                disconnected.add(websocket)
-        
-        # Remove disconnected WebSockets
-        for websocket in disconnected:
-            self.websockets.discard(websocket)
+        # A newer book state supersedes a queued one, unless it carries trades
+        replace_key = None
+        if message.get("type") in self.SUPERSEDED_MESSAGE_TYPES and not message.get("history"):
+            replace_key = message["type"]
+
+        # Delta subscribers get book broadcasts as a delta built once for all of them
+        delta = None
+        if self.delta_websockets and "order_book" in message:
+            delta = self.build_book_delta(message)
+            is_delta = delta["type"] == "book_delta"
+
+        instrumentation = self.instrumentation
+        timed = instrumentation.enabled
+        if timed:
+            started_ns, encode_ns = time.perf_counter_ns(), 0
+
+        # One frame per (message, wire format), encoded on first use
+        frames = {}
+        for websocket in list(self.websockets):
+            writer = self.writers.get(websocket)
+            encoding = writer.encoding if writer is not None else JSON_ENCODING
+            use_delta = delta is not None and websocket in self.delta_websockets
+            key = (use_delta, encoding)
+            if key not in frames:
+                if timed:
+                    encode_start_ns = time.perf_counter_ns()
+                frames[key] = encode_message(delta if use_delta else message, encoding, self.tick_size)
+                if timed:
+                    encode_ns += time.perf_counter_ns() - encode_start_ns
+            if use_delta:
+                self.send_frame(websocket, frames[key], delta=is_delta)
+            else:
+                self.send_frame(websocket, frames[key], replace_key)
+
+        if timed:
+            message_type = message.get("type")
+            instrumentation.record(message_type, "encode", encode_ns)
+            instrumentation.record(message_type, "fanout", time.perf_counter_ns() - started_ns - encode_ns)
     
 
     
-    async def send_to_traders(self, message: Dict[str, Any], trader_list: Optional[List[str]] = None):
-        """Send message to specific traders or all traders."""
+    def split_traders_by_delivery(self) -> Tuple[List[str], List[str]]:
+        """Connected traders as (immediate, coalesced) book-update recipients."""
+        immediate, coalesced = [], []
+        for trader_id, trader_info in self.connected_traders.items():
+            trader = trader_info.get('trader_instance')
+            if getattr(trader, 'coalesce_book_updates', False):
+                coalesced.append(trader_id)
+            else:
+                immediate.append(trader_id)
+        return immediate, coalesced
+
+    @property
+    def flushing(self) -> bool:
+        return self._flush_task is not None
+
+    def start_flushing(self):
+        """Start coalescing book updates, if a flush interval is configured."""
+        if self.flush_interval > 0 and self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._run_flusher())
+
+    async def stop_flushing(self):
+        """Stop coalescing and send any update still pending."""
+        if self._flush_task is None:
+            return
+        self._flush_task.cancel()
+        try:
+            await self._flush_task
+        except asyncio.CancelledError:
+            pass
+        self._flush_task = None
+        await self.flush()
+
+    async def _run_flusher(self):
+        # The first update after a quiet spell goes out at once; later ones
+        # wait for the rest of the interval and are merged
+        while True:
+            await self._dirty.wait()
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"Error flushing book update: {e}")
+            await asyncio.sleep(self.flush_interval)
+
+    async def publish_book_update(self, base_message: Dict[str, Any],
+                                  incoming_message: Optional[Dict] = None):
+        """Send a BOOK_UPDATED now, or mark the book dirty for the next flush."""
+        if not self.flushing:
+            message = await self.create_broadcast_message(
+                "BOOK_UPDATED", base_message, None, 0, incoming_message
+            )
+            await self.broadcast_to_websockets(message)
+            await self.send_to_traders(message)
+            return
+
+        immediate, _ = self.split_traders_by_delivery()
+        if immediate:
+            message = await self.create_broadcast_message(
+                "BOOK_UPDATED", base_message, None, 0, incoming_message, include_history=False
+            )
+            await self.send_to_traders(message, immediate)
+
+        if self._dirty.is_set():
+            self.coalesced_updates += 1
+        self._pending_update.update(base_message)
+        self._pending_incoming = incoming_message
+        self._dirty.set()
+
+    async def flush(self):
+        """Send the pending book update to websockets and coalescing traders."""
+        if not self._dirty.is_set():
+            return
+        base_message, incoming_message = self._pending_update, self._pending_incoming
+        self._pending_update, self._pending_incoming = {}, None
+        self._dirty.clear()
+
+        message = await self.create_broadcast_message(
+            "BOOK_UPDATED", base_message, None, 0, incoming_message
+        )
+        await self.broadcast_to_websockets(message)
+        _, coalesced = self.split_traders_by_delivery()
+        if coalesced:
+            await self.send_to_traders(message, coalesced)
+
+    def _trader_instances(self, trader_list: Optional[List[str]] = None) -> List[Any]:
         if trader_list is None:
             trader_list = list(self.connected_traders.keys())
-        
+        instances = []
         for trader_id in trader_list:
             trader_info = self.connected_traders.get(trader_id)
             if trader_info and 'trader_instance' in trader_info:
-                trader = trader_info['trader_instance']
+                instances.append(trader_info['trader_instance'])
+        return instances
+
+    async def send_to_traders(self, message: Dict[str, Any], trader_list: Optional[List[str]] = None):
+        """Send message to specific traders or all traders.
+
+        The message is posted to each trader's mailbox; traders handle it on
+        their own task, so this returns without waiting for them.
+        """
+        with self.instrumentation.span(message.get("type"), "trader_notify"):
+            for trader in self._trader_instances(trader_list):
                 try:
-                    await trader.on_message_from_system(message)
+                    trader.post_message(message)
                 except Exception:
                     pass  # Continue to other traders
+
+    async def drain_traders(self, trader_list: Optional[List[str]] = None):
+        """Wait until traders have handled every message sent to them so far."""
+        await asyncio.gather(
+            *(trader.wait_for_mailbox() for trader in self._trader_instances(trader_list))
+        )
     
     async def create_broadcast_message(self, message_type: str, base_message: Dict[str, Any],
                                      start_time: Optional[datetime], duration: int,
-                                     incoming_message: Optional[Dict] = None) -> Dict[str, Any]:
-        """Create a complete broadcast message with all market data."""
+                                     incoming_message: Optional[Dict] = None,
+                                     include_history: bool = True) -> EncodedMessage:
+        """Create a complete broadcast message with all market data.
+
+        `history` holds only the trades since the previous broadcast, starting
+        at tape index `history_offset`; clients page in anything they missed.
+        Messages built with `include_history=False` leave the cursor alone.
+        The result encodes itself once however many clients it is sent to.
+        """
+        with self.instrumentation.span(message_type, "broadcast_build"):
+            return self._build_broadcast_message(
+                message_type, base_message, start_time, duration, incoming_message, include_history
+            )
+    
+    def _build_broadcast_message(self, message_type: str, base_message: Dict[str, Any],
+                                 start_time: Optional[datetime], duration: int,
+                                 incoming_message: Optional[Dict],
+                                 include_history: bool) -> EncodedMessage:
         current_time = datetime.now(timezone.utc)
+        spread, midpoint = self.order_book.get_spread()
         
         message = {
             "type": message_type,
@@ -319,16 +771,20 @@ class BroadcastService:
             "duration": duration,
             "order_book": self.order_book.get_order_book_snapshot(),
             "active_orders": self.order_book.get_active_orders_to_broadcast(),
-            "history": self.transaction_manager.transactions,
-            "spread": self.order_book.get_spread()[0],
-            "midpoint": self.order_book.get_spread()[1],
+            "spread": spread,
+            "midpoint": midpoint,
             "transaction_price": self.transaction_manager.transaction_price,
             "incoming_message": incoming_message,
             "informed_trader_progress": incoming_message.get("informed_trader_progress") if incoming_message else None,
             **base_message
         }
         
+        if include_history:
+            message["history_offset"] = self._history_cursor
+            message["history"] = self.transaction_manager.transactions_since(self._history_cursor)
+            self._history_cursor = self.transaction_manager.transaction_count
+        
         if message_type == "FILLED_ORDER" and incoming_message:
             message["matched_orders"] = incoming_message.get("matched_orders")
         
-        return message 
\ No newline at end of file
+        return self._encoded(message) 
\ No newline at end of file
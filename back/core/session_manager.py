@@ -109,27 +109,53 @@ class SessionManager:
 
         # Concurrency control: Lock for atomic session join operations
         self._session_join_lock = asyncio.Lock()
+
+        # Waiting room wakeups: session_id -> event set when the session starts or changes
+        self._session_events: Dict[str, asyncio.Event] = {}
         
     # Backward compatibility properties
     @property
     def session_pools(self) -> Dict[str, List[WaitingUser]]:
         """Convert RoleSlot sessions to WaitingUser format for compatibility."""
-        result = {}
-        for session_id, slots in self.session_slots.items():
-            users = []
-            params = self.session_params.get(session_id)
-            for slot in slots:
-                if slot.assigned_to:
-                    users.append(WaitingUser(
-                        username=slot.assigned_to,
-                        role=slot.role,
-                        goal=slot.goal,
-                        joined_at=slot.joined_at or datetime.now(timezone.utc),
-                        session_id=session_id,
-                        params=params or TradingParameters()
-                    ))
-            result[session_id] = users
-        return result
+        return {session_id: self._session_users(session_id) for session_id in self.session_slots}
+
+    def _session_users(self, session_id: str) -> List[WaitingUser]:
+        """WaitingUser view of a single session pool, without building the others."""
+        slots = self.session_slots.get(session_id)
+        if not slots:
+            return []
+        params = self.session_params.get(session_id)
+        return [
+            WaitingUser(
+                username=slot.assigned_to,
+                role=slot.role,
+                goal=slot.goal,
+                joined_at=slot.joined_at or datetime.now(timezone.utc),
+                session_id=session_id,
+                params=params or TradingParameters()
+            )
+            for slot in slots
+            if slot.assigned_to
+        ]
+
+    def _notify_session(self, session_id: str):
+        """Wake everyone waiting on a session; they re-read their status."""
+        event = self._session_events.pop(session_id, None)
+        if event is not None:
+            event.set()
+
+    async def wait_for_session_change(self, username: str) -> Dict:
+        """
+        Block until the user's waiting session starts, changes or goes away.
+        
+        Returns the user's status afterwards. Returns immediately if the user
+        is not waiting in a session pool.
+        """
+        session_id = self.user_sessions.get(username)
+        if session_id in self.session_slots:
+            event = self._session_events.setdefault(session_id, asyncio.Event())
+            await event.wait()
+        return self.get_session_status(username)
     
     @property
     def user_permanent_roles(self) -> Dict[str, TraderRole]:
@@ -182,7 +208,7 @@ class SessionManager:
         self.user_ready_status[username] = True
         
         # Check if this session is ready to start
-        session_users = self.session_pools.get(session_id, [])
+        session_users = self._session_users(session_id)
         if not session_users:
             raise Exception(f"Session {session_id} not found")
         
@@ -217,7 +243,7 @@ class SessionManager:
         if not session_id:
             raise Exception(f"User {username} not in any session")
         
-        session_users = self.session_pools.get(session_id, [])
+        session_users = self._session_users(session_id)
         if not session_users:
             raise Exception(f"Session {session_id} not found")
         
@@ -285,6 +311,7 @@ class SessionManager:
         
         for user in session_users:
             self.user_sessions[user.username] = market_id  # Update to market_id
+        self._notify_session(session_id)
         
         # Log market start to parameter_history.json for session tracking
         treatment_info = treatment_manager.get_treatment(market_count)
@@ -334,7 +361,7 @@ class SessionManager:
             }
         
         # It's a session pool
-        session_users = self.session_pools.get(session_id, [])
+        session_users = self._session_users(session_id)
         if not session_users:
             return {"status": "not_found"}
         
@@ -443,6 +470,8 @@ class SessionManager:
         self.active_markets.clear()
         self.user_sessions.clear()
         self.user_ready_status.clear()
+        for session_id in list(self._session_events):
+            self._notify_session(session_id)
         
         # Clear cohort state (users get reassigned on next join)
         self.user_cohorts.clear()
@@ -569,6 +598,9 @@ class SessionManager:
         # Remove ready status
         if username in self.user_ready_status:
             del self.user_ready_status[username]
+
+        # A refresh may leave this user's old waiting room socket blocked on the session
+        self._notify_session(current_session)
         
         logger.info(f"Removed user {username} from session {current_session}")
     
@@ -79,6 +79,14 @@ class SimpleMarketHandler:
         
         username = trader_id[6:]  # Remove "HUMAN_" prefix
         return self.session_manager.get_session_status(username)
+
+    async def wait_for_session_change_by_trader_id(self, trader_id: str) -> Dict:
+        """Block until the trader's waiting session changes; returns the new status."""
+        if not trader_id.startswith("HUMAN_"):
+            return {"status": "not_found"}
+        
+        username = trader_id[6:]  # Remove "HUMAN_" prefix
+        return await self.session_manager.wait_for_session_change(username)
     
     async def mark_trader_ready_by_trader_id(self, trader_id: str) -> bool:
         """Mark trader as ready using only trader ID."""
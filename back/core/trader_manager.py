@@ -6,7 +6,7 @@ helps find existing traders and returns their ids
 """
 
 from .data_models import TradingParameters, OrderType, ActionType, TraderType, TraderRole
-from typing import List, Optional
+from typing import Dict, List, Optional
 from traders import (
     HumanTrader,
     NoiseTrader,
@@ -24,6 +24,7 @@ import os
 from utils import setup_custom_logger
 import time
 import random
+import secrets
 
 logger = setup_custom_logger(__name__)
 
@@ -42,7 +43,11 @@ class TraderManager:
         self.human_informed_trader = None  # Keep only for tracking human trader with INFORMED role
         self.human_traders = []
         
+        # Market seed; each trader derives its own generators from it (BaseTrader.seed_rng)
+        self.random_seed = params.random_seed or secrets.randbits(32)
+        
         params_dict = params.model_dump()  # Convert to dict for easier access
+        params_dict["random_seed"] = self.random_seed
         
         # Create basic traders
         self.book_initializer = self._create_book_initializer(params)
@@ -65,6 +70,8 @@ class TraderManager:
             + [self.book_initializer]
             + self.simple_order_traders
         }
+        for trader in self.traders.values():
+            trader.seed_rng(self.random_seed)
         
         # Create trading market
         # Use provided market_id or generate one with timestamp
@@ -76,7 +83,11 @@ class TraderManager:
             market_id=market_id,
             duration=params.trading_day_duration,
             default_price=params.default_price,
-            params=params_dict  # Pass dict
+            params=params_dict,  # Pass dict
+            trader_counts=self.get_trader_counts,
+        )
+        self.trading_market.orchestrator.journal_control(
+            "rng_seeds", traders={trader_id: trader.rng_seed for trader_id, trader in self.traders.items()}
         )
 
     def _create_simple_order_traders(self, params: dict):
@@ -290,6 +301,12 @@ class TraderManager:
 
         await trading_market_task
 
+    def get_trader_counts(self) -> Dict[str, int]:
+        return {
+            "current_human_traders": len(self.human_traders),
+            "expected_human_traders": len(self.params.predefined_goals),
+        }
+
     async def cleanup(self):
         await self.trading_market.clean_up()
         for trader in self.traders.values():
@@ -4,13 +4,17 @@ This replaces the bloated 558-line God class with clean separation of concerns.
 """
 import asyncio
 from datetime import datetime, timedelta, timezone
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 from .handlers import MarketOrchestrator
 from .data_models import OrderType
+from .transaction_manager import HISTORY_PAGE_SIZE
 
 
 class TradingPlatform:
     """Lightweight coordinator using event-driven architecture."""
+
+    # Seconds between the market clock's time updates
+    CLOCK_INTERVAL = 1.0
     
     def __init__(
         self,
@@ -20,6 +24,7 @@ class TradingPlatform:
         default_spread: int = 10,
         punishing_constant: int = 1,
         params: Dict = None,
+        trader_counts: Optional[Callable[[], Dict[str, int]]] = None,
     ):
         # Store basic configuration
         self.id = market_id
@@ -48,6 +53,10 @@ class TradingPlatform:
         self._stop_requested = asyncio.Event()
         self.release_event = asyncio.Event()
         self.process_transactions_task = None
+        # One clock per market sends every client the same time_update frame;
+        # trader_counts() adds the joined/expected human counts to it
+        self.trader_counts = trader_counts
+        self.clock_task: Optional[asyncio.Task] = None
     
     # External interface methods (UNCHANGED - maintain compatibility)
     async def handle_trader_message(self, message: dict) -> dict:
@@ -61,6 +70,43 @@ class TradingPlatform:
     def unregister_websocket(self, websocket):
         """Unregister a WebSocket connection."""
         self.orchestrator.unregister_websocket(websocket)
+
+    async def subscribe_book_deltas(self, websocket):
+        """Send book updates to this WebSocket as a snapshot followed by deltas."""
+        await self.orchestrator.subscribe_book_deltas(websocket)
+
+    async def resync_book(self, websocket):
+        """Resend the full book to a delta subscriber that lost sync."""
+        await self.orchestrator.resync_book(websocket)
+
+    def send_to_websocket(self, websocket, text, replace_key=None) -> bool:
+        """Queue an encoded frame on a registered WebSocket's writer; False if unregistered."""
+        return self.orchestrator.broadcast_service.send_frame(websocket, text, replace_key)
+
+    def set_websocket_encoding(self, websocket, encoding: str) -> str:
+        """Switch a WebSocket to `encoding` if supported; returns the encoding in effect."""
+        return self.orchestrator.broadcast_service.set_encoding(websocket, encoding)
+
+    def websocket_encoding(self, websocket) -> Tuple[str, float]:
+        """Wire format of a WebSocket and the tick size its prices are sent in."""
+        broadcast_service = self.orchestrator.broadcast_service
+        return broadcast_service.encoding_of(websocket), broadcast_service.tick_size
+
+    def get_fanout_metrics(self) -> dict:
+        """Queue depth and drop counters for this market's WebSockets."""
+        return self.orchestrator.broadcast_service.fanout_metrics()
+    
+    def get_latency_metrics(self) -> dict:
+        """Latency histograms per event type and stage for this market."""
+        return self.orchestrator.get_latency_metrics()
+    
+    def set_instrumentation(self, enabled: bool) -> None:
+        """Turn latency recording on or off for this market."""
+        self.orchestrator.set_instrumentation(enabled)
+    
+    def get_rate_limit_metrics(self) -> dict:
+        """Messages the router accepted and rate limited for this market."""
+        return self.orchestrator.get_rate_limit_metrics()
     
     async def send_message_to_traders(self, message: dict, trader_list=None) -> None:
         """Send a message to all traders or a specific list of traders."""
@@ -76,20 +122,27 @@ class TradingPlatform:
         self.process_transactions_task = asyncio.create_task(
             self.orchestrator.transaction_manager.process_transactions()
         )
+        self.clock_task = asyncio.create_task(self.run_clock())
     
     async def clean_up(self) -> None:
         """Clean up resources when shutting down."""
         self._stop_requested.set()
         self.active = False
         self.orchestrator.active = False
+        await self.orchestrator.stop_batch_auctions()
+        await self.orchestrator.stop_latency_summaries()
+        await self.orchestrator.close_journal()
+        await self.orchestrator.sequencer.close()
+        await self.orchestrator.broadcast_service.stop_flushing()
         
-        # Cancel transaction processor
-        if self.process_transactions_task:
-            self.process_transactions_task.cancel()
-            try:
-                await self.process_transactions_task
-            except asyncio.CancelledError:
-                pass
+        # Cancel transaction processor and clock
+        for task in (self.process_transactions_task, self.clock_task):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
     
     def set_initialization_complete(self):
         """Set the initialization_complete flag."""
@@ -106,6 +159,7 @@ class TradingPlatform:
         self.orchestrator.active = True
         self.orchestrator.start_time = self.start_time
         self.orchestrator.trading_started = True
+        self.orchestrator.journal_control("start")
         
         # Broadcast trading started
         message = await self.orchestrator.broadcast_service.create_broadcast_message(
@@ -116,6 +170,10 @@ class TradingPlatform:
         )
         await self.orchestrator.broadcast_service.broadcast_to_websockets(message)
         await self.orchestrator.broadcast_service.send_to_traders(message)
+        
+        self.orchestrator.start_batch_auctions()
+        self.orchestrator.start_latency_summaries()
+        self.orchestrator.broadcast_service.start_flushing()
     
     async def run(self) -> None:
         """Run the trading market."""
@@ -124,27 +182,38 @@ class TradingPlatform:
             if self._should_stop_trading(current_time):
                 await self._end_trading_market()
                 break
-            
-            # Send time updates for the countdown timer
-            if self.start_time and self.active:
-                remaining_time_seconds = max(0, (self.duration * 60) - (current_time - self.start_time).total_seconds())
-                time_update = {
-                    "type": "time_update",
-                    "data": {
-                        "remaining_time": remaining_time_seconds,  # Changed from remainingTime to remaining_time for consistency
-                        "dayOver": remaining_time_seconds <= 0,
-                        "current_time": current_time.isoformat(),
-                        "is_trading_started": self.trading_started
-                    }
-                }
-                await self.orchestrator.broadcast_service.broadcast_to_websockets(time_update)
-                
             await asyncio.sleep(1)
         
         # Add delay before cleanup
         await asyncio.sleep(3)
         await self.clean_up()
     
+    def time_update(self, current_time: datetime) -> Dict:
+        """The clock's message: countdown, trading state and human trader counts."""
+        remaining_time = None
+        if self.trading_started and self.start_time:
+            remaining_time = max(0, (self.duration * 60) - (current_time - self.start_time).total_seconds())
+        data = {
+            "current_time": current_time.isoformat(),
+            "is_trading_started": self.trading_started,
+            "remaining_time": remaining_time,
+            "dayOver": remaining_time is not None and remaining_time <= 0,
+        }
+        if self.trader_counts:
+            data.update(self.trader_counts())
+        return {"type": "time_update", "data": data}
+
+    async def run_clock(self) -> None:
+        """Broadcast one time_update per tick to every connected client until the market ends."""
+        while not self._stop_requested.is_set() and not self.is_finished:
+            try:
+                await self.orchestrator.broadcast_service.broadcast_to_websockets(
+                    self.time_update(self.current_time)
+                )
+            except Exception as e:
+                print(f"Error sending time update: {e}")
+            await asyncio.sleep(self.CLOCK_INTERVAL)
+
     def _should_stop_trading(self, current_time: datetime) -> bool:
         """Check if the trading market should stop."""
         return (
@@ -156,8 +225,14 @@ class TradingPlatform:
         """End the trading market and perform cleanup."""
         self.active = False
         self.orchestrator.active = False
+        self.orchestrator.journal_control("stop")
         
-        await self.close_existing_book()
+        # Clear the last batch before closing out resting orders
+        await self.orchestrator.stop_batch_auctions()
+        await self.orchestrator.broadcast_service.stop_flushing()
+        # Sequenced, so orders queued before the stop are applied first
+        await self.orchestrator.close_book()
+        await self.orchestrator.journal_checkpoint()
         
         # Broadcast stop trading
         message = await self.orchestrator.broadcast_service.create_broadcast_message(
@@ -165,6 +240,8 @@ class TradingPlatform:
         )
         await self.orchestrator.broadcast_service.broadcast_to_websockets(message)
         await self.orchestrator.broadcast_service.send_to_traders(message)
+        # Traders report inventory from their mailbox; let that land first
+        await self.orchestrator.broadcast_service.drain_traders()
         
         await self._handle_final_inventory_reports()
         
@@ -174,52 +251,21 @@ class TradingPlatform:
         )
         await self.orchestrator.broadcast_service.broadcast_to_websockets(message)
         await self.orchestrator.broadcast_service.send_to_traders(message)
+
+        # Let queued frames and trader messages (closure included) go out before teardown
+        try:
+            await asyncio.wait_for(asyncio.gather(
+                self.orchestrator.broadcast_service.drain_websockets(),
+                self.orchestrator.broadcast_service.drain_traders(),
+            ), timeout=2)
+        except asyncio.TimeoutError:
+            pass
         
         self.is_finished = True
     
     async def close_existing_book(self) -> None:
         """Close the existing order book."""
-        active_orders = self.orchestrator.order_book_manager.order_book.active_orders
-        
-        for order_id, order in active_orders.items():
-            platform_order_type = (
-                OrderType.ASK.value
-                if order["order_type"] == OrderType.BID
-                else OrderType.BID
-            )
-            closure_price = self.orchestrator.pricing_service.calculate_closure_price(
-                order["amount"], order["order_type"]
-            )
-            
-            from .data_models import Order, OrderStatus
-            platform_order = Order(
-                trader_id=self.id,
-                order_type=platform_order_type,
-                amount=order["amount"],
-                price=closure_price,
-                status=OrderStatus.BUFFERED.value,
-                market_id=self.id,
-            )
-            
-            # Place platform order
-            await self.orchestrator.order_service.process_order(platform_order.model_dump())
-            
-            # Create transaction
-            if order["order_type"] == OrderType.BID:
-                await self.orchestrator.transaction_service.create_transaction(
-                    order, platform_order.model_dump(), closure_price
-                )
-            else:
-                await self.orchestrator.transaction_service.create_transaction(
-                    platform_order.model_dump(), order, closure_price
-                )
-        
-        # Broadcast book updated
-        message = await self.orchestrator.broadcast_service.create_broadcast_message(
-            "BOOK_UPDATED", {"text": "book is updated"}, self.start_time, self.duration
-        )
-        await self.orchestrator.broadcast_service.broadcast_to_websockets(message)
-        await self.orchestrator.broadcast_service.send_to_traders(message)
+        await self.orchestrator.close_existing_book()
     
     async def _handle_final_inventory_reports(self) -> None:
         """Handle final inventory reports from all traders."""
@@ -299,6 +345,10 @@ class TradingPlatform:
     def get_transaction_history(self) -> List[Dict]:
         """Get the transaction history."""
         return self.transactions
+
+    def get_history_page(self, cursor: Optional[int] = None, limit: int = HISTORY_PAGE_SIZE) -> Dict:
+        """Get a page of the transaction history; the latest trades if no cursor is given."""
+        return self.orchestrator.transaction_manager.history_page(cursor, limit)
     
     def get_active_orders_to_broadcast(self) -> List[Dict]:
         """Get a list of active orders to broadcast."""
@@ -2,26 +2,37 @@ import asyncio
 from typing import Dict, List, Tuple, Optional
 from core.data_models import TransactionModel, OrderType
 
+# Default and maximum number of trades in one history page
+HISTORY_PAGE_SIZE = 100
+MAX_HISTORY_PAGE_SIZE = 1000
+
+
 class TransactionManager:
     def __init__(self, market_id: str):
         self.market_id = market_id
         self.transaction_list: List[TransactionModel] = []
+        # Append-only tape of serialized transactions, parallel to transaction_list;
+        # a trade's index in it is its history cursor
+        self._tape: List[Dict] = []
         self.transaction_queue: asyncio.Queue = asyncio.Queue()
         self._last_transaction_price: Optional[float] = None
 
 
     async def create_transaction(self, bid: Dict, ask: Dict, transaction_price: float) -> Tuple[str, str, TransactionModel, Dict]:
         bid_id, ask_id = bid["id"], ask["id"]
+        amount = min(bid["amount"], ask["amount"])
 
         transaction = TransactionModel(
             trading_market_id=self.market_id,
             bid_order_id=bid_id,
             ask_order_id=ask_id,
             price=transaction_price,
-            informed_trader_progress=bid.get("informed_trader_progress") or ask.get("informed_trader_progress")
+            informed_trader_progress=bid.get("informed_trader_progress") or ask.get("informed_trader_progress"),
+            amount=amount,
         )
 
         self.transaction_list.append(transaction)
+        self._tape.append(transaction.to_dict())
         await self.transaction_queue.put(transaction)
         self._last_transaction_price = transaction_price
 
@@ -41,7 +52,7 @@ class TransactionManager:
                 "bid_order_id": str(bid_id),
                 "ask_order_id": str(ask_id),
                 "transaction_price": transaction_price,
-                "transaction_amount": min(bid["amount"], ask["amount"]),
+                "transaction_amount": amount,
                 "bid_trader_id": bid["trader_id"],
                 "ask_trader_id": ask["trader_id"],
                 "bid_price": bid["price"],
@@ -54,7 +65,33 @@ class TransactionManager:
     
     @property
     def transactions(self) -> List[Dict]:
-        return [transaction.to_dict() for transaction in self.transaction_list]
+        return list(self._tape)
+
+    @property
+    def transaction_count(self) -> int:
+        return len(self._tape)
+
+    def transactions_since(self, cursor: int) -> List[Dict]:
+        """Serialized trades from tape index `cursor` onwards."""
+        return self._tape[cursor:]
+
+    def history_page(self, cursor: Optional[int] = None, limit: int = HISTORY_PAGE_SIZE) -> Dict:
+        """A page of the trade tape starting at `cursor`, or the latest `limit` trades if None.
+
+        `next_cursor` continues forwards and `prev_cursor` backwards; either is
+        None at the respective end of the tape.
+        """
+        limit = max(1, min(limit, MAX_HISTORY_PAGE_SIZE))
+        total = len(self._tape)
+        start = max(0, total - limit) if cursor is None else max(0, min(cursor, total))
+        end = min(start + limit, total)
+        return {
+            "history": self._tape[start:end],
+            "history_offset": start,
+            "next_cursor": end if end < total else None,
+            "prev_cursor": max(0, start - limit) if start > 0 else None,
+            "total": total,
+        }
 
     @property
     def transaction_price(self) -> Optional[float]:
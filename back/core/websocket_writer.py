@@ -0,0 +1,177 @@
+"""
+Per-connection outbound queues so market fan-out never waits on a client.
+
+Broadcasting only appends encoded frames to each connection's queue; a
+writer task per connection drains it. Slow consumers are handled without
+blocking anyone else:
+
+- frames with a `replace_key` (full book states, time updates) supersede
+  any queued frame with the same key, so only the latest is sent;
+- frames marked `delta` are shed as a group when the queue overflows, and
+  the writer sends a fresh snapshot once it catches up;
+- every other frame (trades, fills, lifecycle messages) is kept in order,
+  and a client whose queue stays above `max_queue` for longer than
+  `max_lag` seconds is disconnected. A single burst (a large order sweeping
+  hundreds of levels) may overshoot `max_queue` before the writer gets to
+  run, so overflow alone only starts the clock; only a backlog of
+  `HARD_LIMIT_FACTOR` times `max_queue` disconnects at once.
+"""
+import asyncio
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Optional, Tuple, Union
+
+from utils.utils import setup_custom_logger
+from utils.websocket_utils import JSON_ENCODING
+
+logger = setup_custom_logger(__name__)
+
+# Close code for clients disconnected for not keeping up ("try again later")
+SLOW_CONSUMER_CLOSE_CODE = 1013
+
+# (text or binary payload, replace_key, is_delta)
+Frame = Tuple[Union[str, bytes], Optional[str], bool]
+
+
+class WebSocketWriter:
+    """Bounded outbound queue plus writer task for one WebSocket."""
+
+    # Queue length, as a multiple of max_queue, that disconnects without waiting for max_lag
+    HARD_LIMIT_FACTOR = 16
+
+    def __init__(self, websocket, max_queue: int,
+                 on_close: Callable[["WebSocketWriter"], None],
+                 resync: Optional[Callable[[], Union[str, bytes]]] = None,
+                 max_lag: float = 1.0):
+        self.websocket = websocket
+        self.max_queue = max_queue
+        self.max_lag = max_lag
+        # Monotonic time the queue last went above max_queue; None while it is within bounds
+        self.overflow_since: Optional[float] = None
+        # Wire format negotiated by the client (see utils.websocket_utils)
+        self.encoding = JSON_ENCODING
+        self.on_close = on_close
+        # Builds the snapshot frame that replaces shed deltas
+        self.resync = resync
+        self.queue: Deque[Frame] = deque()
+        self.resync_pending = False
+        self.closed = False
+        self.slow_consumer = False
+        self.sent = 0
+        self.dropped = 0
+        self.high_water = 0
+        self._wakeup = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None and not self.closed:
+            self._task = asyncio.create_task(self._run())
+
+    def send(self, text: Union[str, bytes], replace_key: Optional[str] = None,
+             delta: bool = False) -> bool:
+        """Queue a frame without waiting; returns False if the connection is gone."""
+        if self.closed:
+            return False
+        if delta and self.resync_pending:
+            # The snapshot sent on catching up will cover this delta
+            self.dropped += 1
+            return True
+        if replace_key is not None and self.queue:
+            self._discard(lambda frame: frame[1] == replace_key)
+
+        self.queue.append((text, replace_key, delta))
+        if len(self.queue) > self.max_queue:
+            if self.resync is not None and self._discard(lambda frame: frame[2]):
+                self.resync_pending = True
+            if len(self.queue) > self.max_queue and self._lagging():
+                logger.warning(f"Disconnecting slow WebSocket consumer with {len(self.queue)} queued frames")
+                self.slow_consumer = True
+                self.close()
+                return False
+
+        self.high_water = max(self.high_water, len(self.queue))
+        self._idle.clear()
+        self._wakeup.set()
+        self.start()
+        return True
+
+    def _lagging(self) -> bool:
+        """True once an overflowing queue has outlasted max_lag or the hard limit."""
+        now = time.monotonic()
+        if self.overflow_since is None:
+            self.overflow_since = now
+        return (now - self.overflow_since > self.max_lag
+                or len(self.queue) > self.max_queue * self.HARD_LIMIT_FACTOR)
+
+    def _discard(self, predicate: Callable[[Frame], bool]) -> int:
+        kept = deque(frame for frame in self.queue if not predicate(frame))
+        discarded = len(self.queue) - len(kept)
+        if discarded:
+            self.queue = kept
+            self.dropped += discarded
+        return discarded
+
+    async def _run(self):
+        try:
+            while True:
+                if not self.queue and not self.resync_pending:
+                    self._idle.set()
+                    self._wakeup.clear()
+                    await self._wakeup.wait()
+                    continue
+                if self.queue:
+                    text = self.queue.popleft()[0]
+                    if self.overflow_since is not None and len(self.queue) <= self.max_queue:
+                        self.overflow_since = None
+                else:
+                    # Built now, so it covers every delta shed meanwhile
+                    self.resync_pending = False
+                    text = self.resync()
+                if isinstance(text, bytes):
+                    await self.websocket.send_bytes(text)
+                else:
+                    await self.websocket.send_text(text)
+                self.sent += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.info(f"WebSocket writer stopped: {e}")
+            self.close()
+
+    async def wait_idle(self):
+        """Wait until everything queued so far has been handed to the socket."""
+        if not self.closed:
+            await self._idle.wait()
+
+    def close(self):
+        """Stop writing, drop the queue and tell the owner; safe to call twice."""
+        if self.closed:
+            return
+        self.closed = True
+        self.dropped += len(self.queue)
+        self.queue.clear()
+        self._idle.set()
+        if self._task is not None and self._task is not asyncio.current_task():
+            self._task.cancel()
+        if self.slow_consumer:
+            self._task = asyncio.create_task(self._close_socket())
+        self.on_close(self)
+
+    async def _close_socket(self):
+        try:
+            await asyncio.wait_for(
+                self.websocket.close(code=SLOW_CONSUMER_CLOSE_CODE, reason="Slow consumer"),
+                timeout=1,
+            )
+        except Exception:
+            pass
+
+    def metrics(self) -> Dict[str, int]:
+        return {
+            "queue_depth": len(self.queue),
+            "high_water": self.high_water,
+            "sent": self.sent,
+            "dropped": self.dropped,
+        }
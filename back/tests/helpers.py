@@ -0,0 +1,54 @@
+"""
+Shared fakes for the market engine tests.
+"""
+
+import sys
+import os
+import json
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.data_models import TraderType
+from traders.base_trader import BaseTrader
+
+
+def make_order(order_id, order_type, price, amount=1, trader_id="T1"):
+    return {
+        "id": order_id,
+        "trader_id": trader_id,
+        "order_type": order_type.value,
+        "price": price,
+        "amount": amount,
+        "timestamp": "2026-01-01 00:00:00.000000",
+    }
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+        self.frames = []
+
+        self.closed_with = None
+
+    async def send_text(self, text):
+        self.frames.append(text)
+        self.sent.append(json.loads(text))
+
+    async def send_bytes(self, data):
+        import msgpack
+
+        self.frames.append(data)
+        self.sent.append(msgpack.unpackb(data))
+
+    async def close(self, code=1000, reason=None):
+        self.closed_with = code
+
+
+class RecordingTrader(BaseTrader):
+    def __init__(self, coalesce_book_updates, trader_id="REC"):
+        super().__init__(TraderType.NOISE, trader_id)
+        self.coalesce_book_updates = coalesce_book_updates
+        self.messages = []
+
+    async def on_message_from_system(self, message):
+        self.messages.append(message)
@@ -0,0 +1,52 @@
+"""
+Benchmark harness tests.
+
+Tests cover:
+1. Summaries and regression detection against a baseline
+2. A tiny engine case runs end to end
+3. Serializer cases encode the same JSON both ways
+4. Routing cases run end to end
+"""
+
+import sys
+import os
+import asyncio
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.harness import BenchResult, CaseRun, find_regressions, summarize
+from benchmarks.bench_engine import engine_match
+from benchmarks.bench_events import MESSAGES, route_case
+from benchmarks.bench_serialize import PAYLOADS
+from utils.websocket_utils import dumps, sanitize_websocket_message
+
+
+def test_summarize_and_regressions():
+    result = summarize("case", CaseRun([1_000] * 98 + [50_000] * 2, 198_000))
+    assert result.ops == 100
+    assert result.p50_us == 1.0
+    assert result.p99_us == 50.0
+
+    baseline = {"case": {"ops_per_sec": result.ops_per_sec * 2, "p99_us": 50.0}}
+    assert [name for name, _ in find_regressions([result], baseline, 0.25)] == ["case"]
+    baseline = {"case": {"ops_per_sec": result.ops_per_sec * 1.1, "p99_us": 50.0}}
+    assert find_regressions([result], baseline, 0.25) == []
+
+
+def test_engine_case_runs():
+    for engine in ("sorted", "tick_ladder"):
+        run = engine_match(engine, 200, 10)
+        assert len(run.latencies_ns) == 200
+        assert run.total_ns > 0
+
+
+def test_serializer_payloads_encode_identically():
+    for payload, (build, encoder) in PAYLOADS.items():
+        message = build(50, 20)
+        assert encoder.encode(message) == dumps(sanitize_websocket_message(message)), payload
+
+
+def test_routing_cases_run():
+    for op, build in MESSAGES.items():
+        run = asyncio.run(route_case(build(100)))
+        assert len(run.latencies_ns) == 100, op
@@ -0,0 +1,298 @@
+"""
+Broadcast pipeline tests.
+
+Tests cover:
+- Sequenced snapshot/delta book stream with checksums
+- Incremental broadcast history and the paginated trade tape
+- Coalesced book broadcasts with per-trader immediate delivery
+- Broadcasts encoded once and shared across sockets
+"""
+
+import sys
+import os
+import asyncio
+import json
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.orderbook_manager import OrderBook, book_checksum
+from core.data_models import OrderType
+from helpers import make_order, FakeWebSocket, RecordingTrader
+
+
+class TestBookDeltas:
+    def test_drain_changes_reports_absolute_level_sizes(self):
+        book = OrderBook()
+        book.place_order(make_order("b0", OrderType.BID, 99, amount=2))
+        book.set_change_tracking(True)
+        assert book.drain_changes() == {"bids": [], "asks": [], "orders": [], "removed_orders": []}
+
+        book.place_order(make_order("b1", OrderType.BID, 99))
+        book.place_order(make_order("a0", OrderType.ASK, 101, amount=3))
+        changes = book.drain_changes()
+        assert changes["bids"] == [{"x": 99, "y": 3}]
+        assert changes["asks"] == [{"x": 101, "y": 3}]
+        assert {row["id"] for row in changes["orders"]} == {"b1", "a0"}
+
+        # Partial fill shrinks a level; a full fill removes it
+        book.place_order(make_order("x0", OrderType.BID, 101, amount=1))
+        book.clear_orders()
+        book.cancel_order("b0")
+        changes = book.drain_changes()
+        assert changes["asks"] == [{"x": 101, "y": 2}]
+        assert changes["bids"] == [{"x": 101, "y": 0}, {"x": 99, "y": 1}]
+        assert sorted(changes["removed_orders"]) == ["b0", "x0"]
+        assert [row["amount"] for row in changes["orders"]] == [2]
+
+    def test_clear_forces_snapshot(self):
+        book = OrderBook()
+        book.set_change_tracking(True)
+        book.place_order(make_order("b0", OrderType.BID, 99))
+        book.clear()
+        assert book.drain_changes() is None
+        assert book.drain_changes() == {"bids": [], "asks": [], "orders": [], "removed_orders": []}
+
+    def test_checksum_format(self):
+        import zlib
+
+        snapshot = {"bids": [{"x": 100.5, "y": 3}], "asks": [{"x": 101, "y": 0.25}]}
+        assert book_checksum(snapshot) == zlib.crc32(b"100.5:3|101:0.25")
+
+    @pytest.mark.asyncio
+    async def test_subscriber_rebuilds_book_from_deltas(self):
+        from core.handlers import MarketOrchestrator
+
+        orchestrator = MarketOrchestrator("delta_test", 1, 100, 10, 10, {})
+        orchestrator.active = True
+        service = orchestrator.broadcast_service
+        service.checksum_interval = 2
+        delta_ws, full_ws = FakeWebSocket(), FakeWebSocket()
+        orchestrator.register_websocket(full_ws)
+        orchestrator.register_websocket(delta_ws)
+
+        await orchestrator.handle_trader_message({
+            "type": "add_order", "order_id": "a0", "trader_id": "T1",
+            "order_type": OrderType.ASK.value, "price": 101, "amount": 2,
+        })
+        await orchestrator.subscribe_book_deltas(delta_ws)
+        await service.drain_websockets()
+        snapshot = delta_ws.sent[-1]
+        assert snapshot["type"] == "book_snapshot" and snapshot["seq"] == 0
+        levels = {(side, level["x"]): level["y"]
+                  for side in ("bids", "asks") for level in snapshot["order_book"][side]}
+        history = list(snapshot["history"])
+
+        for i, (order_type, price) in enumerate([(OrderType.BID, 99), (OrderType.BID, 101)]):
+            await orchestrator.handle_trader_message({
+                "type": "add_order", "order_id": f"b{i}", "trader_id": "T2",
+                "order_type": order_type.value, "price": price, "amount": 1,
+            })
+        await service.drain_websockets()
+
+        deltas = [m for m in delta_ws.sent if m["type"] == "book_delta"]
+        assert [d["seq"] for d in deltas] == list(range(1, len(deltas) + 1))
+        assert all("active_orders" not in d for d in deltas)
+        for delta in deltas:
+            for side in ("bids", "asks"):
+                for level in delta[side]:
+                    if level["y"]:
+                        levels[(side, level["x"])] = level["y"]
+                    else:
+                        levels.pop((side, level["x"]), None)
+            history.extend(delta["history"][len(history) - delta["history_offset"]:])
+
+        snapshot = orchestrator.order_book_manager.get_order_book_snapshot()
+        assert levels == {(side, level["x"]): level["y"]
+                          for side in ("bids", "asks") for level in snapshot[side]}
+        assert len(history) == 1
+        assert any(d.get("checksum") == book_checksum(snapshot) for d in deltas)
+        # Sockets that did not subscribe keep getting full broadcasts
+        full_updates = [m for m in full_ws.sent if m.get("type") == "BOOK_UPDATED"]
+        assert full_updates and all("active_orders" in m for m in full_updates)
+
+        await orchestrator.resync_book(delta_ws)
+        await service.drain_websockets()
+        assert delta_ws.sent[-1]["type"] == "book_snapshot"
+        assert delta_ws.sent[-1]["seq"] == deltas[-1]["seq"]
+
+
+class TestTransactionHistory:
+    async def fill_tape(self, transaction_manager, count):
+        for i in range(count):
+            bid = make_order(f"b{i}", OrderType.BID, 100)
+            ask = make_order(f"a{i}", OrderType.ASK, 100, trader_id="T2")
+            await transaction_manager.create_transaction(bid, ask, 100 + i)
+
+    @pytest.mark.asyncio
+    async def test_cursor_pagination(self):
+        from core.transaction_manager import TransactionManager
+
+        transaction_manager = TransactionManager("history_test")
+        await self.fill_tape(transaction_manager, 25)
+
+        page = transaction_manager.history_page(limit=10)
+        assert page["history_offset"] == 15 and page["total"] == 25
+        assert [t["price"] for t in page["history"]] == list(range(115, 125))
+        assert page["next_cursor"] is None and page["prev_cursor"] == 5
+
+        prices = []
+        cursor = 0
+        while cursor is not None:
+            page = transaction_manager.history_page(cursor, 10)
+            prices.extend(t["price"] for t in page["history"])
+            cursor = page["next_cursor"]
+        assert prices == list(range(100, 125))
+        assert transaction_manager.history_page(0, 10)["prev_cursor"] is None
+
+    @pytest.mark.asyncio
+    async def test_tape_entries_carry_traded_amount(self):
+        from core.transaction_manager import TransactionManager
+
+        transaction_manager = TransactionManager("amount_test")
+        await transaction_manager.create_transaction(
+            make_order("b0", OrderType.BID, 100, amount=3), make_order("a0", OrderType.ASK, 100, amount=2), 100
+        )
+        await self.fill_tape(transaction_manager, 1)
+
+        history = transaction_manager.history_page()["history"]
+        assert [(t["price"], t["amount"]) for t in history] == [(100, 2), (100, 1)]
+
+    @pytest.mark.asyncio
+    async def test_broadcasts_carry_only_new_trades(self):
+        from core.handlers import MarketOrchestrator
+
+        orchestrator = MarketOrchestrator("history_broadcast_test", 1, 100, 10, 10, {})
+        service = orchestrator.broadcast_service
+        await self.fill_tape(orchestrator.transaction_manager, 3)
+
+        first = await service.create_broadcast_message("BOOK_UPDATED", {}, None, 0)
+        assert first["history_offset"] == 0 and len(first["history"]) == 3
+
+        await self.fill_tape(orchestrator.transaction_manager, 1)
+        second = await service.create_broadcast_message("BOOK_UPDATED", {}, None, 0)
+        assert second["history_offset"] == 3 and len(second["history"]) == 1
+
+        third = await service.create_broadcast_message("BOOK_UPDATED", {}, None, 0)
+        assert third["history_offset"] == 4 and third["history"] == []
+
+
+class TestBroadcastCoalescing:
+    @pytest.mark.asyncio
+    async def test_websockets_get_merged_updates_and_trades_in_order(self):
+        from core.handlers import MarketOrchestrator
+
+        orchestrator = MarketOrchestrator(
+            "coalesce_test", 1, 100, 10, 10, {"broadcast_flush_interval_ms": 50}
+        )
+        orchestrator.active = True
+        service = orchestrator.broadcast_service
+        websocket = FakeWebSocket()
+        orchestrator.register_websocket(websocket)
+        algo, human = RecordingTrader(False), RecordingTrader(True)
+        service.connected_traders.update({
+            "ALGO": {"trader_instance": algo},
+            "HUMAN": {"trader_instance": human},
+        })
+        service.start_flushing()
+        try:
+            for i in range(10):
+                await orchestrator.handle_trader_message({
+                    "type": "add_order", "order_id": f"a{i}", "trader_id": "T1",
+                    "order_type": OrderType.ASK.value, "price": 101 + i, "amount": 1,
+                })
+            await orchestrator.handle_trader_message({
+                "type": "add_order", "order_id": "b0", "trader_id": "T2",
+                "order_type": OrderType.BID.value, "price": 101, "amount": 1,
+            })
+            await asyncio.sleep(0)
+        finally:
+            await service.stop_flushing()
+        await service.drain_websockets()
+        await service.drain_traders()
+
+        def book_updates(messages):
+            return [m for m in messages if m["type"] == "BOOK_UPDATED"]
+
+        # Algos are posted every update (their mailbox keeps the newest if they
+        # fall behind); browsers and humans get merged ones
+        assert len(book_updates(algo.messages)) + algo.superseded_messages == 11
+        assert len(book_updates(websocket.sent)) < 11
+        assert (len(book_updates(human.messages)) + human.superseded_messages
+                == len(book_updates(websocket.sent)))
+        assert service.coalesced_updates > 0
+
+        # The trade is never merged, and the final flush shows the settled book
+        assert [m["type"] for m in websocket.sent].count("transaction_update") == 1
+        last = book_updates(websocket.sent)[-1]
+        assert len(last["active_orders"]) == 9
+        assert sum(len(m["history"]) for m in book_updates(websocket.sent)) == 1
+
+    @pytest.mark.asyncio
+    async def test_updates_are_immediate_until_flushing_starts(self):
+        from core.handlers import MarketOrchestrator
+
+        orchestrator = MarketOrchestrator(
+            "coalesce_off_test", 1, 100, 10, 10, {"broadcast_flush_interval_ms": 50}
+        )
+        orchestrator.active = True
+        websocket = FakeWebSocket()
+        orchestrator.register_websocket(websocket)
+        for i in range(3):
+            await orchestrator.handle_trader_message({
+                "type": "add_order", "order_id": f"a{i}", "trader_id": "T1",
+                "order_type": OrderType.ASK.value, "price": 101, "amount": 1,
+            })
+            await orchestrator.broadcast_service.drain_websockets()
+        assert len(websocket.sent) == 3
+
+
+class TestEncodedBroadcasts:
+    @pytest.mark.asyncio
+    async def test_one_encode_per_broadcast_and_book_version(self, monkeypatch):
+        import utils.websocket_utils as websocket_utils
+        from core.handlers import MarketOrchestrator
+
+        orchestrator = MarketOrchestrator("encode_test", 1, 100, 10, 10, {})
+        orchestrator.active = True
+        service = orchestrator.broadcast_service
+        websockets = [FakeWebSocket() for _ in range(3)]
+        for websocket in websockets:
+            orchestrator.register_websocket(websocket)
+        await orchestrator.handle_trader_message({
+            "type": "add_order", "order_id": "a0", "trader_id": "T1",
+            "order_type": OrderType.ASK.value, "price": 101, "amount": 1,
+        })
+
+        encodes = []
+        original = websocket_utils.dumps
+        monkeypatch.setattr(websocket_utils, "dumps",
+                            lambda value: encodes.append(value) or original(value))
+
+        # Same book version: the depth and active orders are not re-encoded
+        for _ in range(2):
+            message = await service.create_broadcast_message("BOOK_UPDATED", {}, None, 0)
+            await service.broadcast_to_websockets(message)
+        await service.drain_websockets()
+        assert len(encodes) == 2
+        assert all("order_book" not in body for body in encodes)
+        frames = [websocket.frames[-1] for websocket in websockets]
+        assert all(frame is frames[0] for frame in frames)
+        assert websockets[0].sent[-1]["active_orders"][0]["id"] == "a0"
+
+    def test_encoded_message_variants_and_merge(self):
+        from utils.websocket_utils import EncodedMessage, merge_encoded
+
+        message = EncodedMessage(
+            {"type": "BOOK_UPDATED", "order_book": {"bids": []}, "spread": 2},
+            fragments=lambda version: {"order_book": '{"bids":[1]}'} if version == 7 else None,
+            fragments_key=7,
+        )
+        assert json.loads(message.encoded()) == {
+            "type": "BOOK_UPDATED", "order_book": {"bids": [1]}, "spread": 2,
+        }
+        assert message.encoded(("type", "order_book")) == '{"spread":2}'
+        assert message.encoded(("type", "order_book")) is message.encoded(("type", "order_book"))
+        merged = json.loads(merge_encoded(message.encoded(("type",)), '{"type":"X","spread":3}'))
+        assert merged == {"order_book": {"bids": [1]}, "spread": 3, "type": "X"}
@@ -0,0 +1,138 @@
+"""
+Message encoder tests.
+
+Tests cover:
+- Typed encoders match the generic JSON output
+- Negotiated MessagePack frames with ticks and epoch timestamps
+"""
+
+import sys
+import os
+import json
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.data_models import ExecutionType, OrderType
+from helpers import FakeWebSocket
+
+
+class TestTypedEncoders:
+    @pytest.mark.asyncio
+    async def test_known_messages_match_generic_sanitizer(self):
+        from core.handlers import MarketOrchestrator
+        from utils.websocket_utils import prepare_message, sanitize_websocket_message
+
+        orchestrator = MarketOrchestrator("encoder_test", 1, 100, 10, 10, {})
+        orchestrator.active = True
+        sent = []
+
+        async def record(message):
+            sent.append(message)
+
+        orchestrator.broadcast_service.broadcast_to_websockets = record
+        for i in range(3):
+            await orchestrator.handle_trader_message({
+                "type": "add_order", "order_id": f"a{i}", "trader_id": "T1",
+                "order_type": OrderType.ASK.value, "price": 101 + i, "amount": 1,
+            })
+        await orchestrator.handle_trader_message({
+            "type": "add_order", "order_id": "b0", "trader_id": "T2",
+            "order_type": OrderType.BID.value, "price": 101, "amount": 1,
+        })
+        sent.append({"type": "time_update", "data": {
+            "current_time": "2026-01-01T00:00:00", "remaining_time": 12.5, "is_trading_started": True,
+        }})
+
+        assert {m["type"] for m in sent} == {"BOOK_UPDATED", "transaction_update", "time_update"}
+        for message in sent:
+            assert prepare_message(message) == sanitize_websocket_message(dict(message))
+
+    def test_scalars_and_unknown_fields(self):
+        from datetime import datetime
+        from utils.websocket_utils import TRADER_STATE_ENCODER, prepare_message
+
+        state = json.loads(TRADER_STATE_ENCODER.encode({
+            "type": "BOOK_UPDATED", "pnl": float("nan"), "vwap": float("inf"), "cash": 10 ** 16,
+            "placed_orders": [{"order_ids": ["x"], "price": 100.0,
+                               "order_type": OrderType.BID, "execution_type": ExecutionType.IOC}],
+        }))
+        assert (state["pnl"], state["vwap"], state["cash"]) == (0.0, 0.0, 0)
+        assert state["placed_orders"][0]["order_type"] == 1
+        assert state["placed_orders"][0]["execution_type"] == "ioc"
+
+        message = prepare_message({"type": "BOOK_UPDATED", "start_time": datetime(2026, 1, 1),
+                                   "incoming_message": {"note": "a--b"}})
+        assert message["start_time"] == "2026-01-01T00:00:00"
+        assert message["incoming_message"] == {"note": "a_b"}
+
+
+class TestBinaryProtocol:
+    def test_compact_prices_and_timestamps(self):
+        from utils.websocket_utils import compact
+
+        message = {
+            "type": "BOOK_UPDATED",
+            "current_time": "1970-01-01T00:00:01.500000+00:00",
+            "order_book": {"bids": [{"x": 99.5, "y": 2.0}], "asks": [{"x": 101.0, "y": 1.0}]},
+            "history": [{"price": 100.25, "timestamp": "not a time"}],
+            "spread": 1.5,
+        }
+        compacted = compact(message, tick_size=0.5)
+        assert compacted["current_time"] == 1500
+        assert compacted["order_book"] == {"bids": [{"x": 199, "y": 2.0}], "asks": [{"x": 202, "y": 1.0}]}
+        assert compacted["history"] == [{"price": 200.5, "timestamp": "not a time"}]
+        assert compacted["spread"] == 1.5
+
+    def test_merge_packed_maps(self):
+        from utils.websocket_utils import merge_packed
+
+        # {"a": 1} and {"b": 2, "a": 3} as fixmaps
+        merged = merge_packed(b"\x81\xa1a\x01", b"\x82\xa1b\x02\xa1a\x03")
+        assert merged == b"\x83\xa1a\x01\xa1b\x02\xa1a\x03"
+        big = b"\xde\x00\x10" + b"".join(bytes([0xa1, 0x61 + i, i]) for i in range(16))
+        assert merge_packed(big, b"\x81\xa1z\x00")[:3] == b"\xde\x00\x11"
+
+    @pytest.mark.asyncio
+    async def test_unsupported_encoding_stays_json(self, monkeypatch):
+        import utils.websocket_utils as websocket_utils
+        from core.handlers import MarketOrchestrator
+
+        monkeypatch.setattr(websocket_utils, "msgpack", None)
+        orchestrator = MarketOrchestrator("protocol_json_test", 1, 100, 10, 10, {})
+        service = orchestrator.broadcast_service
+        websocket = FakeWebSocket()
+        orchestrator.register_websocket(websocket)
+        assert service.set_encoding(websocket, "msgpack") == "json"
+        await service.broadcast_to_websockets({"type": "transaction_update", "transactions": []})
+        await service.drain_websockets()
+        assert websocket.sent[0] == {"type": "protocol", "encoding": "json", "tick_size": 1}
+        assert all(isinstance(frame, str) for frame in websocket.frames)
+
+    @pytest.mark.asyncio
+    async def test_msgpack_subscriber_gets_binary_book_and_trades(self):
+        pytest.importorskip("msgpack")
+        from core.handlers import MarketOrchestrator
+
+        orchestrator = MarketOrchestrator("protocol_msgpack_test", 1, 100, 10, 10, {})
+        orchestrator.active = True
+        service = orchestrator.broadcast_service
+        binary, text = FakeWebSocket(), FakeWebSocket()
+        orchestrator.register_websocket(binary)
+        orchestrator.register_websocket(text)
+        assert service.set_encoding(binary, "msgpack") == "msgpack"
+
+        for order_id, order_type in (("a0", OrderType.ASK), ("b0", OrderType.BID)):
+            await orchestrator.handle_trader_message({
+                "type": "add_order", "order_id": order_id, "trader_id": "T1",
+                "order_type": order_type.value, "price": 101, "amount": 1,
+            })
+        await service.drain_websockets()
+
+        assert isinstance(binary.frames[0], str) and binary.sent[0]["encoding"] == "msgpack"
+        assert all(isinstance(frame, bytes) for frame in binary.frames[1:])
+        assert [m["type"] for m in binary.sent[1:]] == [m["type"] for m in text.sent]
+        trade = next(m for m in binary.sent if m["type"] == "transaction_update")
+        assert trade["matched_orders"]["transaction_price"] == 101
+        assert isinstance(trade["matched_orders"]["timestamp"], int)
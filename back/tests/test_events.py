@@ -0,0 +1,61 @@
+"""
+Event bus tests.
+
+Tests cover:
+- Slotted, lazily stamped events and the precompiled dispatch table
+"""
+
+import sys
+import os
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class TestEventDispatch:
+    def test_events_are_slotted_and_stamped_lazily(self):
+        from core.events import OrderCancelledEvent
+
+        event = OrderCancelledEvent(order_id="o1", trader_id="T1")
+        assert not hasattr(event, "__dict__")
+        assert event._id is None and event.created_ns > 0
+        assert event.id == event.id and event._id is not None
+        assert event.timestamp.year >= 2024
+
+    @pytest.mark.asyncio
+    async def test_middleware_follows_its_enabled_flag_at_dispatch(self):
+        from core.events import EventHandler, MessageBus, MessageRouter, OrderCancelledEvent
+
+        class Echo(EventHandler):
+            async def handle(self, event):
+                return {"status": "cancel success", "order_id": event.order_id}
+
+        class Tracing:
+            enabled = False
+            seen = 0
+
+            async def __call__(self, event):
+                self.seen += 1
+                return event
+
+        bus = MessageBus()
+        bus.subscribe(OrderCancelledEvent, Echo())
+        tracing = Tracing()
+        bus.add_middleware(tracing)
+        router = MessageRouter(bus)
+
+        message = {"type": "cancel_order", "order_id": "o1", "trader_id": "T1"}
+        assert (await router.route_message(message))["order_id"] == "o1"
+        assert tracing.seen == 0
+
+        # Toggling takes effect without recompiling the bus
+        tracing.enabled = True
+        await router.route_message(message)
+        assert tracing.seen == 1
+        tracing.enabled = False
+        await router.route_message(message)
+        assert tracing.seen == 1
+
+        assert (await router.route_message({"type": "add_order"})) == {"status": "processing"}
+        assert (await router.route_message({"type": "nope"}))["status"] == "error"
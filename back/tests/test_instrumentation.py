@@ -0,0 +1,67 @@
+"""
+Latency instrumentation tests.
+
+Tests cover:
+- Opt-in latency histograms per event type and stage
+"""
+
+import sys
+import os
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.data_models import OrderType
+from helpers import FakeWebSocket, RecordingTrader
+
+
+class TestLatencyInstrumentation:
+    def test_histogram_percentiles_within_bucket_precision(self):
+        from core.instrumentation import LatencyHistogram
+
+        histogram = LatencyHistogram()
+        for value in range(1, 100_001):
+            histogram.record(value * 1_000)
+        for pct in (50, 90, 99, 99.9):
+            exact = pct / 100 * 100_000 * 1_000
+            assert abs(histogram.percentile(pct) - exact) / exact <= 1 / LatencyHistogram.SUB_BUCKETS
+        assert histogram.percentile(100) == histogram.max_ns == 100_000_000
+        assert len(histogram.counts) < 300
+
+    @pytest.mark.asyncio
+    async def test_instrumented_market_records_each_stage(self):
+        import ast
+        from core.handlers import MarketOrchestrator
+
+        orchestrator = MarketOrchestrator("latency_test", 1, 100, 10, 10, {})
+        orchestrator.active = True
+        orchestrator.register_websocket(FakeWebSocket())
+        orchestrator.trader_service.connected_traders["R"] = {"trader_instance": RecordingTrader(False)}
+
+        ask = {"type": "add_order", "order_id": "a0", "trader_id": "T1",
+               "order_type": OrderType.ASK.value, "price": 101, "amount": 1}
+        await orchestrator.handle_trader_message(ask)
+        assert orchestrator.instrumentation.histograms == {}
+
+        orchestrator.set_instrumentation(True)
+        await orchestrator.handle_trader_message({**ask, "order_id": "a1"})
+        await orchestrator.handle_trader_message({"type": "cancel_order", "order_id": "a1", "trader_id": "T1"})
+
+        metrics = orchestrator.get_latency_metrics()
+        assert metrics["events"] == {"OrderPlacedEvent": 1, "OrderCancelledEvent": 1}
+        assert set(metrics["latency"]["add"]) == {"queue_wait", "engine", "logging"}
+        assert set(metrics["latency"]["BOOK_UPDATED"]) == {"broadcast_build", "encode", "fanout", "trader_notify"}
+        assert metrics["latency"]["BOOK_UPDATED"]["fanout"]["count"] == 2
+        assert metrics["sequencer"]["seq"] == 3
+
+        records = []
+        orchestrator.trading_logger.info = records.append
+        orchestrator.log_latency_summary()
+        prefix, content = records[0].split(": ", 1)
+        assert prefix == "LATENCY_SUMMARY"
+        assert ast.literal_eval(content)["latency_us"]["cancel"]["queue_wait"][0] == 1
+
+        orchestrator.set_instrumentation(False)
+        await orchestrator.handle_trader_message({**ask, "order_id": "a2"})
+        assert orchestrator.instrumentation.event_counts == {"OrderPlacedEvent": 1, "OrderCancelledEvent": 1}
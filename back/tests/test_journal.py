@@ -0,0 +1,113 @@
+"""
+Event journal tests.
+
+Tests cover:
+- Journaled sessions replay to identical digests
+- Per-trader seeded generators
+- Divergence is detected
+"""
+
+import sys
+import os
+import asyncio
+import json
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.data_models import OrderType
+from helpers import RecordingTrader
+
+
+class TestEventJournal:
+    @staticmethod
+    async def record_session(market_id):
+        import random
+        from core.handlers import MarketOrchestrator
+
+        orchestrator = MarketOrchestrator(market_id, 1, 100, 10, 1, {"journal_enabled": True, "random_seed": 7})
+        orchestrator.active = True
+        await orchestrator.handle_trader_message({
+            "type": "register_me", "trader_id": "T0", "trader_type": "NOISE", "trader_instance": object(),
+        })
+        orchestrator.journal_control("start")
+        rng = random.Random(7)
+
+        async def trader(n):
+            for i in range(40):
+                order_id = f"T{n}_{i}"
+                await orchestrator.handle_trader_message({
+                    "type": "add_order", "order_id": order_id, "trader_id": f"T{n}",
+                    "order_type": rng.choice((OrderType.BID.value, OrderType.ASK.value)),
+                    "price": rng.randint(95, 105), "amount": rng.randint(1, 3),
+                })
+                if i % 5 == 4:
+                    await orchestrator.handle_trader_message({"type": "cancel_order", "order_id": order_id, "trader_id": f"T{n}"})
+
+        # Interleaved traders, so the live batches differ from the replay's
+        await asyncio.gather(*(trader(n) for n in range(4)))
+        orchestrator.active = False
+        orchestrator.journal_control("stop")
+        await orchestrator.close_book()
+        await orchestrator.journal_checkpoint()
+        await orchestrator.close_journal()
+        await orchestrator.sequencer.close()
+        return orchestrator
+
+    @pytest.mark.asyncio
+    async def test_replay_rebuilds_identical_book_and_trades(self, tmp_path, monkeypatch):
+        from benchmarks.replay import replay
+        from core.journal import market_digest, read_journal
+
+        monkeypatch.chdir(tmp_path)
+        orchestrator = await self.record_session("journal_test")
+        header, entries = read_journal(orchestrator.journal.path)
+        assert header["rng_seeds"] == {"market": 7}
+        assert [entry["seq"] for entry in entries] == list(range(1, len(entries) + 1))
+        assert "trader_instance" not in entries[0]["msg"]
+        assert [entry["t"] for entry in entries] == sorted(entry["t"] for entry in entries)
+
+        report = await replay(orchestrator.journal.path)
+        assert report.messages == 1 + 4 * 48
+        assert len(report.checkpoints) == 2
+        assert report.identical
+        assert report.checkpoints[-1].replayed == market_digest(orchestrator)
+        assert report.checkpoints[-1].recorded["trades"] > 0
+
+    @pytest.mark.asyncio
+    async def test_traders_draw_from_their_own_seeded_generators(self):
+        import random
+
+        global_state = random.getstate()
+        first, other = RecordingTrader(False, "A"), RecordingTrader(False, "B")
+        first.seed_rng(7)
+        other.seed_rng(7)
+        draws = [first.rng.random() for _ in range(3)] + list(first.np_rng.uniform(size=2))
+        assert random.getstate() == global_state
+        assert other.rng_seed != first.rng_seed
+
+        again = RecordingTrader(False, "A")
+        again.seed_rng(7)
+        other.rng.random()
+        assert [again.rng.random() for _ in range(3)] + list(again.np_rng.uniform(size=2)) == draws
+
+    @pytest.mark.asyncio
+    async def test_replay_detects_divergence(self, tmp_path, monkeypatch):
+        from benchmarks.replay import replay
+
+        monkeypatch.chdir(tmp_path)
+        path = (await self.record_session("journal_diverge")).journal.path
+        with open(path) as journal_file:
+            lines = journal_file.readlines()
+        for i, line in enumerate(lines):
+            entry = json.loads(line)
+            if entry.get("msg", {}).get("type") == "add_order":
+                entry["msg"]["price"] += 1
+                lines[i] = json.dumps(entry) + "\n"
+                break
+        with open(path, "w") as journal_file:
+            journal_file.writelines(lines)
+
+        report = await replay(path, speed=1000)
+        assert not report.identical
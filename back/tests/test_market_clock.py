@@ -0,0 +1,46 @@
+"""
+Market clock tests.
+
+Tests cover:
+- One shared clock per market
+"""
+
+import sys
+import os
+import asyncio
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from helpers import FakeWebSocket
+
+
+class TestMarketClock:
+    @pytest.mark.asyncio
+    async def test_one_time_update_frame_per_tick_for_all_clients(self):
+        from core.trading_platform import TradingPlatform
+
+        platform = TradingPlatform(
+            "clock_test", 1, 100, params={},
+            trader_counts=lambda: {"current_human_traders": 1, "expected_human_traders": 2},
+        )
+        platform.CLOCK_INTERVAL = 0.01
+        websockets = [FakeWebSocket() for _ in range(3)]
+        for websocket in websockets:
+            platform.register_websocket(websocket)
+
+        await platform.initialize()
+        await asyncio.sleep(0.035)
+        await platform.start_trading()
+        await asyncio.sleep(0.02)
+        await platform.clean_up()
+        await platform.orchestrator.broadcast_service.drain_websockets()
+
+        ticks = [m for m in websockets[0].sent if m["type"] == "time_update"]
+        assert len(ticks) >= 3
+        assert ticks[0]["data"]["remaining_time"] is None
+        assert ticks[-1]["data"]["is_trading_started"] and ticks[-1]["data"]["remaining_time"] > 59
+        assert ticks[-1]["data"]["expected_human_traders"] == 2
+        frames = [[f for f in ws.frames if '"time_update"' in f] for ws in websockets]
+        assert all(a is b for a, b in zip(frames[0], frames[1]))
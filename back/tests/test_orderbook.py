@@ -0,0 +1,598 @@
+"""
+Order book engine tests.
+
+Tests cover:
+- Price-time priority and O(1) cancel through the order-id index
+- Incrementally maintained depth, best prices and active orders
+- Multi-unit orders with partial fills
+- Integer-tick ladder engine
+- Call auction uncrossing for batch matching
+- Market, IOC and FOK orders, modify, and bulk submission
+"""
+
+import sys
+import os
+import asyncio
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.orderbook_manager import OrderBook, TickLadderOrderBook, create_order_book
+from core.data_models import ExecutionType, OrderType
+from helpers import make_order
+
+
+class TestOrderIndex:
+    """Cancel and lookup go through the order-id index."""
+
+    def test_cancel_middle_of_queue_keeps_fifo(self):
+        book = OrderBook()
+        for i in range(3):
+            book.place_order(make_order(f"b{i}", OrderType.BID, 99))
+
+        assert book.cancel_order("b1") is True
+        assert [o["id"] for o in book.bids[99]] == ["b0", "b2"]
+        assert "b1" not in book.order_index
+        assert "b1" not in book.all_orders
+
+    def test_cancel_last_order_drops_level(self):
+        book = OrderBook()
+        book.place_order(make_order("a0", OrderType.ASK, 101))
+
+        order, success = book.cancel_order_with_details("a0")
+
+        assert success is True
+        assert order["id"] == "a0"
+        assert 101 not in book.asks
+        assert book.order_index == {}
+
+    def test_cancel_unknown_order(self):
+        book = OrderBook()
+        assert book.cancel_order("missing") is False
+        assert book.cancel_order_with_details("missing") == (None, False)
+
+    def test_double_cancel_fails(self):
+        book = OrderBook()
+        book.place_order(make_order("b0", OrderType.BID, 99))
+        assert book.cancel_order("b0") is True
+        assert book.cancel_order("b0") is False
+
+    def test_get_order(self):
+        book = OrderBook()
+        order = make_order("b0", OrderType.BID, 99)
+        book.place_order(order)
+        assert book.get_order("b0") is order
+        assert book.get_order("b1") is None
+
+
+class TestMatching:
+    """Matching pops the heads of the best levels."""
+
+    def test_match_respects_time_priority(self):
+        book = OrderBook()
+        book.place_order(make_order("b0", OrderType.BID, 99))
+        book.place_order(make_order("b1", OrderType.BID, 99))
+        book.place_order(make_order("a0", OrderType.ASK, 99))
+
+        matches = book.clear_orders()
+
+        assert len(matches) == 1
+        ask, bid, price = matches[0]
+        assert (ask["id"], bid["id"], price) == ("a0", "b0", 99)
+        assert [o["id"] for o in book.bids[99]] == ["b1"]
+        assert set(book.order_index) == {"b1"}
+
+    def test_no_match_when_not_crossed(self):
+        book = OrderBook()
+        book.place_order(make_order("b0", OrderType.BID, 99))
+        _, matched = book.place_order(make_order("a0", OrderType.ASK, 100))
+
+        assert matched is False
+        assert book.clear_orders() == []
+
+
+class TestAggregates:
+    """Depth and top of book are kept up to date without rescanning."""
+
+    def test_depth_tracks_place_and_cancel(self):
+        book = OrderBook()
+        book.place_order(make_order("b0", OrderType.BID, 99, amount=2))
+        book.place_order(make_order("b1", OrderType.BID, 99, amount=3))
+        book.place_order(make_order("b2", OrderType.BID, 98))
+        book.place_order(make_order("a0", OrderType.ASK, 101, amount=4))
+
+        assert book["bids"] == [{"x": 99, "y": 5}, {"x": 98, "y": 1}]
+        assert book["asks"] == [{"x": 101, "y": 4}]
+
+        book.cancel_order("b0")
+        assert book["bids"][0] == {"x": 99, "y": 3}
+
+    def test_best_prices_follow_level_changes(self):
+        book = OrderBook()
+        assert book.get_spread() == (None, None)
+
+        book.place_order(make_order("b0", OrderType.BID, 98))
+        book.place_order(make_order("b1", OrderType.BID, 99))
+        book.place_order(make_order("a0", OrderType.ASK, 103))
+        book.place_order(make_order("a1", OrderType.ASK, 102))
+        assert (book.best_bid, book.best_ask) == (99, 102)
+        assert book.get_spread() == (3, 100.5)
+
+        book.cancel_order("b1")
+        book.cancel_order("a1")
+        assert (book.best_bid, book.best_ask) == (98, 103)
+
+        book.cancel_order("b0")
+        assert book.best_bid is None
+        assert book.get_spread() == (None, None)
+
+    def test_snapshot_cached_until_book_changes(self):
+        book = OrderBook()
+        book.place_order(make_order("b0", OrderType.BID, 99))
+
+        first = book.get_order_book_snapshot()
+        assert book.get_order_book_snapshot() is first
+
+        book.place_order(make_order("a0", OrderType.ASK, 101))
+        second = book.get_order_book_snapshot()
+        assert second is not first
+        assert second["asks"] == [{"x": 101, "y": 1}]
+
+
+class TestActiveOrders:
+    """Active orders are indexed and serialized once at insert time."""
+
+    def test_active_orders_follow_book(self):
+        book = OrderBook()
+        book.place_order(make_order("b0", OrderType.BID, 99))
+        book.place_order(make_order("a0", OrderType.ASK, 101))
+        book.cancel_order("b0")
+
+        assert set(book.active_orders) == {"a0"}
+
+        book.place_order(make_order("b1", OrderType.BID, 101))
+        book.clear_orders()
+        assert book.active_orders == {}
+
+    def test_broadcast_rows_are_coerced_and_reused(self):
+        book = OrderBook()
+        book.place_order(make_order("b0", OrderType.BID, 99, amount=2))
+
+        rows = book.get_active_orders_to_broadcast()
+        assert rows == [{
+            "id": "b0",
+            "trader_id": "T1",
+            "order_type": 1,
+            "amount": 2.0,
+            "price": 99.0,
+            "timestamp": "2026-01-01 00:00:00.000000",
+        }]
+        assert book.get_active_orders_to_broadcast() is rows
+
+        book.cancel_order("b0")
+        assert book.get_active_orders_to_broadcast() == []
+
+
+class TestPartialFills:
+    """Orders carry a size; each fill produces one match and leaves a residual."""
+
+    def test_large_bid_sweeps_several_asks(self):
+        book = OrderBook()
+        book.place_order(make_order("a0", OrderType.ASK, 100, amount=2))
+        book.place_order(make_order("a1", OrderType.ASK, 101, amount=3))
+        incoming = make_order("b0", OrderType.BID, 101, amount=4)
+        book.place_order(incoming)
+
+        matches = book.clear_orders()
+
+        assert [(a["id"], b["id"], a["amount"], b["amount"]) for a, b, _ in matches] == [
+            ("a0", "b0", 2, 2),
+            ("a1", "b0", 2, 2),
+        ]
+        assert [p for _, _, p in matches] == [100.5, 101]
+        assert book.asks[101].head.order["amount"] == 1
+        assert book["asks"] == [{"x": 101, "y": 1}]
+        assert 101 not in book.bids
+        # The order dict handed back at placement keeps its original size
+        assert incoming["amount"] == 4
+
+    def test_residual_keeps_queue_priority(self):
+        book = OrderBook()
+        book.place_order(make_order("a0", OrderType.ASK, 100, amount=5))
+        book.place_order(make_order("a1", OrderType.ASK, 100, amount=1))
+        book.place_order(make_order("b0", OrderType.BID, 100, amount=2))
+        book.clear_orders()
+
+        assert [(o["id"], o["amount"]) for o in book.asks[100]] == [("a0", 3), ("a1", 1)]
+        assert book.active_orders["a0"]["amount"] == 3
+        assert book.get_active_orders_to_broadcast()[0]["amount"] == 3.0
+
+        book.place_order(make_order("b1", OrderType.BID, 100, amount=3))
+        (ask, bid, _), = book.clear_orders()
+        assert (ask["id"], ask["amount"]) == ("a0", 3)
+        assert [o["id"] for o in book.asks[100]] == ["a1"]
+
+    def test_residual_can_be_cancelled(self):
+        book = OrderBook()
+        book.place_order(make_order("b0", OrderType.BID, 100, amount=3))
+        book.place_order(make_order("a0", OrderType.ASK, 100, amount=1))
+        book.clear_orders()
+
+        order, success = book.cancel_order_with_details("b0")
+        assert success is True
+        assert order["amount"] == 2
+        assert book.bids == {}
+
+
+class TestTickLadder:
+    """The array-backed ladder engine behaves like the sorted engine."""
+
+    def make_book(self):
+        return TickLadderOrderBook(tick_size=1, min_price=90, max_price=110)
+
+    def test_best_prices_walk_the_ladder(self):
+        book = self.make_book()
+        book.place_order(make_order("b0", OrderType.BID, 95))
+        book.place_order(make_order("b1", OrderType.BID, 99))
+        book.place_order(make_order("a0", OrderType.ASK, 106))
+        book.place_order(make_order("a1", OrderType.ASK, 102))
+        assert (book.best_bid, book.best_ask) == (99, 102)
+
+        book.cancel_order("b1")
+        book.cancel_order("a1")
+        assert (book.best_bid, book.best_ask) == (95, 106)
+        assert book["bids"] == [{"x": 95, "y": 1}]
+
+        book.cancel_order("b0")
+        assert book.best_bid is None
+
+    def test_matching_and_depth(self):
+        book = self.make_book()
+        book.place_order(make_order("a0", OrderType.ASK, 100, amount=2))
+        book.place_order(make_order("a1", OrderType.ASK, 101, amount=3))
+        book.place_order(make_order("b0", OrderType.BID, 98))
+        book.place_order(make_order("b1", OrderType.BID, 101, amount=4))
+
+        matches = book.clear_orders()
+
+        assert [(a["id"], b["id"], p) for a, b, p in matches] == [
+            ("a0", "b1", 100.5),
+            ("a1", "b1", 101),
+        ]
+        assert book["asks"] == [{"x": 101, "y": 1}]
+        assert book["bids"] == [{"x": 98, "y": 1}]
+        assert set(book.active_orders) == {"a1", "b0"}
+
+    def test_prices_snap_to_ticks(self):
+        book = TickLadderOrderBook(tick_size=0.5, min_price=99, max_price=101)
+        book.place_order(make_order("b0", OrderType.BID, 99.6))
+        assert book.best_bid == 99.5
+        assert book.get_order("b0")["price"] == 99.5
+
+    def test_ladder_grows_outside_range(self):
+        book = self.make_book()
+        book.place_order(make_order("b0", OrderType.BID, 50))
+        book.place_order(make_order("a0", OrderType.ASK, 200))
+        book.place_order(make_order("b1", OrderType.BID, 99))
+        assert book["bids"] == [{"x": 99, "y": 1}, {"x": 50, "y": 1}]
+
+        book.cancel_order("b1")
+        assert book.best_bid == 50
+        assert book.best_ask == 200
+
+    def test_same_tick_shrink_keeps_priority(self):
+        book = TickLadderOrderBook(tick_size=0.1, min_price=99, max_price=101)
+        book.place_order(make_order("b0", OrderType.BID, 100.3, amount=3))
+        book.place_order(make_order("b1", OrderType.BID, 100.3))
+
+        # 100.1 + 0.2 is 100.30000000000001, and 100.32 is off the grid; both snap to 100.3
+        for price, amount in ((100.1 + 0.2, 2), (100.32, 1)):
+            old, new, can_match = book.modify_order("b0", price=price, amount=amount)
+            assert can_match is False
+            assert new["timestamp"] == old["timestamp"] and new["price"] == 100.3
+            assert [o["id"] for o in book._level_at(True, 100.3)] == ["b0", "b1"]
+        assert book["bids"] == [{"x": 100.3, "y": 2}]
+
+    def test_far_prices_do_not_grow_the_ladder(self):
+        book = self.make_book()
+        book.place_order(make_order("a0", OrderType.ASK, 1e12))
+        book.place_order(make_order("a1", OrderType.ASK, 101))
+        book.place_order(make_order("a2", OrderType.ASK, 5e11))
+        book.place_order(make_order("b0", OrderType.BID, -1e12))
+        book.place_order(make_order("b1", OrderType.BID, 1e9, amount=2))
+        assert len(book._bid_ladder) <= TickLadderOrderBook.MAX_LADDER_TICKS
+        assert [level["x"] for level in book["asks"]] == [101, 5e11, 1e12]
+        assert [level["x"] for level in book["bids"]] == [1e9, -1e12]
+
+        matches = book.clear_orders()
+        assert [(a["id"], b["id"]) for a, b, _ in matches] == [("a1", "b1")]
+        assert (book.best_bid, book.best_ask) == (1e9, 5e11)
+
+        book.cancel_order("b1")
+        book.cancel_order("a2")
+        assert (book.best_bid, book.best_ask) == (-1e12, 1e12)
+        assert len(book._bid_ladder) <= TickLadderOrderBook.MAX_LADDER_TICKS
+
+    def test_factory_selects_engine(self):
+        assert type(create_order_book({})) is OrderBook
+        book = create_order_book({"order_book_engine": "tick_ladder", "default_price": 100})
+        assert isinstance(book, TickLadderOrderBook)
+
+
+class TestBatchAuction:
+    """Call auctions clear everything that crosses at one price."""
+
+    def test_clearing_price_maximises_volume(self):
+        book = OrderBook()
+        book.place_order(make_order("b0", OrderType.BID, 102, amount=3))
+        book.place_order(make_order("b1", OrderType.BID, 100, amount=2))
+        book.place_order(make_order("a0", OrderType.ASK, 99, amount=2))
+        book.place_order(make_order("a1", OrderType.ASK, 101, amount=4))
+
+        # Anything in [101, 102] trades 3 units; below that only 2 trade
+        assert book.clearing_price() == 101.5
+
+        matches = book.uncross()
+        assert {p for _, _, p in matches} == {101.5}
+        assert [(a["id"], b["id"], a["amount"]) for a, b, _ in matches] == [
+            ("a0", "b0", 2),
+            ("a1", "b0", 1),
+        ]
+        assert (book.best_bid, book.best_ask) == (100, 101)
+        assert book["asks"] == [{"x": 101, "y": 3}]
+
+    def test_uncross_on_uncrossed_book(self):
+        book = OrderBook()
+        book.place_order(make_order("b0", OrderType.BID, 99))
+        book.place_order(make_order("a0", OrderType.ASK, 100))
+        assert book.clearing_price() is None
+        assert book.uncross() == []
+
+    def test_tied_prices_clear_at_midpoint(self):
+        book = TickLadderOrderBook(tick_size=1, min_price=90, max_price=110)
+        book.place_order(make_order("b0", OrderType.BID, 102))
+        book.place_order(make_order("a0", OrderType.ASK, 98))
+        assert book.clearing_price() == 100
+
+    @pytest.mark.asyncio
+    async def test_orchestrator_matches_once_per_batch(self):
+        from core.handlers import MarketOrchestrator
+
+        orchestrator = MarketOrchestrator(
+            "batch_test", 1, 100, 10, 10,
+            {"matching_mode": "batch_auction", "batch_auction_interval_ms": 10},
+        )
+        orchestrator.active = True
+        broadcasts = []
+
+        async def record(message):
+            broadcasts.append(message)
+
+        orchestrator.broadcast_service.broadcast_to_websockets = record
+        for order_id, order_type, price in [("b0", 1, 101), ("a0", -1, 99)]:
+            await orchestrator.handle_trader_message({
+                "type": "add_order", "order_id": order_id, "trader_id": "T1",
+                "order_type": order_type, "price": price, "amount": 1,
+            })
+        assert broadcasts == []
+
+        orchestrator.start_batch_auctions()
+        await asyncio.sleep(0.05)
+        await orchestrator.stop_batch_auctions()
+
+        book_updates = [m for m in broadcasts if m.get("type") == "BOOK_UPDATED"]
+        assert len(book_updates) == 1
+        assert book_updates[0]["clearing_price"] == 100
+        assert orchestrator.order_book_manager.order_book.active_orders == {}
+
+
+class TestNonRestingOrders:
+    """Market, IOC and FOK orders take liquidity and leave nothing behind."""
+
+    def make_book(self):
+        book = OrderBook()
+        book.place_order(make_order("a0", OrderType.ASK, 100, amount=2))
+        book.place_order(make_order("a1", OrderType.ASK, 102, amount=2))
+        return book
+
+    def make_taker(self, execution_type, price, amount):
+        order = make_order("b0", OrderType.BID, price, amount=amount, trader_id="T2")
+        order["execution_type"] = execution_type.value
+        return order
+
+    def test_ioc_fills_up_to_limit_and_expires_rest(self):
+        book = self.make_book()
+        matches, remaining = book.execute_order(self.make_taker(ExecutionType.IOC, 101, 3))
+
+        assert [(a["id"], b["id"], a["amount"], p) for a, b, p in matches] == [
+            ("a0", "b0", 2, 100.5),
+        ]
+        assert remaining == 1
+        assert "b0" not in book.order_index
+        assert book.best_bid is None
+        assert book["asks"] == [{"x": 102, "y": 2}]
+
+    def test_market_order_walks_the_book_at_resting_prices(self):
+        book = self.make_book()
+        matches, remaining = book.execute_order(self.make_taker(ExecutionType.MARKET, 100, 3))
+
+        assert [(a["id"], b["amount"], p) for a, b, p in matches] == [
+            ("a0", 2, 100),
+            ("a1", 1, 102),
+        ]
+        assert remaining == 0
+        assert book["asks"] == [{"x": 102, "y": 1}]
+
+    def test_fok_kills_without_touching_book(self):
+        book = self.make_book()
+        version = book.version
+        matches, remaining = book.execute_order(self.make_taker(ExecutionType.FOK, 101, 3))
+
+        assert matches == []
+        assert remaining == 3
+        assert book.version == version
+
+        matches, remaining = book.execute_order(self.make_taker(ExecutionType.FOK, 102, 3))
+        assert sum(a["amount"] for a, _, _ in matches) == 3
+        assert remaining == 0
+
+    @pytest.mark.asyncio
+    async def test_service_reports_expired_remainder(self):
+        from core.orderbook_manager import OrderBookManager
+        from core.services import OrderService, PricingService
+
+        manager = OrderBookManager()
+        manager.place_order(make_order("a0", OrderType.ASK, 100))
+        service = OrderService(manager, PricingService(100, 10, 10))
+
+        result = await service.process_order({
+            "order_id": "b0", "trader_id": "T2", "market_id": "M1",
+            "order_type": 1, "price": 100, "amount": 2, "execution_type": "ioc",
+        })
+
+        assert result.immediately_matched is True
+        assert len(result.matches) == 1
+        assert result.expired_order["amount"] == 1
+        assert result.order["execution_type"] == "ioc"
+        assert manager.order_book.active_orders == {}
+
+
+class TestModifyOrder:
+    """Cancel-replace runs as one book operation."""
+
+    def test_size_down_keeps_priority(self):
+        book = OrderBook()
+        book.place_order(make_order("b0", OrderType.BID, 99, amount=3))
+        book.place_order(make_order("b1", OrderType.BID, 99))
+
+        old, new, can_match = book.modify_order("b0", amount=1)
+
+        assert (old["amount"], new["amount"], can_match) == (3, 1, False)
+        assert [o["id"] for o in book.bids[99]] == ["b0", "b1"]
+        assert book["bids"] == [{"x": 99, "y": 2}]
+        assert book.get_active_orders_to_broadcast()[0]["amount"] == 1.0
+
+    def test_reprice_requeues_and_can_cross(self):
+        book = OrderBook()
+        book.place_order(make_order("b0", OrderType.BID, 98))
+        book.place_order(make_order("b1", OrderType.BID, 99))
+        book.place_order(make_order("a0", OrderType.ASK, 101))
+
+        _, new, can_match = book.modify_order("b0", price=99)
+        assert can_match is False
+        assert new["price"] == 99
+        assert [o["id"] for o in book.bids[99]] == ["b1", "b0"]
+        assert 98 not in book.bids
+
+        _, _, can_match = book.modify_order("b0", price=101)
+        assert can_match is True
+        (ask, bid, _), = book.clear_orders()
+        assert (ask["id"], bid["id"]) == ("a0", "b0")
+
+    def test_modify_unknown_or_invalid(self):
+        book = OrderBook()
+        assert book.modify_order("missing", price=100) == (None, None, False)
+        book.place_order(make_order("b0", OrderType.BID, 99))
+        with pytest.raises(ValueError):
+            book.modify_order("b0", amount=0)
+
+    @pytest.mark.asyncio
+    async def test_router_modify_broadcasts_once(self):
+        from core.handlers import MarketOrchestrator
+
+        orchestrator = MarketOrchestrator("modify_test", 1, 100, 10, 10, {})
+        orchestrator.active = True
+        broadcasts = []
+
+        async def record(message):
+            broadcasts.append(message)
+
+        orchestrator.broadcast_service.broadcast_to_websockets = record
+        await orchestrator.handle_trader_message({
+            "type": "add_order", "order_id": "b0", "trader_id": "T1",
+            "order_type": 1, "price": 99, "amount": 1,
+        })
+        broadcasts.clear()
+
+        response = await orchestrator.handle_trader_message({
+            "type": "modify_order", "order_id": "b0", "trader_id": "T1", "price": 98,
+        })
+
+        assert response["type"] == "ORDER_MODIFIED"
+        assert len(broadcasts) == 1
+        assert broadcasts[0]["order_book"]["bids"] == [{"x": 98, "y": 1}]
+
+
+class TestBulkOperations:
+    """Batches of orders and mass cancels touch the book once."""
+
+    def test_cancel_all_filters_by_trader_side_and_price(self):
+        book = OrderBook()
+        book.place_order(make_order("b0", OrderType.BID, 97))
+        book.place_order(make_order("b1", OrderType.BID, 99))
+        book.place_order(make_order("a0", OrderType.ASK, 101))
+        book.place_order(make_order("x0", OrderType.BID, 98, trader_id="T2"))
+
+        cancelled = book.cancel_all("T1", OrderType.BID.value, min_price=98)
+        assert [o["id"] for o in cancelled] == ["b1"]
+
+        cancelled = book.cancel_all("T1")
+        assert {o["id"] for o in cancelled} == {"b0", "a0"}
+        assert set(book.active_orders) == {"x0"}
+        assert book.best_bid == 98 and book.best_ask is None
+
+    @pytest.mark.asyncio
+    async def test_router_bulk_messages_broadcast_once(self):
+        from core.handlers import MarketOrchestrator
+
+        orchestrator = MarketOrchestrator("bulk_test", 1, 100, 10, 10, {})
+        orchestrator.active = True
+        broadcasts = []
+
+        async def record(message):
+            broadcasts.append(message)
+
+        orchestrator.broadcast_service.broadcast_to_websockets = record
+        response = await orchestrator.handle_trader_message({
+            "type": "add_orders", "trader_id": "T1",
+            "orders": [
+                {"order_id": f"o{i}", "order_type": side, "price": price, "amount": 1}
+                for i, (side, price) in enumerate([(1, 99), (1, 98), (-1, 101), (-1, 102)])
+            ],
+        })
+
+        assert response["order_ids"] == ["o0", "o1", "o2", "o3"]
+        assert len(broadcasts) == 1
+        assert len(broadcasts[0]["active_orders"]) == 4
+
+        broadcasts.clear()
+        response = await orchestrator.handle_trader_message({
+            "type": "cancel_all", "trader_id": "T1", "order_type": -1,
+        })
+        assert sorted(response["order_ids"]) == ["o2", "o3"]
+        assert len(broadcasts) == 1
+        assert broadcasts[0]["order_book"]["asks"] == []
+
+    @pytest.mark.asyncio
+    async def test_invalid_order_rejects_the_whole_batch(self):
+        from core.handlers import MarketOrchestrator
+
+        orchestrator = MarketOrchestrator("bulk_invalid_test", 1, 100, 10, 10, {})
+        orchestrator.active = True
+        await orchestrator.handle_trader_message({
+            "type": "add_order", "order_id": "a0", "trader_id": "T2",
+            "order_type": OrderType.ASK.value, "price": 100, "amount": 1,
+        })
+
+        response = await orchestrator.handle_trader_message({
+            "type": "add_orders", "trader_id": "T1",
+            "orders": [
+                {"order_id": "b0", "order_type": OrderType.BID.value, "price": 100, "amount": 1},
+                {"order_id": "b1", "order_type": OrderType.BID.value, "price": "abc", "amount": 1},
+            ],
+        })
+
+        assert "order_ids" not in response
+        assert set(orchestrator.order_book_manager.order_book.active_orders) == {"a0"}
+        assert orchestrator.transaction_manager.transactions == []
@@ -0,0 +1,122 @@
+"""
+Rate limit tests.
+
+Tests cover:
+- Token buckets per trader type and per market in the router
+"""
+
+import sys
+import os
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.data_models import OrderType, TraderType
+from helpers import FakeWebSocket
+
+
+class TestRouterRateLimits:
+    def test_buckets_per_trader_type_and_market(self):
+        from core.data_models import RateLimitConfig
+        from core.rate_limit import MarketRateLimiter
+
+        now = [0.0]
+        limiter = MarketRateLimiter(
+            {
+                TraderType.HUMAN: RateLimitConfig(messages_per_second=2, burst=2),
+                TraderType.NOISE: {"messages_per_second": 10, "burst": 5},
+                TraderType.SIMPLE_ORDER: RateLimitConfig(),
+            },
+            RateLimitConfig(messages_per_second=100, burst=12),
+            {"N": TraderType.NOISE, "S": "SIMPLE_ORDER", "H": "human"}.get,
+            clock=lambda: now[0],
+        )
+        assert [limiter.allow("H") for _ in range(3)] == [True, True, False]
+        # Unregistered senders get the HUMAN limits
+        assert [limiter.allow("X") for _ in range(3)] == [True, True, False]
+        assert limiter.allow("N", cost=5) and not limiter.allow("N")
+        assert limiter.allow("S", cost=3)
+        # The market bucket (12) is now empty, even for an unlimited type
+        assert not limiter.allow("S")
+
+        now[0] = 0.5
+        assert limiter.allow("H") and not limiter.allow("H")
+        assert limiter.metrics() == {
+            "accepted": 7, "rejected": 5, "market_rejected": 1,
+            "rejected_by_type": {"HUMAN": 3, "NOISE": 1, "SIMPLE_ORDER": 1},
+            "rejected_by_trader": {"H": 2, "X": 1, "N": 1, "S": 1},
+        }
+
+    def test_market_rejection_does_not_charge_the_trader(self):
+        from core.data_models import RateLimitConfig
+        from core.rate_limit import MarketRateLimiter
+
+        now = [0.0]
+        limiter = MarketRateLimiter(
+            {TraderType.HUMAN: RateLimitConfig(messages_per_second=1, burst=2)},
+            RateLimitConfig(messages_per_second=1, burst=1),
+            clock=lambda: now[0],
+        )
+        assert limiter.allow("A")
+        assert not limiter.allow("A") and not limiter.allow("A")
+        assert limiter.buckets["A"][1].tokens == 1
+        assert limiter.metrics()["market_rejected"] == 2
+
+        now[0] = 1.0
+        assert limiter.allow("A")
+        assert limiter.buckets["A"][1].tokens == 1
+
+    @pytest.mark.asyncio
+    async def test_router_rejects_order_traffic_over_the_limit(self):
+        from core.handlers import MarketOrchestrator
+
+        params = {"rate_limits": {"HUMAN": {"messages_per_second": 0.001, "burst": 3}}}
+        orchestrator = MarketOrchestrator("rate_limit_test", 1, 100, 10, 1, params)
+        orchestrator.active = True
+        assert MarketOrchestrator("unlimited_test", 1, 100, 10, 1, {}).rate_limiter is None
+
+        await orchestrator.handle_trader_message({"type": "register_me", "trader_id": "H1", "trader_type": "HUMAN"})
+        responses = [
+            await orchestrator.handle_trader_message({
+                "type": "add_order", "order_id": f"h{i}", "trader_id": "H1",
+                "order_type": OrderType.BID.value, "price": 99, "amount": 1,
+            })
+            for i in range(5)
+        ]
+        assert [r.get("status") == "rate_limited" for r in responses] == [False] * 3 + [True] * 2
+        assert len(orchestrator.order_book_manager.order_book.active_orders) == 3
+
+        # A bulk submission spends one token per order; non-order messages are never limited
+        bulk = await orchestrator.handle_trader_message({
+            "type": "add_orders", "trader_id": "H2",
+            "orders": [{"order_type": OrderType.ASK.value, "price": 101, "amount": 1}] * 4,
+        })
+        assert bulk["status"] == "rate_limited"
+        inventory = await orchestrator.handle_trader_message({"type": "inventory_report", "trader_id": "H1", "shares": 0, "cash": 0})
+        assert inventory.get("status") != "rate_limited"
+
+        metrics = orchestrator.get_rate_limit_metrics()
+        assert metrics["enabled"] and metrics["rejected_by_trader"] == {"H1": 2, "H2": 1}
+        await orchestrator.sequencer.close()
+
+    @pytest.mark.asyncio
+    async def test_rate_limited_order_leaves_available_cash_unchanged(self):
+        from core.trading_platform import TradingPlatform
+        from traders.human_trader import HumanTrader
+
+        params = {"rate_limits": {"HUMAN": {"messages_per_second": 0.001, "burst": 1}}}
+        platform = TradingPlatform("rate_limit_human_test", 1, 100, 10, 1, params)
+        platform.orchestrator.active = True
+        human = HumanTrader("HUMAN_h", cash=1000, shares=0, params={}, trading_market=platform)
+        human.websocket = FakeWebSocket()
+
+        assert await human.post_new_order(1, 100, OrderType.BID) is not None
+        assert human.get_available_cash() == 900
+
+        assert await human.post_new_order(1, 100, OrderType.BID) is None
+        assert await human.post_new_orders([(1, 100, OrderType.BID)]) == []
+        assert len(human.placed_orders) == 1
+        assert human.get_available_cash() == 900
+        assert [m["type"] for m in human.websocket.sent] == ["rate_limited"] * 2
+        await platform.orchestrator.sequencer.close()
@@ -0,0 +1,78 @@
+"""
+Market sequencer tests.
+
+Tests cover:
+- Single-writer command ordering with one broadcast per batch
+"""
+
+import sys
+import os
+import asyncio
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.data_models import OrderType
+from helpers import FakeWebSocket
+
+
+class TestMarketSequencer:
+    @pytest.mark.asyncio
+    async def test_burst_is_applied_in_order_with_one_broadcast(self):
+        from core.handlers import MarketOrchestrator
+
+        orchestrator = MarketOrchestrator("sequencer_test", 1, 100, 10, 10, {})
+        orchestrator.active = True
+        websocket = FakeWebSocket()
+        orchestrator.register_websocket(websocket)
+
+        messages = [
+            {"type": "add_order", "order_id": f"a{i}", "trader_id": "T1",
+             "order_type": OrderType.ASK.value, "price": 101 + i, "amount": 1}
+            for i in range(5)
+        ]
+        messages.append({"type": "cancel_order", "order_id": "a0", "trader_id": "T1"})
+        messages.append({"type": "modify_order", "order_id": "a1", "trader_id": "T1", "price": 110})
+        responses = await asyncio.gather(*(orchestrator.handle_trader_message(m) for m in messages))
+        await orchestrator.broadcast_service.drain_websockets()
+
+        assert [r["type"] for r in responses] == ["ADDED_ORDER"] * 5 + ["ORDER_CANCELLED", "ORDER_MODIFIED"]
+        assert orchestrator.sequencer.metrics() == {"seq": 7, "batches": 1, "largest_batch": 7, "pending": 0}
+        books = [m for m in websocket.sent if m["type"] == "BOOK_UPDATED"]
+        assert len(books) == 1 and books[0]["batched_updates"] == 7
+        assert sorted(o["id"] for o in books[0]["active_orders"]) == ["a1", "a2", "a3", "a4"]
+
+        # A lone command still gets its own update before the caller hears back
+        await orchestrator.handle_trader_message({"type": "cancel_order", "order_id": "a2", "trader_id": "T1"})
+        await orchestrator.broadcast_service.drain_websockets()
+        assert len([m for m in websocket.sent if m["type"] == "BOOK_UPDATED"]) == 2
+        assert orchestrator.sequencer.seq == 8
+
+    @pytest.mark.asyncio
+    async def test_failed_command_does_not_stall_the_batch(self):
+        from core.sequencer import MarketSequencer
+
+        published = []
+
+        async def publish(updates):
+            published.append(updates)
+
+        async def fail():
+            raise ValueError("bad order")
+
+        async def ok():
+            return "ok", ({"order_added": True}, None)
+
+        sequencer = MarketSequencer(publish)
+        results = await asyncio.gather(
+            sequencer.submit("add", ok), sequencer.submit("add", fail), sequencer.submit("add", ok),
+            return_exceptions=True,
+        )
+        assert results[0] == "ok" and results[2] == "ok"
+        assert isinstance(results[1], ValueError)
+        assert published == [[({"order_added": True}, None)] * 2]
+
+        await sequencer.close()
+        with pytest.raises(RuntimeError):
+            await sequencer.submit("add", ok)
@@ -8,6 +8,7 @@ Tests for session manager functionality, including:
 - Permanent role persistence
 """
 
+import asyncio
 import pytest
 import sys
 import os
@@ -157,5 +158,46 @@ async def test_session_full_creates_new():
     print(f"  Sessions: {session_id1} vs {session_id2}")
 
 
+@pytest.mark.asyncio
+async def test_waiting_room_wakes_on_session_start():
+    """Test that waiters are woken by the session start instead of polling."""
+    print("\nTesting waiting room wakeup on session start...")
+
+    manager = SessionManager()
+    params = TradingParameters(predefined_goals=[100])
+    await manager.join_session("user1", params)
+
+    waiter = asyncio.create_task(manager.wait_for_session_change("user1"))
+    await asyncio.sleep(0)
+    assert not waiter.done()
+
+    market_id, trader_manager = await manager.start_trading_session("user1")
+    try:
+        status = await asyncio.wait_for(waiter, timeout=1)
+        assert status["status"] == "active"
+        assert status["market_id"] == market_id
+        assert not manager._session_events
+    finally:
+        await trader_manager.cleanup()
+    print("  Waiter woke with active status")
+
+
+@pytest.mark.asyncio
+async def test_waiting_room_wakes_on_leave():
+    """Test that a waiter is released when its user leaves the session."""
+    print("\nTesting waiting room wakeup on leave...")
+
+    manager = SessionManager()
+    await manager.join_session("user1", TradingParameters(predefined_goals=[100, -100]))
+
+    waiter = asyncio.create_task(manager.wait_for_session_change("user1"))
+    await asyncio.sleep(0)
+    await manager.remove_user_from_session("user1")
+
+    status = await asyncio.wait_for(waiter, timeout=1)
+    assert status["status"] == "not_found"
+    print("  Waiter released after leaving")
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v", "-s"])
@@ -0,0 +1,72 @@
+"""
+Trader mailbox tests.
+
+Tests cover:
+- Slow traders do not hold up the order path
+"""
+
+import sys
+import os
+import asyncio
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.data_models import OrderType
+from helpers import RecordingTrader
+
+
+class SlowTrader(RecordingTrader):
+    def __init__(self):
+        super().__init__(False, "SLOW")
+        self.release = asyncio.Event()
+
+    async def on_message_from_system(self, message):
+        await self.release.wait()
+        await super().on_message_from_system(message)
+
+
+class TestTraderMailbox:
+    @pytest.mark.asyncio
+    async def test_order_handling_does_not_wait_for_traders(self):
+        from core.handlers import MarketOrchestrator
+
+        orchestrator = MarketOrchestrator("mailbox_test", 1, 100, 10, 10, {})
+        orchestrator.active = True
+        service = orchestrator.broadcast_service
+        trader = SlowTrader()
+        service.connected_traders["SLOW"] = {"trader_instance": trader}
+
+        await orchestrator.handle_trader_message({
+            "type": "add_order", "order_id": "a0", "trader_id": "T1",
+            "order_type": OrderType.ASK.value, "price": 101, "amount": 1,
+        })
+        await asyncio.wait_for(orchestrator.handle_trader_message({
+            "type": "add_order", "order_id": "b0", "trader_id": "T2",
+            "order_type": OrderType.BID.value, "price": 101, "amount": 1,
+        }), timeout=1)
+        await orchestrator.handle_trader_message({
+            "type": "add_order", "order_id": "a1", "trader_id": "T1",
+            "order_type": OrderType.ASK.value, "price": 102, "amount": 1,
+        })
+        assert trader.messages == []
+
+        trader.release.set()
+        await service.drain_traders()
+        # The first update was taken before the stall; later book states
+        # collapse to the newest, the fill is kept in order
+        types = [m["type"] for m in trader.messages]
+        assert types == ["BOOK_UPDATED", "transaction_update", "BOOK_UPDATED"]
+        assert trader.messages[-1]["active_orders"][0]["id"] == "a1"
+        assert trader.superseded_messages == 1
+
+    @pytest.mark.asyncio
+    async def test_closed_mailbox_ignores_messages(self):
+        trader = RecordingTrader(False)
+        trader.post_message({"type": "time_update"})
+        await trader.wait_for_mailbox()
+        await trader.clean_up()
+        trader.post_message({"type": "time_update"})
+        await trader.wait_for_mailbox()
+        assert len(trader.messages) == 1
@@ -0,0 +1,134 @@
+"""
+Per-socket writer tests.
+
+Tests cover:
+- Writer queues keep trades and coalesce book states
+- Slow-consumer policy based on lasting backlog
+"""
+
+import sys
+import os
+import asyncio
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.data_models import OrderType
+from helpers import FakeWebSocket
+
+
+class StalledWebSocket(FakeWebSocket):
+    """Accepts one frame, then blocks until released."""
+
+    def __init__(self):
+        super().__init__()
+        self.release = asyncio.Event()
+
+    async def send_text(self, text):
+        await super().send_text(text)
+        await self.release.wait()
+
+
+class TestWebSocketFanout:
+    def make_service(self, market_id):
+        from core.handlers import MarketOrchestrator
+
+        orchestrator = MarketOrchestrator(market_id, 1, 100, 10, 10, {})
+        orchestrator.active = True
+        return orchestrator, orchestrator.broadcast_service
+
+    @pytest.mark.asyncio
+    async def test_slow_socket_does_not_hold_up_others(self):
+        orchestrator, service = self.make_service("fanout_test")
+        slow, fast = StalledWebSocket(), FakeWebSocket()
+        orchestrator.register_websocket(slow)
+        orchestrator.register_websocket(fast)
+
+        for i in range(5):
+            await orchestrator.handle_trader_message({
+                "type": "add_order", "order_id": f"a{i}", "trader_id": "T1",
+                "order_type": OrderType.ASK.value, "price": 101 + i, "amount": 1,
+            })
+            await asyncio.sleep(0)
+        assert len(fast.sent) == 5
+        assert len(slow.sent) == 1
+        assert service.fanout_metrics()["queue_depth_max"] == 1
+
+        # Only the latest of the queued book states is still waiting
+        slow.release.set()
+        await service.drain_websockets()
+        assert len(slow.sent) == 2
+        assert len(slow.sent[-1]["active_orders"]) == 5
+        assert service.fanout_metrics()["frames_dropped"] == 3
+
+    @pytest.mark.asyncio
+    async def test_trades_are_kept_and_lasting_overflow_disconnects(self):
+        orchestrator, service = self.make_service("fanout_overflow_test")
+        service.WEBSOCKET_QUEUE_SIZE = 3
+        service.WEBSOCKET_MAX_LAG = 0.02
+        slow = StalledWebSocket()
+        orchestrator.register_websocket(slow)
+
+        await service.broadcast_to_websockets({"type": "transaction_update", "n": 0})
+        await asyncio.sleep(0)
+        # Trades are never superseded, so they queue up behind the stalled send
+        for i in range(1, 5):
+            await service.broadcast_to_websockets({"type": "transaction_update", "n": i})
+        # Over the limit, but not for long yet
+        assert slow in service.websockets
+
+        await asyncio.sleep(0.05)
+        await service.broadcast_to_websockets({"type": "transaction_update", "n": 5})
+        assert slow not in service.websockets
+        await asyncio.sleep(0.01)
+        assert slow.closed_with == 1013
+        metrics = service.fanout_metrics()
+        assert metrics["connections"] == 0
+        assert metrics["slow_consumer_disconnects"] == 1
+        assert metrics["frames_dropped"] == 5
+
+    @pytest.mark.asyncio
+    async def test_large_sweep_does_not_disconnect_a_healthy_client(self):
+        orchestrator, service = self.make_service("fanout_sweep_test")
+        client = FakeWebSocket()
+        orchestrator.register_websocket(client)
+        for i in range(300):
+            await orchestrator.handle_trader_message({
+                "type": "add_order", "order_id": f"a{i}", "trader_id": "T1",
+                "order_type": OrderType.ASK.value, "price": 101, "amount": 1,
+            })
+        await service.drain_websockets()
+
+        # One command queues 300 trade frames before the writer runs
+        await orchestrator.handle_trader_message({
+            "type": "add_order", "order_id": "b0", "trader_id": "T2",
+            "order_type": OrderType.BID.value, "price": 101, "amount": 300,
+        })
+        await service.drain_websockets()
+
+        assert client.closed_with is None and client in service.websockets
+        assert sum(frame["type"] == "transaction_update" for frame in client.sent) == 300
+        assert service.fanout_metrics()["slow_consumer_disconnects"] == 0
+
+    @pytest.mark.asyncio
+    async def test_delta_subscriber_resyncs_after_shedding(self):
+        orchestrator, service = self.make_service("fanout_resync_test")
+        service.WEBSOCKET_QUEUE_SIZE = 2
+        slow = StalledWebSocket()
+        orchestrator.register_websocket(slow)
+        await orchestrator.subscribe_book_deltas(slow)
+        await asyncio.sleep(0)
+
+        for i in range(4):
+            await orchestrator.handle_trader_message({
+                "type": "add_order", "order_id": f"a{i}", "trader_id": "T1",
+                "order_type": OrderType.ASK.value, "price": 101 + i, "amount": 1,
+            })
+        assert slow in service.websockets
+
+        slow.release.set()
+        await service.drain_websockets()
+        last = slow.sent[-1]
+        assert last["type"] == "book_snapshot" and last["seq"] == service.book_seq
+        assert len(last["active_orders"]) == 4
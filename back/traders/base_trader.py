@@ -2,17 +2,45 @@
 Refactored BaseTrader with explicit message handlers instead of dynamic dispatch.
 """
 import asyncio
+import random
 import uuid
 from abc import abstractmethod
-from typing import Dict, Any, Callable
-from core.data_models import OrderType, ActionType, TraderType, ThrottleConfig
+from collections import deque
+from typing import Dict, Any, Callable, List, Optional, Tuple
+import numpy as np
+from core.data_models import OrderType, ActionType, ExecutionType, TraderType, ThrottleConfig
 from utils.utils import setup_custom_logger
 
 logger = setup_custom_logger(__name__)
 
 
+def aggressive_execution_type(params: Dict[str, Any]) -> ExecutionType:
+    """How algo traders send orders meant to take liquidity.
+
+    IOC keeps orders priced off a stale book from resting; batch auction
+    markets only match in the auction, so there they stay plain limits.
+    """
+    if params.get("algo_aggressive_ioc", True) and params.get("matching_mode", "continuous") == "continuous":
+        return ExecutionType.IOC
+    return ExecutionType.LIMIT
+
+
+def trader_seed(market_seed: int, trader_id: str) -> int:
+    """A trader's own 32-bit seed, derived from its market's seed and its id."""
+    return random.Random(f"{market_seed}:{trader_id}").getrandbits(32)
+
+
 class BaseTrader:
     """Base trader class with explicit message handling."""
+
+    # Book updates arrive once per market event; set True to get them at the
+    # market's coalesced flush rate instead
+    coalesce_book_updates = False
+
+    # Book state messages: a queued one is replaced by the next, so a busy
+    # trader skips straight to the latest book. Everything else (fills,
+    # lifecycle) is handled in arrival order.
+    SNAPSHOT_MESSAGE_TYPES = ("BOOK_UPDATED", "time_update")
     
     def __init__(self, trader_type: TraderType, id: str, cash=0, shares=0):
         # Core attributes
@@ -24,6 +52,11 @@ class BaseTrader:
         self.id = id
         self.trading_market_uuid = None
 
+        # Own generators, so draws here never shift another trader's or market's stream
+        self.rng_seed: Optional[int] = None
+        self.rng = random.Random()
+        self.np_rng = np.random.default_rng()
+
         # State management
         self._stop_requested = asyncio.Event()
         self.order_book: Dict = {}
@@ -54,9 +87,30 @@ class BaseTrader:
         self.orders_in_window = 0
         self.throttle_config = None
 
+        # Mailbox: the market posts messages here and returns at once; a task
+        # per trader hands them to on_message_from_system
+        self._mailbox: deque = deque()
+        self._mailbox_wakeup = asyncio.Event()
+        self._mailbox_idle = asyncio.Event()
+        self._mailbox_idle.set()
+        self._mailbox_task: Optional[asyncio.Task] = None
+        self._mailbox_closed = False
+        self.superseded_messages = 0
+
         # Set up explicit message handlers instead of dynamic dispatch
         self.message_handlers = self._setup_message_handlers()
 
+    def seed_rng(self, market_seed: Optional[int]) -> None:
+        """Seed this trader's generators from its market's seed; repeat calls are no-ops."""
+        if market_seed is None:
+            return
+        seed = trader_seed(market_seed, self.id)
+        if seed == self.rng_seed:
+            return
+        self.rng_seed = seed
+        self.rng = random.Random(seed)
+        self.np_rng = np.random.default_rng(seed)
+
     def _setup_message_handlers(self) -> Dict[str, Callable]:
         """Set up explicit message handlers - no more dynamic dispatch."""
         return {
@@ -105,6 +159,47 @@ class BaseTrader:
         # Default implementation - can be overridden
         pass
 
+    # Mailbox
+    def post_message(self, data: Dict[str, Any]):
+        """Queue a platform message for this trader without waiting for it to be handled."""
+        if self._mailbox_closed:
+            return
+        message_type = data.get("type")
+        if message_type in self.SNAPSHOT_MESSAGE_TYPES and self._mailbox:
+            kept = deque(m for m in self._mailbox if m.get("type") != message_type)
+            self.superseded_messages += len(self._mailbox) - len(kept)
+            self._mailbox = kept
+        self._mailbox.append(data)
+        self._mailbox_idle.clear()
+        self._mailbox_wakeup.set()
+        if self._mailbox_task is None:
+            self._mailbox_task = asyncio.create_task(self._run_mailbox())
+
+    async def _run_mailbox(self):
+        while not self._mailbox_closed:
+            if not self._mailbox:
+                self._mailbox_idle.set()
+                self._mailbox_wakeup.clear()
+                await self._mailbox_wakeup.wait()
+                continue
+            # on_message_from_system logs and swallows its own errors
+            await self.on_message_from_system(self._mailbox.popleft())
+        self._mailbox_idle.set()
+
+    async def wait_for_mailbox(self):
+        """Wait until every message posted so far has been handled."""
+        await self._mailbox_idle.wait()
+
+    def close_mailbox(self):
+        """Drop queued messages and stop the mailbox task; later posts are ignored."""
+        self._mailbox_closed = True
+        self._mailbox.clear()
+        self._mailbox_idle.set()
+        self._mailbox_wakeup.set()
+        task = self._mailbox_task
+        if task is not None and task is not asyncio.current_task():
+            task.cancel()
+
     # Core functionality methods
     async def on_message_from_system(self, data: Dict[str, Any]):
         """Process messages from the trading platform - no more dynamic dispatch."""
@@ -161,6 +256,7 @@ class BaseTrader:
     async def clean_up(self):
         """Clean up trader resources."""
         self._stop_requested.set()
+        self.close_mailbox()
 
     async def connect_to_market(self, trading_market_uuid: str, trading_market=None):
         """Connect trader to market."""
@@ -168,11 +264,23 @@ class BaseTrader:
         self.trading_market_uuid = trading_market_uuid
         self.trading_market = trading_market
 
-    async def send_to_trading_system(self, message: Dict[str, Any]):
-        """Send message to trading platform."""
+    async def send_to_trading_system(self, message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Send message to trading platform; returns the market's response."""
         message["trader_id"] = self.id
         if hasattr(self, 'trading_market') and self.trading_market:
-            await self.trading_market.handle_trader_message(message)
+            return await self.trading_market.handle_trader_message(message)
+        return None
+
+    async def _rate_limited(self, response: Optional[Dict[str, Any]], action: str) -> bool:
+        """Whether the market turned a request away over its rate limit."""
+        if not response or response.get("status") != "rate_limited":
+            return False
+        await self.on_rate_limited(action, response)
+        return True
+
+    async def on_rate_limited(self, action: str, response: Dict[str, Any]):
+        """Called when the market rejects one of our requests over its rate limit."""
+        logger.info(f"trader {self.id} rate limited on {action}")
 
     # PNL and performance tracking
     def get_elapsed_time(self) -> float:
@@ -316,6 +424,8 @@ class BaseTrader:
             order["price"] * order["amount"]
             for order in self.placed_orders
             if order.get("order_type") == OrderType.BID
+            # Market/IOC/FOK orders are settled as soon as they are processed
+            and order.get("execution_type", ExecutionType.LIMIT) == ExecutionType.LIMIT
             # Only count if not already filled (check if order_ids still exist)
             and not any(oid in [o["id"] for o in self.filled_orders] for oid in order.get("order_ids", []))
             # Only count if not already in self.orders (avoid double counting)
@@ -343,6 +453,7 @@ class BaseTrader:
             order["amount"]
             for order in self.placed_orders
             if order.get("order_type") == OrderType.ASK
+            and order.get("execution_type", ExecutionType.LIMIT) == ExecutionType.LIMIT
             # Only count if not already filled
             and not any(oid in [o["id"] for o in self.filled_orders] for oid in order.get("order_ids", []))
             # Only count if not already in self.orders (avoid double counting)
@@ -351,46 +462,104 @@ class BaseTrader:
         return self.shares - locked_in_book - locked_pending
 
     # Order management
-    async def post_new_order(self, amount: int, price: int, order_type: OrderType) -> str:
-        """Post a new order with throttling if configured."""
-        # Check balance for human and agentic traders (noise/informed traders have infinite resources)
-        # This prevents negative inventory issues
+    def _can_afford(self, amount: float, price: float, order_type: OrderType) -> bool:
+        """Balance check for human and agentic traders.
+
+        Noise/informed traders have infinite resources; for the others this
+        prevents negative inventory.
+        """
         traders_with_finite_resources = [TraderType.HUMAN.value, TraderType.AGENTIC.value]
-        if self.trader_type in traders_with_finite_resources:
-            if order_type == OrderType.BID:
-                # buying - check if enough cash (including locked cash in active orders)
-                available_cash = self.get_available_cash()
-                if available_cash < price * amount:
-                    logger.warning(
-                        f"trader {self.id} ({self.trader_type}) insufficient cash: "
-                        f"available {available_cash}, needs {price * amount}"
-                    )
-                    return None
-            elif order_type == OrderType.ASK:
-                # selling - check if enough shares (including locked shares in active orders)
-                available_shares = self.get_available_shares()
-                if available_shares < amount:
-                    logger.warning(
-                        f"trader {self.id} ({self.trader_type}) insufficient shares: "
-                        f"available {available_shares}, needs {amount}, current shares: {self.shares}"
-                    )
-                    return None
+        if self.trader_type not in traders_with_finite_resources:
+            return True
+        if order_type == OrderType.BID:
+            # buying - check if enough cash (including locked cash in active orders)
+            available_cash = self.get_available_cash()
+            if available_cash < price * amount:
+                logger.warning(
+                    f"trader {self.id} ({self.trader_type}) insufficient cash: "
+                    f"available {available_cash}, needs {price * amount}"
+                )
+                return False
+        elif order_type == OrderType.ASK:
+            # selling - check if enough shares (including locked shares in active orders)
+            available_shares = self.get_available_shares()
+            if available_shares < amount:
+                logger.warning(
+                    f"trader {self.id} ({self.trader_type}) insufficient shares: "
+                    f"available {available_shares}, needs {amount}, current shares: {self.shares}"
+                )
+                return False
+        return True
 
-        # Apply throttling if configured
-        if self.throttle_config and self.throttle_config.order_throttle_ms > 0:
-            current_time = asyncio.get_event_loop().time() * 1000  # Convert to milliseconds
+    def _throttle_allows(self) -> bool:
+        """Count one order against the throttle window, if throttling is configured."""
+        if not self.throttle_config or self.throttle_config.order_throttle_ms <= 0:
+            return True
+        current_time = asyncio.get_event_loop().time() * 1000  # Convert to milliseconds
+
+        # Check if we're in a new window
+        if current_time - self.last_order_time > self.throttle_config.order_throttle_ms:
+            self.last_order_time = current_time
+            self.orders_in_window = 0
+
+        # Check if we've exceeded the order limit in this window
+        if self.orders_in_window >= self.throttle_config.max_orders_per_window:
+            return False
 
-            # Check if we're in a new window
-            if current_time - self.last_order_time > self.throttle_config.order_throttle_ms:
-                self.last_order_time = current_time
-                self.orders_in_window = 0
+        # Increment order count for this window
+        self.orders_in_window += 1
+        return True
 
-            # Check if we've exceeded the order limit in this window
-            if self.orders_in_window >= self.throttle_config.max_orders_per_window:
-                return None  # Discard the order
+    async def post_new_orders(self, orders: List[Tuple[float, float, OrderType]]) -> List[str]:
+        """Post several limit orders as one `add_orders` message.
+
+        Each (amount, price, order_type) goes through the same balance and
+        throttle checks as post_new_order; the market places the survivors in
+        one pass and broadcasts the book once.
+        """
+        batch, pending = [], []
+        for amount, price, order_type in orders:
+            if not self._can_afford(amount, price, order_type) or not self._throttle_allows():
+                continue
+            order_id = f"{self.id}_{len(self.placed_orders)}"
+            batch.append({
+                "amount": amount,
+                "price": price,
+                "order_type": order_type,
+                "order_id": order_id,
+            })
+            # Recorded before sending so ids stay unique and later balance checks see it
+            pending.append({
+                "order_ids": [order_id],
+                "amount": amount,
+                "price": price,
+                "order_type": order_type,
+                "timestamp": asyncio.get_event_loop().time(),
+            })
+            self.placed_orders.append(pending[-1])
 
-            # Increment order count for this window
-            self.orders_in_window += 1
+        if batch:
+            response = await self.send_to_trading_system({
+                "action": ActionType.POST_NEW_ORDERS.value,
+                "orders": batch,
+            })
+            if await self._rate_limited(response, ActionType.POST_NEW_ORDERS.value):
+                # Nothing reached the book, so nothing stays locked
+                self.placed_orders = [order for order in self.placed_orders if order not in pending]
+                return []
+        return [order["order_id"] for order in batch]
+
+    async def post_new_order(self, amount: int, price: int, order_type: OrderType,
+                             execution_type: ExecutionType = ExecutionType.LIMIT) -> str:
+        """Post a new order with throttling if configured.
+
+        Non-limit execution types (market, IOC, FOK) trade immediately and
+        never rest in the book.
+        """
+        if not self._can_afford(amount, price, order_type):
+            return None
+        if not self._throttle_allows():
+            return None  # Discard the order
 
         # Special handling for zero-amount orders (only for human traders)
         if amount == 0 and self.trader_type == TraderType.HUMAN.value:
@@ -405,7 +574,9 @@ class BaseTrader:
                 "is_record_keeping": True,  # Flag to indicate this is for record-keeping only
             }
 
-            await self.send_to_trading_system(new_order)
+            response = await self.send_to_trading_system(new_order)
+            if await self._rate_limited(response, ActionType.POST_NEW_ORDER.value):
+                return None
 
             self.placed_orders.append({
                 "order_ids": [order_id],
@@ -426,15 +597,19 @@ class BaseTrader:
             "price": price,
             "order_type": order_type,
             "order_id": order_id,
+            "execution_type": execution_type.value,
         }
 
-        await self.send_to_trading_system(new_order)
+        response = await self.send_to_trading_system(new_order)
+        if await self._rate_limited(response, ActionType.POST_NEW_ORDER.value):
+            return None
 
         self.placed_orders.append({
             "order_ids": [order_id],
             "amount": amount,
             "price": price,
             "order_type": order_type,
+            "execution_type": execution_type,
             "timestamp": asyncio.get_event_loop().time(),
         })
 
@@ -469,10 +644,78 @@ class BaseTrader:
         }
 
         try:
-            await self.send_to_trading_system(cancel_order_request)
-            return True
+            response = await self.send_to_trading_system(cancel_order_request)
+        except Exception:
+            return False
+        if await self._rate_limited(response, ActionType.CANCEL_ORDER.value):
+            # The order is still resting, so take back what the cancel released
+            if self.trader_type != TraderType.NOISE.value:
+                if order_to_cancel["order_type"] == OrderType.BID:
+                    self.cash -= order_to_cancel["price"] * order_to_cancel["amount"]
+                elif order_to_cancel["order_type"] == OrderType.ASK:
+                    self.shares -= order_to_cancel["amount"]
+            return False
+        return True
+
+    async def send_cancel_all_request(self, order_type: Optional[OrderType] = None,
+                                      min_price: Optional[float] = None,
+                                      max_price: Optional[float] = None) -> bool:
+        """Cancel all our resting orders, optionally one side and/or a price range."""
+        orders_to_cancel = [
+            order for order in self.orders
+            if (order_type is None or order["order_type"] == order_type)
+            and (min_price is None or order["price"] >= min_price)
+            and (max_price is None or order["price"] <= max_price)
+        ]
+        if not orders_to_cancel:
+            return False
+
+        if self.trader_type != TraderType.NOISE.value:
+            for order in orders_to_cancel:
+                if order["order_type"] == OrderType.BID:
+                    self.cash += order["price"] * order["amount"]
+                elif order["order_type"] == OrderType.ASK:
+                    self.shares += order["amount"]
+
+        cancel_all_request = {
+            "action": ActionType.CANCEL_ALL.value,
+            "order_type": order_type,
+            "min_price": min_price,
+            "max_price": max_price,
+        }
+
+        try:
+            response = await self.send_to_trading_system(cancel_all_request)
+        except Exception:
+            return False
+        if await self._rate_limited(response, ActionType.CANCEL_ALL.value):
+            if self.trader_type != TraderType.NOISE.value:
+                for order in orders_to_cancel:
+                    if order["order_type"] == OrderType.BID:
+                        self.cash -= order["price"] * order["amount"]
+                    elif order["order_type"] == OrderType.ASK:
+                        self.shares -= order["amount"]
+            return False
+        return True
+
+    async def send_modify_order_request(self, order_id: str, price: float = None,
+                                        amount: float = None) -> bool:
+        """Reprice and/or resize one of our resting orders in a single request."""
+        if not order_id or order_id not in [order["id"] for order in self.orders]:
+            return False
+
+        modify_order_request = {
+            "action": ActionType.MODIFY_ORDER.value,
+            "order_id": order_id,
+            "price": price,
+            "amount": amount,
+        }
+
+        try:
+            response = await self.send_to_trading_system(modify_order_request)
         except Exception:
             return False
+        return not await self._rate_limited(response, ActionType.MODIFY_ORDER.value)
 
     # Abstract methods
     @abstractmethod
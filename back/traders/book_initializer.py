@@ -1,5 +1,4 @@
 import math
-import random
 from core.data_models import OrderType, TraderType
 from . import BaseTrader
 
@@ -13,7 +12,7 @@ class BookInitializer(BaseTrader):
 
     def generate_price(self, is_bid: bool, min_price: int, max_price: int) -> int:
         step = self.trader_creation_data["step"]
-        price = random.randint(min_price, max_price)
+        price = self.rng.randint(min_price, max_price)
         return round(price / step) * step
 
     def normalise_weights(self, raw_weights: list, levels:int) -> list:
@@ -39,27 +38,21 @@ class BookInitializer(BaseTrader):
         bid_prices = [default_price - step * i for i in range(1,levels+1)]
         ask_prices = [default_price + step * i for i in range(1,levels+1)]
 
-        # Post bid orders
-        for price in bid_prices:
-            await self.post_new_order(1.0, price, OrderType.BID)
-
-        # Post ask orders
-        for price in ask_prices:
-            await self.post_new_order(1.0, price, OrderType.ASK)
-        
         remaining = total_orders - levels
         raw_weights = self.trader_creation_data.get("depth_weights")
         weights = self.normalise_weights(raw_weights, levels)
 
-        extra_bid_prices = random.choices(bid_prices, weights=weights, k=remaining)
-
-        for price in extra_bid_prices:
-            await self.post_new_order(1.0, price, OrderType.BID)
-
-        extra_ask_prices = random.choices(ask_prices, weights=weights, k=remaining)
-        
-        for price in extra_ask_prices:
-            await self.post_new_order(1.0, price, OrderType.ASK)
+        extra_bid_prices = self.rng.choices(bid_prices, weights=weights, k=remaining)
+        extra_ask_prices = self.rng.choices(ask_prices, weights=weights, k=remaining)
+
+        # One level each side first, then the weighted extras, in a single batch
+        orders = (
+            [(1.0, price, OrderType.BID) for price in bid_prices]
+            + [(1.0, price, OrderType.ASK) for price in ask_prices]
+            + [(1.0, price, OrderType.BID) for price in extra_bid_prices]
+            + [(1.0, price, OrderType.ASK) for price in extra_ask_prices]
+        )
+        await self.post_new_orders(orders)
 
 
     async def run(self) -> None:
@@ -4,12 +4,22 @@ import random
 import json
 
 from core.data_models import TraderType, OrderType
+from core.transaction_manager import HISTORY_PAGE_SIZE
+from utils.websocket_utils import (
+    JSON_ENCODING, TRADER_STATE_ENCODER, EncodedMessage, encode_prepared, merge_frames,
+    prepare_message,
+)
 from utils import setup_custom_logger
 import traceback
 
 logger = setup_custom_logger(__name__)
 
+# Market-wide fields a delta subscriber already gets from the book stream
+BOOK_STREAM_FIELDS = ("order_book", "active_orders", "history", "history_offset")
+
 class HumanTrader(PausingTrader):
+    # Everything a human sees goes to a browser, which only needs the flushed book
+    coalesce_book_updates = True
 
     def __init__(self, id, cash=0, shares=0, goal=0, role=None, trading_market=None, params=None, gmail_username=None):
         super().__init__(TraderType.HUMAN, id, cash, shares)
@@ -20,6 +30,7 @@ class HumanTrader(PausingTrader):
         self.gmail_username = gmail_username
         self.websocket = None
         self.goal_progress = 0
+        self.book_deltas = False
 
     def get_trader_params_as_dict(self):
         return {
@@ -49,9 +60,7 @@ class HumanTrader(PausingTrader):
         # that is sent to multiple traders
         message_type = json_message.get("type", None)
         if message_type:
-            # Create a copy without 'type' for kwargs
-            message_data = {k: v for k, v in json_message.items() if k != "type"}
-            await self.send_message_to_client(message_type, **message_data)
+            await self.send_message_to_client(message_type, shared=json_message)
 
     async def connect_to_socket(self, websocket):
         try:
@@ -74,7 +83,12 @@ class HumanTrader(PausingTrader):
         except Exception as e:
             traceback.print_exc()
 
-    async def send_message_to_client(self, message_type, **kwargs):
+    async def send_message_to_client(self, message_type, shared=None, **kwargs):
+        """Send this trader's state to the browser, merged over an optional shared message.
+
+        A shared broadcast is encoded once for every human (see EncodedMessage);
+        only the personal fields below are encoded per trader.
+        """
         if not self.websocket:
             return
         if self.websocket.client_state != WebSocketState.CONNECTED:
@@ -82,8 +96,7 @@ class HumanTrader(PausingTrader):
         if not self.socket_status:
             return
 
-        order_book = self.order_book or {"bids": [], "asks": []}
-        kwargs["trader_orders"] = self.orders
+        exclude = ("type",) + (BOOK_STREAM_FIELDS if self.book_deltas else ())
         try:
             message = {
                 "shares": self.shares,
@@ -94,7 +107,7 @@ class HumanTrader(PausingTrader):
                 "goal": self.goal,  # Add this line
                 "goal_progress": self.goal_progress,  # Add this line
                 **kwargs,
-                "order_book": order_book,
+                "trader_orders": self.orders,
                 "initial_cash": self.initial_cash,
                 "initial_shares": self.initial_shares,
                 "sum_dinv": self.sum_dinv,
@@ -102,10 +115,20 @@ class HumanTrader(PausingTrader):
                 "filled_orders": self.filled_orders,
                 "placed_orders": self.placed_orders,
             }
-            # Import sanitization function
-            from utils.websocket_utils import sanitize_websocket_message
-            sanitized_message = sanitize_websocket_message(message)
-            await self.websocket.send_json(sanitized_message)
+            if not self.book_deltas and (shared is None or "order_book" not in shared):
+                message["order_book"] = self.order_book or {"bids": [], "asks": []}
+            encoding, tick_size = self.websocket_encoding()
+            payload = encode_prepared(TRADER_STATE_ENCODER.prepare(message), encoding, tick_size)
+            if isinstance(shared, EncodedMessage):
+                payload = merge_frames(shared.frame(encoding, exclude, tick_size), payload)
+            elif shared:
+                shared_fields = {k: v for k, v in shared.items() if k not in exclude}
+                payload = merge_frames(
+                    encode_prepared(prepare_message(shared_fields, message_type), encoding, tick_size),
+                    payload,
+                )
+            # Only the latest queued state update is worth sending
+            await self.send_frame(payload, "trader_state" if message_type == "BOOK_UPDATED" else None)
         except WebSocketDisconnect:
             self.socket_status = False
             # Unregister websocket from trading platform
@@ -114,6 +137,26 @@ class HumanTrader(PausingTrader):
         except Exception as e:
             traceback.print_exc()
 
+    def websocket_encoding(self):
+        if self.trading_market:
+            return self.trading_market.websocket_encoding(self.websocket)
+        return JSON_ENCODING, 1
+
+    async def send_frame(self, payload, replace_key=None):
+        """Queue a frame on the market's writer for this socket.
+
+        A slow browser then never blocks the market; a socket the market has
+        not registered is sent to directly.
+        """
+        if self.trading_market and self.trading_market.send_to_websocket(
+            self.websocket, payload, replace_key
+        ):
+            return
+        if isinstance(payload, bytes):
+            await self.websocket.send_bytes(payload)
+        else:
+            await self.websocket.send_text(payload)
+
     async def on_message_from_client(self, message):
         try:
             json_message = json.loads(message)
@@ -166,6 +209,50 @@ class HumanTrader(PausingTrader):
         if order_uuid in [order["id"] for order in self.orders]:
             await self.send_cancel_order_request(order_uuid)
 
+    async def handle_subscribe_book_deltas(self, data):
+        if self.websocket and self.trading_market:
+            self.book_deltas = True
+            await self.trading_market.subscribe_book_deltas(self.websocket)
+
+    async def handle_resync_book(self, data):
+        if self.websocket and self.trading_market and self.book_deltas:
+            await self.trading_market.resync_book(self.websocket)
+
+    async def handle_set_protocol(self, data):
+        """Client asks for a wire format right after authenticating; JSON unless supported."""
+        if self.websocket and self.trading_market:
+            encoding = self.trading_market.set_websocket_encoding(
+                self.websocket, (data or {}).get("encoding", JSON_ENCODING)
+            )
+            logger.info(f"Human trader {self.id} using {encoding} frames")
+
+    async def handle_get_history(self, data):
+        if not self.websocket or not self.trading_market:
+            return
+        data = data or {}
+        page = self.trading_market.get_history_page(
+            data.get("cursor"), data.get("limit", HISTORY_PAGE_SIZE)
+        )
+        encoding, tick_size = self.websocket_encoding()
+        try:
+            await self.send_frame(encode_prepared({"type": "history_page", **page}, encoding, tick_size))
+        except Exception:
+            traceback.print_exc()
+
+    async def on_rate_limited(self, action, response):
+        """Tell the browser its request was dropped, so nothing looks pending."""
+        await super().on_rate_limited(action, response)
+        if not self.websocket:
+            return
+        encoding, tick_size = self.websocket_encoding()
+        try:
+            await self.send_frame(encode_prepared(
+                {"type": "rate_limited", "action": action, "message": response.get("message")},
+                encoding, tick_size,
+            ))
+        except Exception:
+            traceback.print_exc()
+
     async def handle_closure(self, data):
         await self.post_processing_server_message(data)
         await super().handle_closure(data)
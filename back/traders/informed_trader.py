@@ -1,11 +1,10 @@
 import asyncio
-import random
 import traceback
 from typing import List, Dict, Union
 from datetime import datetime
 
 from core.data_models import OrderType, TraderType, TradeDirection
-from .base_trader import BaseTrader, PausingTrader
+from .base_trader import BaseTrader, PausingTrader, aggressive_execution_type
 
 
 class InformedTrader(PausingTrader):
@@ -21,13 +20,15 @@ class InformedTrader(PausingTrader):
         self.informed_order_book_levels = params.get("informed_order_book_levels", 3)
         self.informed_order_book_cancel = params.get("informed_order_book_cancel", 3)
         self.use_passive_orders = params.get("informed_use_passive_orders", False)
+        self.aggressive_execution_type = aggressive_execution_type(params)
         # Order multiplier to increase trading volume
         self.order_multiplier = 1
         
         # Add random direction handling
         if params.get("informed_random_direction", False):
              # Randomly flip the direction with 50% probability
-            if random.random() < 0.5:
+            self.seed_rng(params.get("random_seed"))
+            if self.rng.random() < 0.5:
                 self.params["informed_trade_direction"] = (
                     TradeDirection.SELL 
                     if params["informed_trade_direction"] == TradeDirection.BUY 
@@ -108,9 +109,7 @@ class InformedTrader(PausingTrader):
 
     async def cancel_all_outstanding_orders(self):
         """Cancel all outstanding orders."""
-        if hasattr(self, 'outstanding_levels') and self.outstanding_levels:
-            for orders in self.outstanding_levels.values():
-                await self.cancel_order(orders["order_ids"])
+        await self.send_cancel_all_request()
 
     def get_remaining_time(self) -> float:
         return self.params["trading_day_duration"] * 60 - self.get_elapsed_time()
@@ -282,7 +281,7 @@ class InformedTrader(PausingTrader):
         if int(num_passive_order_to_send) > 0:
             for jj in range(int(num_passive_order_to_send)):
                 if order_side == OrderType.BID:
-                    level_to_send = random.randint(1,self.informed_order_book_levels)
+                    level_to_send = self.rng.randint(1,self.informed_order_book_levels)
                     top_ask_price = self.get_best_price(OrderType.ASK)
                     top_bid_price = self.get_best_price(OrderType.BID)
                     if top_ask_price is not None:
@@ -294,7 +293,7 @@ class InformedTrader(PausingTrader):
                     await self.post_new_order(amount, price_to_send, order_side)
                     flag_send_aggresive = False
                 else:
-                    level_to_send = random.randint(1,self.informed_order_book_levels)
+                    level_to_send = self.rng.randint(1,self.informed_order_book_levels)
                     top_bid_price = self.get_best_price(OrderType.BID)
                     top_ask_price = self.get_best_price(OrderType.ASK)
                     if top_bid_price is not None:
@@ -356,7 +355,7 @@ class InformedTrader(PausingTrader):
             order_type = OrderType.ASK
         
         for iter in range(amt):
-            levels = random.randint(1, order_book_levels) * step
+            levels = self.rng.randint(1, order_book_levels) * step
             price = anchor + sign*levels
             await self.post_new_order(1, price, order_type)
     
@@ -383,7 +382,7 @@ class InformedTrader(PausingTrader):
         # Maximum depth allowed: no crossing + informed level limit
         max_levels = max(1,min(half_spread_ticks, self.informed_order_book_levels))
         # Randomly choose how many consecutive levels to fill
-        level = random.randint(1, max_levels)
+        level = self.rng.randint(1, max_levels)
     
         # Remaining budget to allocate
         remaining_amt = amt
@@ -393,7 +392,7 @@ class InformedTrader(PausingTrader):
             if remaining_amt == 0:
                 break
             # Random share of what remains
-            size = random.randint(1, remaining_amt)
+            size = self.rng.randint(1, remaining_amt)
             # Price at this level
             price = anchor + sign * k * step
             # Post the passive order
@@ -418,21 +417,22 @@ class InformedTrader(PausingTrader):
         # step one: cancel orders that
         # are in level>self.informed_order_book_cancel
     
+        # orders left behind are repriced back into the top levels in one step
         if order_side == OrderType.BID:
             top_bid_price = self.get_best_price(OrderType.BID)
             for order in self.orders:
                 levels_from_best = int((top_bid_price - order['price'])/step)
                 if levels_from_best >self.informed_order_book_cancel:
-                    order_id = order['id']
-                    await self.send_cancel_order_request(order_id)
+                    new_price = top_bid_price - self.rng.randint(0, self.informed_order_book_levels - 1) * step
+                    await self.send_modify_order_request(order['id'], price=new_price)
       
         else:
             top_ask_price = self.get_best_price(OrderType.ASK)
             for order in self.orders:
                 levels_from_best = int((order['price'] - top_ask_price)/step)
                 if levels_from_best > self.informed_order_book_cancel:
-                    order_id = order['id']
-                    await self.send_cancel_order_request(order_id)
+                    new_price = top_ask_price + self.rng.randint(0, self.informed_order_book_levels - 1) * step
+                    await self.send_modify_order_request(order['id'], price=new_price)
     
         ###################################
         # step two: cancel orders if 
@@ -601,7 +601,9 @@ class InformedTrader(PausingTrader):
                 return
             
             #place the order    
-            await self.post_new_order(amount, price_to_send, order_side)
+            await self.post_new_order(
+                amount, price_to_send, order_side, self.aggressive_execution_type
+            )
            
         #cancel any outstanding order if the goal is reached
         self.number_trades = len(self.filled_orders)
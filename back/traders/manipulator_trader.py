@@ -1,8 +1,6 @@
 import asyncio
-import random
 from core.data_models import OrderType, TraderType
 from .base_trader import BaseTrader
-import numpy as np
 
 
 class ManipulatorTrader(BaseTrader):
@@ -24,7 +22,8 @@ class ManipulatorTrader(BaseTrader):
         self.open_trades = 0
 
         if self.random_direction_bool: 
-            self.initial_direction = 'BID' if np.random.uniform(0,1,1)[0] <= 0.5 else 'ASK'
+            self.seed_rng(params.get("random_seed"))
+            self.initial_direction = 'BID' if self.np_rng.uniform(0,1,1)[0] <= 0.5 else 'ASK'
         else:
             self.initial_direction = 'BID' if self.shares_to_open_input >=0 else 'ASK'
 
@@ -1,8 +1,7 @@
 import asyncio
-import random
 import numpy as np
 from core.data_models import OrderType, TraderType, ActionType
-from .base_trader import BaseTrader, PausingTrader
+from .base_trader import BaseTrader, PausingTrader, aggressive_execution_type
 import math
 import sys
 import traceback
@@ -34,6 +33,7 @@ class NoiseTrader(PausingTrader):
         self.step = self.params['step']
         self.order_book_levels = self.params["order_book_levels"]
         self.noise_choise_weights_passive = self.params['noise_pr_passive_weights']
+        self.aggressive_execution_type = aggressive_execution_type(params)
 
         if len(self.noise_choise_weights_passive) < self.order_book_levels:
             min_val = min(self.noise_choise_weights_passive)
@@ -78,7 +78,7 @@ class NoiseTrader(PausingTrader):
         # Get unique prices available
         available_prices = list(set([order['price'] for order in self.orders]))
 
-        prices_to_cancel = random.sample(available_prices, min(amt, len(available_prices)))
+        prices_to_cancel = self.rng.sample(available_prices, min(amt, len(available_prices)))
         #prices_to_cancel = random.choices(available_prices, weights= available_cancel_probs, k=min(amt, len(available_prices)))
         orders_to_cancel = []
         
@@ -114,6 +114,7 @@ class NoiseTrader(PausingTrader):
                     order_volume,
                     price,
                     OrderType.BID if side == "bids" else OrderType.ASK,
+                    self.aggressive_execution_type,
                 )
                 self.historical_placed_orders += order_volume
                 self.historical_matched_orders += order_volume
@@ -131,16 +132,16 @@ class NoiseTrader(PausingTrader):
                 if self.order_book["asks"]:
                     best_ask = self.order_book["asks"][0]["x"]
                     #price = best_ask - random.randint(1, order_book_levels) * step // Previous Version
-                    price = best_ask - random.choices(range(1,order_book_levels+1), weights=self.noise_choise_weights_passive, k=1)[0] * step
+                    price = best_ask - self.rng.choices(range(1,order_book_levels+1), weights=self.noise_choise_weights_passive, k=1)[0] * step
                 else:
-                    price = default_price - random.randint(1, order_book_levels) * step
+                    price = default_price - self.rng.randint(1, order_book_levels) * step
             else:
                 if self.order_book["bids"]:
                     best_bid = self.order_book["bids"][0]["x"]
                     #price = best_bid + random.randint(1, order_book_levels) * step // Previous Version
-                    price = best_bid + random.choices(range(1,order_book_levels+1), weights=self.noise_choise_weights_passive, k=1)[0] * step
+                    price = best_bid + self.rng.choices(range(1,order_book_levels+1), weights=self.noise_choise_weights_passive, k=1)[0] * step
                 else:
-                    price = default_price + random.randint(1, order_book_levels) * step
+                    price = default_price + self.rng.randint(1, order_book_levels) * step
 
             await self.post_new_order(
                 1, price, OrderType.BID if side == "bids" else OrderType.ASK
@@ -158,12 +159,12 @@ class NoiseTrader(PausingTrader):
         best_ask = self.order_book["asks"][0]["x"]
 
         for i in range(amt):
-            side = random.choice(["bids", "asks"])
+            side = self.rng.choice(["bids", "asks"])
 
             if side == "bids":
-                price = best_ask - random.randint(1, order_book_levels) * step
+                price = best_ask - self.rng.randint(1, order_book_levels) * step
             else:
-                price = best_bid + random.randint(1, order_book_levels) * step
+                price = best_bid + self.rng.randint(1, order_book_levels) * step
 
             await self.post_new_order(
                 1, price, OrderType.BID if side == "bids" else OrderType.ASK
@@ -197,11 +198,11 @@ class NoiseTrader(PausingTrader):
     
         max_levels = max(1, min(half_spread_ticks,ref_dist, active_levels))
     
-        level = random.choices(range(1, max_levels + 1),weights=weights[:max_levels],k=1)[0]
+        level = self.rng.choices(range(1, max_levels + 1),weights=weights[:max_levels],k=1)[0]
     
         # Fill all intermediate levels
         for k in range(1, level + 1):
-            size = random.randint(1, max_order_amount)
+            size = self.rng.randint(1, max_order_amount)
             price = anchor + sign * k * step
             await self.post_new_order(size, price, order_type)
             self.historical_placed_orders += size
@@ -229,10 +230,22 @@ class NoiseTrader(PausingTrader):
             order_type = OrderType.ASK
     
         existing_prices = {lvl["x"] for lvl in self.order_book[book_side]}
+        
+        # our own orders stranded deep in the book are repriced into the gaps
+        # before any new order is posted
+        max_distance = self.order_book_levels * step
+        stranded = sorted(
+            (order for order in self.orders
+             if order["order_type"] == order_type and abs(order["price"] - anchor) > max_distance),
+            key=lambda order: abs(order["price"] - anchor),
+            reverse=True,
+        )
     
         for k in range(1, active_levels + 1):
             price = anchor + sign * k * step
             if price not in existing_prices:
+                if stranded and await self.send_modify_order_request(stranded.pop(0)["id"], price=price):
+                    continue
                 await self.post_new_order(1, price, order_type)
                 self.historical_placed_orders += 1
     
@@ -243,10 +256,10 @@ class NoiseTrader(PausingTrader):
         pr_cancel = self.params["noise_cancel_probability"]
         max_order_amount = self.params["max_order_amount"]
         step = self.params['step']
-        amt = random.randint(1, self.params["max_order_amount"])
+        amt = self.rng.randint(1, self.params["max_order_amount"])
 
         # Cancel orders
-        if random.random() < pr_cancel:
+        if self.rng.random() < pr_cancel:
             await self.cancel_orders(amt)
 
         pr_passive = self.params["noise_passive_probability"]
@@ -296,7 +309,7 @@ class NoiseTrader(PausingTrader):
         # ------------------------------------------------------------
         # Choose action + side randomly
         # ------------------------------------------------------------  
-        side = "bids" if random.random() < pr_bid else "asks"
+        side = "bids" if self.rng.random() < pr_bid else "asks"
 
         if tightening_mode:
         
@@ -313,9 +326,9 @@ class NoiseTrader(PausingTrader):
             await self.place_tightening_passive_orders(max_order_amount, side, best_bid, best_ask)
         else:
             # Normal behavior
-            action = random.choices(["passive", "aggressive"],weights=[pr_passive, pr_aggresive],k=1)[0]
+            action = self.rng.choices(["passive", "aggressive"],weights=[pr_passive, pr_aggresive],k=1)[0]
 
-            amt = random.randint(1, max_order_amount)
+            amt = self.rng.randint(1, max_order_amount)
     
             if action == "passive":
                 await self.place_passive_orders(amt, side)
@@ -1,5 +1,4 @@
 import asyncio
-import random
 from core.data_models import OrderType, TraderType
 from .base_trader import BaseTrader
 import numpy as np
@@ -56,7 +55,7 @@ class SpoofingTrader(BaseTrader):
         elif self.human_informed_goal < 0:
             self.spoof_side = "ask"
         else:
-            self.spoof_side = random.choice(['bid','ask'])
+            self.spoof_side = self.rng.choice(['bid','ask'])
 
         
         if self.spoof_side == "bid" and self.order_book.get("bids"):
@@ -1,3 +1,33 @@
+"""
+Helpers for preparing outbound WebSocket messages.
+
+Known message types (book broadcasts, trades, time updates, trader state)
+are encoded from a per-type schema by `MessageEncoder`; anything else goes
+through the generic `sanitize_websocket_message` walk.
+
+JSON text is the default wire format. A client may switch its connection
+to MessagePack binary frames, where prices are sent in ticks and ISO
+timestamps as epoch milliseconds (see `compact`).
+"""
+import json
+from datetime import datetime
+from enum import Enum
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+try:
+    import orjson
+except ImportError:  # optional speed-up; the stdlib encoder produces the same JSON
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # the binary protocol is only offered when msgpack is installed
+    msgpack = None
+
+JSON_ENCODING = "json"
+MSGPACK_ENCODING = "msgpack"
+
+
 def sanitize_websocket_message(message):
     """Sanitize a message before sending over WebSocket to prevent JSON parsing errors."""
     import math
@@ -39,4 +69,311 @@ def sanitize_websocket_message(message):
                 safe_value = str_value.replace('--', '_').strip('-')
                 return safe_value if safe_value else 'unknown'
     
-    return sanitize_value(message) 
\ No newline at end of file
+    return sanitize_value(message) 
+
+
+# Typed encoders
+
+Converter = Callable[[Any], Any]
+
+
+def trusted(value):
+    """Values built JSON-safe where they are created: book levels, order rows, tape entries."""
+    return value
+
+
+def scalar(value):
+    """One leaf value, with the same limits as sanitize_websocket_message."""
+    kind = type(value)
+    if kind is str or kind is bool or value is None:
+        return value
+    if kind is float:
+        # NaN and inf fail the comparison too
+        return value if -1e100 <= value <= 1e100 else 0.0
+    if kind is int:
+        return value if -1e15 <= value <= 1e15 else 0
+    if isinstance(value, Enum):
+        return scalar(value.value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return sanitize_websocket_message(value)
+
+
+def _convert_fields(fields: Dict[str, Converter], message: Dict) -> Dict:
+    converted = {}
+    for key, value in message.items():
+        convert = fields.get(key)
+        converted[key] = convert(value) if convert is not None else sanitize_websocket_message(value)
+    return converted
+
+
+def record(fields: Dict[str, Converter]) -> Converter:
+    """Converter for a nested object with known fields."""
+    def convert(value):
+        if type(value) is not dict:
+            return sanitize_websocket_message(value)
+        return _convert_fields(fields, value)
+    return convert
+
+
+def rows(fields: Dict[str, Converter]) -> Converter:
+    """Converter for a list of objects with known fields."""
+    convert_row = record(fields)
+
+    def convert(value):
+        if type(value) is not list:
+            return sanitize_websocket_message(value)
+        return [convert_row(row) for row in value]
+    return convert
+
+
+class MessageEncoder:
+    """Encoder for one known message type.
+
+    Each field's converter is looked up once from the schema, so encoding
+    does no string probing or speculative json.dumps: scalars get a type
+    check and trusted values are passed through without being walked.
+    Fields missing from the schema fall back to sanitize_websocket_message.
+    """
+    __slots__ = ("fields",)
+
+    def __init__(self, fields: Dict[str, Converter]):
+        self.fields = dict(fields)
+
+    def prepare(self, message: Dict) -> Dict:
+        return _convert_fields(self.fields, message)
+
+    def encode(self, message: Dict) -> str:
+        return dumps(self.prepare(message))
+
+
+BOOK_ENCODER = MessageEncoder({
+    **{key: scalar for key in (
+        "current_time", "start_time", "duration", "spread", "midpoint", "transaction_price",
+        "informed_trader_progress", "history_offset", "seq", "checksum", "event",
+        "order_added", "orders_added", "order_cancelled", "orders_cancelled", "order_modified",
+        "order_id", "content", "text", "batch_auction", "clearing_price", "matched_volume",
+    )},
+    **{key: trusted for key in (
+        "type", "order_book", "active_orders", "history", "bids", "asks", "orders", "removed_orders",
+    )},
+})
+
+TRADES_ENCODER = MessageEncoder({
+    "type": trusted,
+    "transactions": rows({key: scalar for key in ("id", "price", "type", "amount", "trader_id")}),
+    "matched_orders": record({key: scalar for key in (
+        "bid_order_id", "ask_order_id", "transaction_price", "transaction_amount",
+        "bid_trader_id", "ask_trader_id", "bid_price", "ask_price", "timestamp",
+    )}),
+})
+
+TIME_UPDATE_ENCODER = MessageEncoder({
+    "type": trusted,
+    "data": record({key: scalar for key in (
+        "current_time", "is_trading_started", "remaining_time", "dayOver",
+        "current_human_traders", "expected_human_traders",
+    )}),
+})
+
+TRADER_STATE_ENCODER = MessageEncoder({
+    **{key: scalar for key in (
+        "type", "shares", "cash", "pnl", "goal", "goal_progress", "initial_cash",
+        "initial_shares", "sum_dinv", "vwap",
+    )},
+    "inventory": record({"shares": scalar, "cash": scalar}),
+    "trader_orders": trusted,
+    "order_book": trusted,
+    "filled_orders": rows({key: scalar for key in ("id", "price", "amount", "type", "timestamp")}),
+    "placed_orders": rows({
+        "order_ids": trusted,
+        **{key: scalar for key in (
+            "amount", "price", "order_type", "execution_type", "timestamp", "is_record_keeping",
+        )},
+    }),
+})
+
+MESSAGE_ENCODERS: Dict[str, MessageEncoder] = {
+    **{message_type: BOOK_ENCODER for message_type in (
+        "BOOK_UPDATED", "book_snapshot", "book_delta", "TRADING_STARTED", "stop_trading", "closure",
+    )},
+    "transaction_update": TRADES_ENCODER,
+    "time_update": TIME_UPDATE_ENCODER,
+}
+
+
+def prepare_message(message: Dict, message_type: Optional[str] = None) -> Dict:
+    """JSON-safe copy of a message, typed by `message_type` (default: its own `type`)."""
+    encoder = MESSAGE_ENCODERS.get(message_type or message.get("type"))
+    if encoder is None:
+        return sanitize_websocket_message(message)
+    return encoder.prepare(message)
+
+
+def dumps(value) -> str:
+    """Compact JSON text of an already sanitized value, via orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(value).decode()
+    return json.dumps(value, separators=(",", ":"))
+
+
+def merge_encoded(encoded: str, extra: str) -> str:
+    """Join two encoded JSON objects into one.
+
+    Later keys win when the client parses the result, so fields in `extra`
+    override same-named ones in `encoded`.
+    """
+    if extra == "{}":
+        return encoded
+    if encoded == "{}":
+        return extra
+    return encoded[:-1] + "," + extra[1:]
+
+
+def splice(encoded: str, fields: Dict[str, str]) -> str:
+    """Add already encoded field values to an encoded JSON object."""
+    if not fields:
+        return encoded
+    extra = ",".join(f"{json.dumps(key)}:{value}" for key, value in fields.items())
+    return merge_encoded(encoded, "{" + extra + "}")
+
+
+class EncodedMessage(dict):
+    """A broadcast message that is prepared and encoded at most once per wire format.
+
+    The encoding is cached per set of excluded fields, so sending it to many
+    sockets, or to clients that drop the same fields, costs one encode.
+    `fragments(key)` may return already encoded values for some fields
+    (e.g. the book at this message's version), which are spliced in as is;
+    it returns None once those values are stale.
+    """
+
+    def __init__(self, *args, fragments: Optional[Callable[[object], Optional[Dict[str, str]]]] = None,
+                 fragments_key=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._fragments = fragments
+        self._fragments_key = fragments_key
+        self._encoded: Dict[Tuple, Union[str, bytes]] = {}
+
+    def encoded(self, exclude: Tuple[str, ...] = ()) -> str:
+        cached = self._encoded.get(exclude)
+        if cached is not None:
+            return cached
+        fragments = self._fragments(self._fragments_key) if self._fragments else None
+        fragments = {k: v for k, v in (fragments or {}).items() if k in self and k not in exclude}
+        body = {k: v for k, v in self.items() if k not in exclude and k not in fragments}
+        encoded = splice(dumps(prepare_message(body, self.get("type"))), fragments)
+        self._encoded[exclude] = encoded
+        return encoded
+
+    def packed(self, exclude: Tuple[str, ...] = (), tick_size: float = 1) -> bytes:
+        key = (MSGPACK_ENCODING, tick_size) + exclude
+        cached = self._encoded.get(key)
+        if cached is None:
+            body = {k: v for k, v in self.items() if k not in exclude}
+            cached = self._encoded[key] = pack(prepare_message(body, self.get("type")), tick_size)
+        return cached
+
+    def frame(self, encoding: str = JSON_ENCODING, exclude: Tuple[str, ...] = (), tick_size: float = 1):
+        if encoding == MSGPACK_ENCODING:
+            return self.packed(exclude, tick_size)
+        return self.encoded(exclude)
+
+
+def encode_message(message: Dict, encoding: str = JSON_ENCODING, tick_size: float = 1):
+    """Frame for a message, reusing the cached encoding of an EncodedMessage."""
+    if isinstance(message, EncodedMessage):
+        return message.frame(encoding, tick_size=tick_size)
+    return encode_prepared(prepare_message(message), encoding, tick_size)
+
+
+# Binary protocol
+
+def supported_encodings() -> Tuple[str, ...]:
+    return (JSON_ENCODING, MSGPACK_ENCODING) if msgpack is not None else (JSON_ENCODING,)
+
+
+# Fields compacted for the binary protocol
+PRICE_FIELDS = frozenset({
+    "x", "price", "transaction_price", "bid_price", "ask_price", "clearing_price",
+})
+TIME_FIELDS = frozenset({"timestamp", "current_time", "start_time"})
+
+
+def to_ticks(value, tick_size: float):
+    if type(value) is int or type(value) is float:
+        ticks = value / tick_size
+        # Off-grid prices (e.g. a midpoint closure price) stay fractional
+        return int(ticks) if ticks.is_integer() else ticks
+    return value
+
+
+def to_epoch_ms(value):
+    if type(value) is str:
+        try:
+            return round(datetime.fromisoformat(value).timestamp() * 1000)
+        except ValueError:
+            return value
+    return value
+
+
+def compact(value, tick_size: float = 1):
+    """A prepared message with prices in ticks and ISO timestamps as epoch ms."""
+    if type(value) is dict:
+        compacted = {}
+        for key, item in value.items():
+            if key in PRICE_FIELDS:
+                compacted[key] = to_ticks(item, tick_size)
+            elif key in TIME_FIELDS:
+                compacted[key] = to_epoch_ms(item)
+            else:
+                compacted[key] = compact(item, tick_size)
+        return compacted
+    if type(value) is list:
+        return [compact(item, tick_size) for item in value]
+    return value
+
+
+def pack(value, tick_size: float = 1) -> bytes:
+    """MessagePack bytes of an already prepared value, in compact form."""
+    return msgpack.packb(compact(value, tick_size), use_bin_type=True)
+
+
+def _map_header(packed: bytes) -> Tuple[int, int]:
+    """Entry count and header length of a packed map."""
+    first = packed[0]
+    if 0x80 <= first <= 0x8f:
+        return first & 0x0f, 1
+    if first == 0xde:
+        return int.from_bytes(packed[1:3], "big"), 3
+    if first == 0xdf:
+        return int.from_bytes(packed[1:5], "big"), 5
+    raise ValueError("Not a packed map")
+
+
+def merge_packed(packed: bytes, extra: bytes) -> bytes:
+    """Join two packed maps into one; as with merge_encoded, `extra` wins on decode."""
+    count, header = _map_header(packed)
+    extra_count, extra_header = _map_header(extra)
+    total = count + extra_count
+    if total < 16:
+        merged_header = bytes([0x80 | total])
+    elif total < 0x10000:
+        merged_header = b"\xde" + total.to_bytes(2, "big")
+    else:
+        merged_header = b"\xdf" + total.to_bytes(4, "big")
+    return merged_header + packed[header:] + extra[extra_header:]
+
+
+def encode_prepared(prepared: Dict, encoding: str = JSON_ENCODING, tick_size: float = 1):
+    """Frame for an already prepared message: JSON text or MessagePack bytes."""
+    if encoding == MSGPACK_ENCODING:
+        return pack(prepared, tick_size)
+    return dumps(prepared)
+
+
+def merge_frames(frame, extra):
+    """Join two encoded objects of the same encoding; fields in `extra` win."""
+    if isinstance(frame, bytes):
+        return merge_packed(frame, extra)
+    return merge_encoded(frame, extra)
@@ -45,6 +45,9 @@ export const useTraderStore = defineStore('trader', {
     allTradersReady: false,
     readyCount: 0,
 
+    // Waiting for a book_snapshot after subscribing or asking for a resync
+    bookStreamPending: false,
+
     // Session management (new elegant approach)
     sessionStatus: null,
     isWaitingForOthers: false,
@@ -366,6 +369,13 @@ export const useTraderStore = defineStore('trader', {
           isTradingStarted: data.data.is_trading_started,
           remainingTime: data.data.remaining_time,
         })
+        // The market clock also carries the human trader counts
+        if (data.data.expected_human_traders !== undefined) {
+          this.$patch({
+            currentHumanTraders: data.data.current_human_traders,
+            expectedHumanTraders: data.data.expected_human_traders,
+          })
+        }
         return
       }
 
@@ -385,6 +395,32 @@ export const useTraderStore = defineStore('trader', {
         return
       }
 
+      // Sequenced book stream: one snapshot, then deltas until a gap or checksum mismatch
+      if (data.type === 'book_snapshot') {
+        this.bookStreamPending = false
+        useMarketStore().applyBookSnapshot(data, this.gameParams)
+        return
+      }
+      if (data.type === 'book_delta') {
+        if (this.bookStreamPending) return
+        if (!useMarketStore().applyBookDelta(data, this.gameParams)) {
+          this.bookStreamPending = true
+          this.sendMessage('resync_book', {})
+          return
+        }
+        this.mergeHistory(data.history, data.history_offset)
+        return
+      }
+      if (data.type === 'history_page') {
+        this.mergeHistory(data.history, data.history_offset)
+        return
+      }
+      // The market dropped one of our requests; nothing was placed or cancelled
+      if (data.type === 'rate_limited') {
+        useUIStore().showMessage(data.message || 'Too many requests, please slow down')
+        return
+      }
+
       // Handle AI advisor advice
       if (data.type === 'AI_ADVICE') {
         this.aiAdvice = data.advice
@@ -405,6 +441,7 @@ export const useTraderStore = defineStore('trader', {
       const {
         order_book,
         history,
+        history_offset,
         spread,
         midpoint,
         transaction_price,
@@ -433,14 +470,23 @@ export const useTraderStore = defineStore('trader', {
         }
       }
 
+      // A full history means this socket is not on the delta stream yet
+      if (history !== undefined && !this.bookStreamPending) {
+        this.bookStreamPending = true
+        this.sendMessage('subscribe_book_deltas', {})
+      }
+
       // Handle transactions
       if (type === 'transaction_update' && matched_orders) {
         this.handleFilledOrder(matched_orders, transaction_price)
       }
 
       // Update market data via market store
-      if (transaction_price || midpoint || spread || history !== undefined) {
-        useMarketStore().updateMarketData({ spread, midpoint, history, transaction_price })
+      if (transaction_price || midpoint || spread) {
+        useMarketStore().updateMarketData({ spread, midpoint, transaction_price })
+      }
+      if (history !== undefined) {
+        this.mergeHistory(history, history_offset)
       }
 
       // Update market extra params
@@ -559,6 +605,17 @@ export const useTraderStore = defineStore('trader', {
       await useWebSocketStore().initializeWebSocket(this.traderUuid)
     },
 
+    // Merge new trades into the tape, paging in any range missed in between
+    mergeHistory(trades, offset) {
+      const missingFrom = useMarketStore().mergeHistory(trades, offset)
+      if (missingFrom !== null) {
+        this.sendMessage('get_history', {
+          cursor: missingFrom,
+          limit: offset + trades.length - missingFrom,
+        })
+      }
+    },
+
     async sendMessage(type, data) {
       await useWebSocketStore().sendMessage(type, data)
     },
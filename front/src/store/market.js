@@ -12,6 +12,34 @@ function findMidpoint(bids, asks) {
   return midpoint
 }
 
+// Mirrors book_checksum() in back/core/orderbook_manager.py
+function checksumNumber(value) {
+  return value.toFixed(6).replace(/0+$/, '').replace(/\.$/, '')
+}
+
+const CRC_TABLE = Array.from({ length: 256 }, (_, n) => {
+  let c = n
+  for (let k = 0; k < 8; k++) {
+    c = c & 1 ? 0xedb88320 ^ (c >>> 1) : c >>> 1
+  }
+  return c >>> 0
+})
+
+function bookChecksum(bids, asks) {
+  const text = [...bids, ...asks]
+    .map((level) => `${checksumNumber(level.x)}:${checksumNumber(level.y)}`)
+    .join('|')
+  let crc = 0xffffffff
+  for (let i = 0; i < text.length; i++) {
+    crc = CRC_TABLE[(crc ^ text.charCodeAt(i)) & 0xff] ^ (crc >>> 8)
+  }
+  return (crc ^ 0xffffffff) >>> 0
+}
+
+function sortedLevels(levels, descending) {
+  return Object.values(levels).sort((a, b) => (descending ? b.x - a.x : a.x - b.x))
+}
+
 export const useMarketStore = defineStore('market', {
   state: () => ({
     orderBook: {
@@ -33,6 +61,8 @@ export const useMarketStore = defineStore('market', {
       },
     ],
     history: [],
+    // Tape index of history[0]; broadcasts carry only new trades from a history_offset
+    historyStart: 0,
     extraParams: [
       {
         var_name: 'transaction_price',
@@ -62,6 +92,9 @@ export const useMarketStore = defineStore('market', {
     currentPrice: null,
     lastTransactionPrice: null,
     recentTransactions: [],
+    // Full depth rebuilt from book_snapshot / book_delta messages, keyed by price
+    bookLevels: { bids: {}, asks: {} },
+    bookSeq: null,
   }),
 
   getters: {
@@ -96,22 +129,82 @@ export const useMarketStore = defineStore('market', {
       ]
     },
 
-    updateMarketData({ spread, midpoint, history, transaction_price }) {
+    updateMarketData({ spread, midpoint, transaction_price }) {
       if (spread !== undefined) {
         this.orderBook.spread = spread
       }
       if (midpoint !== undefined) {
         this.orderBook.midpoint = midpoint
       }
-      if (history !== undefined) {
-        this.history = history
-      }
       if (transaction_price !== undefined) {
         this.lastTransactionPrice = transaction_price
         this.currentPrice = transaction_price
       }
     },
 
+    // Append trades that start at tape index `offset`, skipping any already held.
+    // Returns the tape index to fetch from if they would leave a gap, else null.
+    mergeHistory(trades, offset) {
+      if (!trades || offset === undefined) return null
+      const end = this.historyStart + this.history.length
+      if (!this.history.length) {
+        this.historyStart = offset
+        this.history = [...trades]
+        return null
+      }
+      if (offset > end) return end
+      const fresh = trades.slice(end - offset)
+      if (fresh.length) {
+        this.history = this.history.concat(fresh)
+      }
+      return null
+    },
+
+    applyBookSnapshot(snapshot, gameParams) {
+      const { order_book, history, history_offset, spread, midpoint, transaction_price, seq } =
+        snapshot
+      this.bookLevels = {
+        bids: Object.fromEntries(order_book.bids.map((level) => [level.x, level])),
+        asks: Object.fromEntries(order_book.asks.map((level) => [level.x, level])),
+      }
+      this.bookSeq = seq
+      // The snapshot's window replaces the tape unless it merely extends it
+      if (this.mergeHistory(history, history_offset) !== null) {
+        this.history = []
+        this.mergeHistory(history, history_offset)
+      }
+      this.updateMarketData({ spread, midpoint, transaction_price })
+      this.updateOrderBook(order_book, gameParams)
+    },
+
+    // Returns false when the delta cannot be applied and a resync is needed
+    applyBookDelta(delta, gameParams) {
+      if (this.bookSeq === null || delta.seq !== this.bookSeq + 1) {
+        return false
+      }
+      for (const side of ['bids', 'asks']) {
+        for (const level of delta[side]) {
+          if (level.y > 0) {
+            this.bookLevels[side][level.x] = level
+          } else {
+            delete this.bookLevels[side][level.x]
+          }
+        }
+      }
+      this.bookSeq = delta.seq
+
+      const bids = sortedLevels(this.bookLevels.bids, true)
+      const asks = sortedLevels(this.bookLevels.asks, false)
+      if (delta.checksum !== undefined && bookChecksum(bids, asks) !== delta.checksum) {
+        return false
+      }
+
+      const { spread, midpoint, transaction_price } = delta
+      this.updateMarketData({ spread, midpoint, transaction_price })
+      this.updateOrderBook({ bids, asks }, gameParams)
+      return true
+    },
+
     updateExtraParams(data) {
       this.extraParams = this.extraParams.map((param) => ({
         ...param,
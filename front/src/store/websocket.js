@@ -1,6 +1,10 @@
 import { defineStore } from 'pinia'
 import { auth } from '@/firebaseConfig'
 import { useAuthStore } from './auth'
+import { decode, expandCompact } from '@/utils/msgpack'
+
+// Opt-in binary frames (MessagePack); JSON unless the build asks for it
+const PREFERRED_ENCODING = import.meta.env.VITE_WS_ENCODING || 'json'
 
 export const useWebSocketStore = defineStore('websocket', {
   state: () => ({
@@ -9,6 +13,8 @@ export const useWebSocketStore = defineStore('websocket', {
     reconnectAttempts: 0,
     maxReconnectAttempts: 5,
     reconnectInterval: 3000,
+    encoding: 'json',
+    tickSize: 1,
   }),
 
   actions: {
@@ -19,6 +25,7 @@ export const useWebSocketStore = defineStore('websocket', {
 
       const wsUrl = `${import.meta.env.VITE_WS_URL}trader/${traderUuid}`
       this.ws = new WebSocket(wsUrl)
+      this.ws.binaryType = 'arraybuffer'
 
       this.ws.onopen = async (event) => {
         this.isConnected = true
@@ -41,6 +48,10 @@ export const useWebSocketStore = defineStore('websocket', {
                 // Fallback if no authentication method is available
                 this.ws.send('no-auth')
               }
+              if (PREFERRED_ENCODING !== 'json') {
+                // The server acknowledges with a JSON 'protocol' message before switching
+                this.sendMessage('set_protocol', { encoding: PREFERRED_ENCODING })
+              }
             }
           } catch (error) {
             // Error sending authentication token
@@ -50,7 +61,15 @@ export const useWebSocketStore = defineStore('websocket', {
 
       this.ws.onmessage = (event) => {
         try {
-          const data = JSON.parse(event.data)
+          const data =
+            typeof event.data === 'string'
+              ? JSON.parse(event.data)
+              : expandCompact(decode(event.data), this.tickSize)
+          if (data.type === 'protocol') {
+            this.encoding = data.encoding
+            this.tickSize = data.tick_size || 1
+            return
+          }
           this.handleMessage(data)
         } catch (error) {
           // Error processing WebSocket message
@@ -0,0 +1,110 @@
+// Decoder for the binary websocket protocol (MessagePack) and the compact
+// form the server sends in it: prices in ticks, timestamps in epoch ms.
+
+const PRICE_FIELDS = new Set(['x', 'price', 'transaction_price', 'bid_price', 'ask_price', 'clearing_price'])
+const TIME_FIELDS = new Set(['timestamp', 'current_time', 'start_time'])
+
+const textDecoder = new TextDecoder()
+
+export function decode(buffer) {
+  const bytes = buffer instanceof Uint8Array ? buffer : new Uint8Array(buffer)
+  const view = new DataView(bytes.buffer, bytes.byteOffset, bytes.byteLength)
+  let pos = 0
+
+  const str = (length) => {
+    const value = textDecoder.decode(bytes.subarray(pos, pos + length))
+    pos += length
+    return value
+  }
+  const array = (length) => {
+    const value = new Array(length)
+    for (let i = 0; i < length; i++) value[i] = read()
+    return value
+  }
+  const map = (length) => {
+    const value = {}
+    for (let i = 0; i < length; i++) {
+      const key = read()
+      value[key] = read()
+    }
+    return value
+  }
+  const bin = (length) => {
+    const value = bytes.slice(pos, pos + length)
+    pos += length
+    return value
+  }
+  const uint = (size) => {
+    let value
+    if (size === 1) value = view.getUint8(pos)
+    else if (size === 2) value = view.getUint16(pos)
+    else if (size === 4) value = view.getUint32(pos)
+    else value = Number(view.getBigUint64(pos))
+    pos += size
+    return value
+  }
+  const int = (size) => {
+    let value
+    if (size === 1) value = view.getInt8(pos)
+    else if (size === 2) value = view.getInt16(pos)
+    else if (size === 4) value = view.getInt32(pos)
+    else value = Number(view.getBigInt64(pos))
+    pos += size
+    return value
+  }
+
+  function read() {
+    const byte = bytes[pos++]
+    if (byte <= 0x7f) return byte
+    if (byte <= 0x8f) return map(byte & 0x0f)
+    if (byte <= 0x9f) return array(byte & 0x0f)
+    if (byte <= 0xbf) return str(byte & 0x1f)
+    if (byte >= 0xe0) return byte - 0x100
+    switch (byte) {
+      case 0xc0: return null
+      case 0xc2: return false
+      case 0xc3: return true
+      case 0xc4: return bin(uint(1))
+      case 0xc5: return bin(uint(2))
+      case 0xc6: return bin(uint(4))
+      case 0xca: { const value = view.getFloat32(pos); pos += 4; return value }
+      case 0xcb: { const value = view.getFloat64(pos); pos += 8; return value }
+      case 0xcc: return uint(1)
+      case 0xcd: return uint(2)
+      case 0xce: return uint(4)
+      case 0xcf: return uint(8)
+      case 0xd0: return int(1)
+      case 0xd1: return int(2)
+      case 0xd2: return int(4)
+      case 0xd3: return int(8)
+      case 0xd9: return str(uint(1))
+      case 0xda: return str(uint(2))
+      case 0xdb: return str(uint(4))
+      case 0xdc: return array(uint(2))
+      case 0xdd: return array(uint(4))
+      case 0xde: return map(uint(2))
+      case 0xdf: return map(uint(4))
+      default: throw new Error(`Unsupported MessagePack type 0x${byte.toString(16)}`)
+    }
+  }
+
+  return read()
+}
+
+// Back to the JSON message shape: prices from ticks, ISO timestamps from epoch ms
+export function expandCompact(value, tickSize = 1) {
+  if (Array.isArray(value)) return value.map((item) => expandCompact(item, tickSize))
+  if (value === null || typeof value !== 'object') return value
+  const expanded = {}
+  for (const [key, item] of Object.entries(value)) {
+    if (PRICE_FIELDS.has(key) && typeof item === 'number') {
+      expanded[key] = item * tickSize
+    } else if (TIME_FIELDS.has(key) && Number.isInteger(item)) {
+      // Only epoch ms are integers; other numeric timestamps pass through
+      expanded[key] = new Date(item).toISOString()
+    } else {
+      expanded[key] = expandCompact(item, tickSize)
+    }
+  }
+  return expanded
+}